@@ -18,7 +18,7 @@ from enum import Enum
 from typing import Any
 
 from asyncua import ua
-from asyncua.common.utils import Buffer
+from asyncua.common.utils import Buffer, ReceiveBuffer
 from asyncua.ua.uaerrors._base import UaError
 
 from ..common.connection import SecureConnection, TransportLimits
@@ -45,7 +45,7 @@ class UASocketState(Enum):
     CLOSED = "closed"
 
 
-class UASocketProtocol(asyncio.Protocol):
+class UASocketProtocol(asyncio.BufferedProtocol):
     """
     Handle socket connection and send ua messages.
     Timeout is the timeout used while waiting for an ua answer from server.
@@ -63,7 +63,7 @@ class UASocketProtocol(asyncio.Protocol):
         """
         self.logger = logging.getLogger(f"{__name__}.UASocketProtocol")
         self.transport: asyncio.Transport | None = None
-        self.receive_buffer: bytes | None = None
+        self.receive_buffer = ReceiveBuffer()
         self.is_receiving = False
         self.timeout = timeout
         self.authentication_token = ua.NodeId()
@@ -102,36 +102,41 @@ class UASocketProtocol(asyncio.Protocol):
             except Exception:
                 self.logger.exception("on_connection_lost callback raised")
 
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self.receive_buffer.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self.receive_buffer.buffer_updated(nbytes)
+        self._process_received_data()
+
     def data_received(self, data: bytes) -> None:
-        if self.receive_buffer:
-            data = self.receive_buffer + data
-            self.receive_buffer = None
-        self._process_received_data(data)
+        self.receive_buffer.extend(data)
+        self._process_received_data()
 
-    def _process_received_data(self, data: bytes) -> None:
+    def _process_received_data(self) -> None:
         """
         Try to parse received data as asyncua message. Data may be chunked but will be in correct order.
-        See: https://docs.python.org/3/library/asyncio-protocol.html#asyncio.Protocol.data_received
-        Reassembly is done by filling up a buffer until it verifies as a valid message (or a MessageChunk).
+        See: https://docs.python.org/3/library/asyncio-protocol.html#buffered-streaming-protocols
+        Reassembly is done by filling up the receive buffer until it holds a complete message (or a MessageChunk),
+        which is then consumed from the front of the buffer.
         """
-        buf = ua.utils.Buffer(data)
-        while buf:
-            # Shadow copy of the position at iteration start; lets us stash the
-            # original unparsed bytes on partial-receive without an eager copy.
-            unparsed = buf.copy()
+        while self.receive_buffer:
             try:
+                buf = self.receive_buffer.peek()
                 try:
                     header = header_from_binary(buf)
                 except ua.utils.NotEnoughData:
                     self.logger.debug("Not enough data while parsing header from server, waiting for more")
-                    self.receive_buffer = bytes(unparsed)
                     return
+                if header.body_size < 0:
+                    raise ua.UaError(f"Got malformed header {header}")
                 if len(buf) < header.body_size:
                     self.logger.debug(
                         "We did not receive enough data from server. Need %s got %s", header.body_size, len(buf)
                     )
-                    self.receive_buffer = bytes(unparsed)
                     return
+                data = self.receive_buffer.consume(header.header_size + header.body_size)
+                buf = ua.utils.Buffer(data, header.header_size)
                 msg = self._connection.receive_from_header_and_body(header, buf)
                 self._process_received_message(msg)
                 if header.MessageType == ua.MessageType.SecureOpen:
@@ -186,7 +191,7 @@ class UASocketProtocol(asyncio.Protocol):
         try:
             binreq = struct_to_binary(request)
             self.revolve_security_token()
-            msg = self._connection.message_to_binary(binreq, message_type=message_type, request_id=next_request_id)
+            msg = self._connection.message_to_buffers(binreq, message_type=message_type, request_id=next_request_id)
         except Exception:
             # reset request handle if any error
             # see self._setup_request_header
@@ -195,7 +200,7 @@ class UASocketProtocol(asyncio.Protocol):
         self._request_id = next_request_id
         future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
         self._callbackmap[self._request_id] = future
-        self.transport.write(msg)
+        self.transport.writelines(msg)
         return future
 
     async def send_request(
@@ -22,6 +22,7 @@ from asyncua.ua.uaerrors import (
     BadNoSubscription,
     BadSessionClosed,
     BadTimeout,
+    BadTooManyPublishRequests,
     BadUserAccessDenied,
     UaStructParsingError,
 )
@@ -57,6 +58,11 @@ class UaSession(AbstractSession):
         self._state: SessionState = SessionState.NEW
         self._subscription_callbacks: dict[int, Callable[..., Any]] = {}
         self._publish_task: asyncio.Task[None] | None = None
+        # Number of PublishRequests kept in flight. Raising it keeps notifications flowing on high latency
+        # links, None scales it with the number of subscriptions: one more than there are subscriptions,
+        # up to max_publish_pipeline_depth.
+        self.publish_pipeline_depth: int | None = 1
+        self.max_publish_pipeline_depth: int = 5
 
     @property
     def state(self) -> SessionState:
@@ -429,56 +435,95 @@ class UaSession(AbstractSession):
             raise UaStructParsingError from ex
         return response
 
+    def _publish_depth(self) -> int:
+        """Number of PublishRequests to keep in flight."""
+        if self.publish_pipeline_depth is not None:
+            return max(1, self.publish_pipeline_depth)
+        return max(1, min(len(self._subscription_callbacks) + 1, self.max_publish_pipeline_depth))
+
     async def _publish_loop(self) -> None:
         """
-        Send PublishRequests in a loop and forward `PublishResult` to the matching subscription callback.
+        Keep several PublishRequests in flight and forward each `PublishResult` to the matching subscription callback.
+        Acknowledgements of all responses received since the last request are sent with the next one.
         """
         pending_acks: list[ua.SubscriptionAcknowledgement] = []
-        while self._state not in (SessionState.CLOSING, SessionState.CLOSED):
-            try:
-                response = await self.publish(pending_acks)
-                pending_acks = []
-            except BadTimeout:
-                pending_acks = []
-                continue
-            except BadNoSubscription:
-                self.logger.info("BadNoSubscription received, ignoring because it's probably valid.")
-                return
-            except UaStructParsingError:
-                pending_acks = []
-                continue
-            except asyncio.CancelledError:
-                raise
-            except Exception:
-                self.logger.exception("Publish iteration crashed; retrying in 1s")
-                pending_acks = []
-                await asyncio.sleep(1.0)
-                continue
-            subscription_id = response.Parameters.SubscriptionId
-            if not subscription_id:
-                # Spec Part 4 - Section 5.13.5 "Publish": value 0 means no Subscriptions
-                return
-            callback = self._subscription_callbacks.get(subscription_id)
-            if callback is None:
-                self.logger.warning(
-                    "Received data for unknown subscription %s active are %s",
-                    subscription_id,
-                    self._subscription_callbacks.keys(),
-                )
-            else:
-                try:
-                    result = callback(response.Parameters)
-                    if asyncio.iscoroutine(result):
-                        await result
-                except Exception:
-                    self.logger.exception("Exception while calling user callback")
-            if response.Parameters.NotificationMessage.NotificationData:
-                pending_acks.append(
-                    ua.SubscriptionAcknowledgement(
-                        SubscriptionId=subscription_id,
-                        SequenceNumber=response.Parameters.NotificationMessage.SequenceNumber,
-                    )
+        in_flight: set[asyncio.Task[ua.PublishResponse]] = set()
+        # once the server reports that there are no subscriptions, no new requests are sent,
+        # but the responses to those still in flight are handled
+        draining = False
+        # depth accepted by the server, lowered on BadTooManyPublishRequests until the subscriptions change
+        server_depth: int | None = None
+        server_depth_subscriptions = 0
+        try:
+            while self._state not in (SessionState.CLOSING, SessionState.CLOSED):
+                if not draining:
+                    depth = self._publish_depth()
+                    if server_depth is not None:
+                        if server_depth_subscriptions == len(self._subscription_callbacks):
+                            depth = min(depth, server_depth)
+                        else:
+                            server_depth = None
+                    while len(in_flight) < depth:
+                        in_flight.add(asyncio.create_task(self.publish(pending_acks)))
+                        pending_acks = []
+                if not in_flight:
+                    return
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                responses: list[ua.PublishResponse] = []
+                for task in done:
+                    try:
+                        responses.append(task.result())
+                    except (BadTimeout, UaStructParsingError):
+                        continue
+                    except BadNoSubscription:
+                        self.logger.info("BadNoSubscription received, ignoring because it's probably valid.")
+                        draining = True
+                    except BadTooManyPublishRequests:
+                        self.logger.info("BadTooManyPublishRequests received, sending fewer publish requests")
+                        server_depth = max(1, len(in_flight))
+                        server_depth_subscriptions = len(self._subscription_callbacks)
+                        await asyncio.sleep(1.0)
+                    except Exception:
+                        self.logger.exception("Publish iteration crashed; retrying in 1s")
+                        await asyncio.sleep(1.0)
+                # responses received together are delivered in sequence order
+                responses.sort(
+                    key=lambda r: (r.Parameters.SubscriptionId, r.Parameters.NotificationMessage.SequenceNumber)
                 )
+                for response in responses:
+                    subscription_id = response.Parameters.SubscriptionId
+                    if not subscription_id:
+                        # Spec Part 4 - Section 5.13.5 "Publish": value 0 means no Subscriptions
+                        draining = True
+                        continue
+                    draining = False
+                    await self._dispatch_publish_result(response.Parameters)
+                    if response.Parameters.NotificationMessage.NotificationData:
+                        pending_acks.append(
+                            ua.SubscriptionAcknowledgement(
+                                SubscriptionId=subscription_id,
+                                SequenceNumber=response.Parameters.NotificationMessage.SequenceNumber,
+                            )
+                        )
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def _dispatch_publish_result(self, result: ua.PublishResult) -> None:
+        callback = self._subscription_callbacks.get(result.SubscriptionId)
+        if callback is None:
+            self.logger.warning(
+                "Received data for unknown subscription %s active are %s",
+                result.SubscriptionId,
+                self._subscription_callbacks.keys(),
+            )
+            return
+        try:
+            res = callback(result)
+            if asyncio.iscoroutine(res):
+                await res
+        except Exception:
+            self.logger.exception("Exception while calling user callback")
 
     # --- MonitoredItem Service Set ---
 
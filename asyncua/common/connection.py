@@ -105,7 +105,7 @@ class MessageChunk:
     def __init__(
         self,
         crypto: CryptographyNone,
-        body: bytes = b"",
+        body: bytes | memoryview = b"",
         msg_type: ua.MessageType = ua.MessageType.SecureMessage,
         chunk_type: ua.ChunkType = ua.ChunkType.Single,
     ) -> None:
@@ -135,7 +135,7 @@ class MessageChunk:
     ) -> MessageChunk:
         if not len(buf) >= header.body_size:
             raise ValueError("Full body expected here")
-        data = buf.copy(header.body_size)
+        data = buf.view(header.body_size)
         buf.skip(header.body_size)
         if header.MessageType in (ua.MessageType.SecureMessage, ua.MessageType.SecureClose):
             security_header = struct_from_binary(ua.SymmetricAlgorithmHeader, data)
@@ -178,6 +178,22 @@ class MessageChunk:
         encrypted_part += self.crypto.signature(header + security + encrypted_part)
         return header + security + self.crypto.encrypt(encrypted_part)
 
+    def to_buffers(self) -> list[bytes | memoryview]:
+        """
+        Same as to_binary() but for chunks which are not encrypted, return the headers, the body and
+        the signature as separate buffers so the body is never copied. Suitable for transport.writelines().
+        """
+        if self.crypto.is_encrypted:
+            return [self.to_binary()]
+        security = struct_to_binary(self.SecurityHeader)
+        sequence = struct_to_binary(self.SequenceHeader)
+        self.MessageHeader.body_size = len(security) + len(sequence) + len(self.Body) + self.crypto.signature_size()
+        headers = b"".join((header_to_binary(self.MessageHeader), security, sequence))
+        signature = self.crypto.signature_parts((headers, self.Body))
+        if signature:
+            return [headers, self.Body, signature]
+        return [headers, self.Body]
+
     @staticmethod
     def max_body_size(crypto: CryptographyNone, max_chunk_size: int) -> int:
         max_encrypted_size = max_chunk_size - ua.Header.max_size() - ua.SymmetricAlgorithmHeader.max_size()
@@ -187,7 +203,7 @@ class MessageChunk:
     @staticmethod
     def message_to_chunks(
         security_policy: SecurityPolicy,
-        body: bytes,
+        body: bytes | memoryview,
         max_chunk_size: int,
         message_type: ua.MessageType = ua.MessageType.SecureMessage,
         channel_id: int = 1,
@@ -221,6 +237,8 @@ class MessageChunk:
         max_size = MessageChunk.max_body_size(crypto, max_chunk_size)
 
         chunks = []
+        if len(body) > max_size:
+            body = memoryview(body)
         for i in range(0, len(body), max_size):
             part = body[i : i + max_size]
             if i + max_size >= len(body):
@@ -366,6 +384,15 @@ class SecureConnection:
         The only supported types are SecureOpen, SecureMessage, SecureClose.
         If message_type is SecureMessage, the AlgorithmHeader should be passed as arg.
         """
+        return b"".join(self.message_to_buffers(message, message_type, request_id))
+
+    def message_to_buffers(
+        self, message: bytes, message_type: ua.MessageType = ua.MessageType.SecureMessage, request_id: int = 0
+    ) -> list[bytes | memoryview]:
+        """
+        Convert OPC UA secure message to a list of buffers to be written with transport.writelines().
+        Unless the chunks are encrypted, the buffers reference the message instead of copying it.
+        """
         chunks = MessageChunk.message_to_chunks(
             self.security_policy,
             message,
@@ -381,7 +408,7 @@ class SecureConnection:
                 _logger.debug("Wrapping sequence number: %d -> 1", self._sequence_number)
                 self._sequence_number = 1
             chunk.SequenceHeader.SequenceNumber = self._sequence_number
-        return b"".join([chunk.to_binary() for chunk in chunks])
+        return [buf for chunk in chunks for buf in chunk.to_buffers()]
 
     def _check_sym_header(self, security_hdr: ua.SymmetricAlgorithmHeader) -> None:
         """
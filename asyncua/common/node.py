@@ -454,6 +454,7 @@ class Node:
         nodeclassmask: ua.NodeClass = ua.NodeClass.Unspecified,
         includesubtypes: bool = True,
         result_mask: ua.BrowseResultMask = ua.BrowseResultMask.All,
+        max_references_per_node: int = 0,
     ) -> list[ua.ReferenceDescription]:
         """
         returns references of the node based on specific filter defined with:
@@ -463,6 +464,7 @@ class Node:
         nodeclassmask = filter nodes based on specific class
         includesubtypes = If true subtypes of the reference (ref) are also included
         result_mask = define what results information are requested
+        max_references_per_node = references per response, the others are fetched with BrowseNext, 0 for no limit
         """
         desc = ua.BrowseDescription()
         desc.BrowseDirection = direction
@@ -474,7 +476,7 @@ class Node:
         params = ua.BrowseParameters()
         params.View.Timestamp = ua.get_win_epoch()
         params.NodesToBrowse.append(desc)
-        params.RequestedMaxReferencesPerNode = 0
+        params.RequestedMaxReferencesPerNode = max_references_per_node
         results = await self.session.browse(params)
         references = await self._browse_next(results)
         return references
@@ -490,6 +492,8 @@ class Node:
             results = await self.session.browse_next(params)
             if not results:
                 break
+            # an expired or evicted continuation point must not look like the end of the references
+            results[0].StatusCode.check()
             references.extend(results[0].References)
         return references
 
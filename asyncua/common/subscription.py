@@ -6,13 +6,15 @@ from __future__ import annotations
 
 import asyncio
 import collections.abc
+import importlib
 import inspect
 import logging
 import time
 from collections.abc import Callable, Iterable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import datetime
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Protocol, overload
+from typing import TYPE_CHECKING, Any, Literal, Protocol, overload
 
 from asyncua import ua
 from asyncua.client.ua_session import UaSession
@@ -69,6 +71,22 @@ class DataChangeNotificationHandler(Protocol):
         ...
 
 
+class DataChangeNotificationsHandler(Protocol):
+    def datachange_notifications(self, events: list[DataChangeEvent]) -> None:
+        """
+        called once with all datachange notifications of a publish response, in the order of the server
+        """
+        ...
+
+
+class DataChangeColumnsHandler(Protocol):
+    def datachange_columns(self, columns: DataChangeColumns) -> None:
+        """
+        called once for every datachange notification from server, with all its monitored items as columns
+        """
+        ...
+
+
 class EventNotificationHandler(Protocol):
     def event_notification(self, event: Event) -> None:
         """
@@ -93,6 +111,22 @@ class DataChangeNotificationHandlerAsync(Protocol):
         ...
 
 
+class DataChangeNotificationsHandlerAsync(Protocol):
+    async def datachange_notifications(self, events: list[DataChangeEvent]) -> None:
+        """
+        called once with all datachange notifications of a publish response, in the order of the server
+        """
+        ...
+
+
+class DataChangeColumnsHandlerAsync(Protocol):
+    async def datachange_columns(self, columns: DataChangeColumns) -> None:
+        """
+        called once for every datachange notification from server, with all its monitored items as columns
+        """
+        ...
+
+
 class EventNotificationHandlerAsync(Protocol):
     async def event_notification(self, event: Event) -> None:
         """
@@ -111,9 +145,13 @@ class StatusChangeNotificationHandlerAsync(Protocol):
 
 SubscriptionHandler = (
     DataChangeNotificationHandler
+    | DataChangeNotificationsHandler
+    | DataChangeColumnsHandler
     | EventNotificationHandler
     | StatusChangeNotificationHandler
     | DataChangeNotificationHandlerAsync
+    | DataChangeNotificationsHandlerAsync
+    | DataChangeColumnsHandlerAsync
     | EventNotificationHandlerAsync
     | StatusChangeNotificationHandlerAsync
 )
@@ -139,6 +177,31 @@ class DataChangeEvent:
     replayed: bool = False
 
 
+@dataclass(frozen=True)
+class DataChangeColumns:
+    """The monitored items of a DataChangeNotification as parallel lists, one entry per item.
+
+    Handed to handlers implementing `datachange_columns` instead of one DataChangeEvent
+    per item. `status_codes` holds the raw StatusCode values, 0 being Good.
+    `values_array()` converts the values to a numpy array when numpy is installed.
+    """
+
+    client_handles: list[int] = field(default_factory=list)
+    node_ids: list[ua.NodeId] = field(default_factory=list)
+    values: list[Any] = field(default_factory=list)
+    status_codes: list[int] = field(default_factory=list)
+    source_timestamps: list[datetime | None] = field(default_factory=list)
+    replayed: bool = False
+
+    def __len__(self) -> int:
+        return len(self.client_handles)
+
+    def values_array(self, dtype: Any = None) -> Any:
+        """Return the values as a numpy array, of `dtype` if given."""
+        numpy = importlib.import_module("numpy")
+        return numpy.asarray(self.values, dtype=dtype)
+
+
 @dataclass(frozen=True)
 class OpcEvent:
     """An OPC UA event firing, yielded by Subscription's async iterator."""
@@ -160,6 +223,11 @@ class StatusChangeEvent:
 
 
 SubEvent = DataChangeEvent | OpcEvent | StatusChangeEvent
+# What the batch consumer task delivers, DataChangeColumns only in columnar mode
+_BatchEvent = SubEvent | DataChangeColumns
+
+# A handler method, looked up once, and whether it has to be awaited
+_HandlerMethod = tuple[Callable[..., Any] | None, bool]
 
 
 class OverflowPolicy(str, Enum):
@@ -227,6 +295,22 @@ class Subscription:
         # Set while publish_callback is dispatching notifications retrieved via
         # Republish; consumed by _explode_* to tag events with replayed=True.
         self._replaying: bool = False
+        # Handler methods are looked up once. A handler implementing
+        # datachange_notifications gets the events of each publish response as
+        # one batch, delivered in order by a single consumer task. One implementing
+        # datachange_columns gets DataChangeColumns the same way, without any
+        # DataChangeEvent being created.
+        self._datachange_method = self._resolve_handler_method("datachange_notification")
+        self._datachange_batch_method = self._resolve_handler_method("datachange_notifications")
+        self._datachange_columns_method = self._resolve_handler_method("datachange_columns")
+        self._event_method = self._resolve_handler_method("event_notification")
+        self._status_change_method = self._resolve_handler_method("status_change_notification")
+        self._batch_queue: asyncio.Queue[list[_BatchEvent] | None] | None = None
+        self._batch_consumer: asyncio.Task[None] | None = None
+
+    def _resolve_handler_method(self, name: str) -> _HandlerMethod:
+        method = getattr(self._handler, name, None) if self._handler is not None else None
+        return method, inspect.iscoroutinefunction(method)
 
     @property
     def is_deleted(self) -> bool:
@@ -265,14 +349,33 @@ class Subscription:
         if publish_result.NotificationMessage.NotificationData is None:
             return
         self.last_sequence_number = int(publish_result.NotificationMessage.SequenceNumber)
-        for event in self._explode_notifications(publish_result.NotificationMessage.NotificationData):
+        notification_data = publish_result.NotificationMessage.NotificationData
+        if self._datachange_columns_method[0] is not None:
+            self._deliver_batch(list(self._explode_notifications(notification_data, columnar=True)))
+            return
+        events = self._explode_notifications(notification_data)
+        if self._datachange_batch_method[0] is not None:
+            self._deliver_batch(list(events))
+            return
+        for event in events:
             self._deliver(event)
 
-    def _explode_notifications(self, notification_data: Iterable[Any]) -> Iterable[SubEvent]:
-        """Translate server `NotificationData` items into typed `SubEvent`s."""
+    @overload
+    def _explode_notifications(
+        self, notification_data: Iterable[Any], columnar: Literal[False] = False
+    ) -> Iterable[SubEvent]: ...
+
+    @overload
+    def _explode_notifications(self, notification_data: Iterable[Any], columnar: bool) -> Iterable[_BatchEvent]: ...
+
+    def _explode_notifications(self, notification_data: Iterable[Any], columnar: bool = False) -> Iterable[_BatchEvent]:
+        """Translate server `NotificationData` items into typed `SubEvent`s, or DataChangeColumns if `columnar`."""
         for notif in notification_data:
             if isinstance(notif, ua.DataChangeNotification):
-                yield from self._explode_datachange(notif)
+                if columnar:
+                    yield self._datachange_columns(notif)
+                else:
+                    yield from self._explode_datachange(notif)
             elif isinstance(notif, ua.EventNotificationList):
                 yield from self._explode_events(notif)
             elif isinstance(notif, ua.StatusChangeNotification):
@@ -293,6 +396,32 @@ class Subscription:
                 value = item.Value.Value.Value
             yield DataChangeEvent(node=data.node, value=value, data=event_data, replayed=self._replaying)
 
+    def _datachange_columns(self, datachange: ua.DataChangeNotification) -> DataChangeColumns:
+        columns = DataChangeColumns(replayed=self._replaying)
+        client_handles = columns.client_handles
+        node_ids = columns.node_ids
+        values = columns.values
+        status_codes = columns.status_codes
+        source_timestamps = columns.source_timestamps
+        monitored_items = self._monitored_items
+        for item in datachange.MonitoredItems:
+            data = monitored_items.get(item.ClientHandle)
+            if data is None or data.node is None:
+                self.logger.warning("Received a notification for unknown handle: %s", item.ClientHandle)
+                continue
+            client_handles.append(item.ClientHandle)
+            node_ids.append(data.node.nodeid)
+            datavalue = item.Value
+            if datavalue is None:
+                values.append(None)
+                status_codes.append(0)
+                source_timestamps.append(None)
+                continue
+            values.append(datavalue.Value.Value if datavalue.Value is not None else None)
+            status_codes.append(datavalue.StatusCode.value if datavalue.StatusCode is not None else 0)
+            source_timestamps.append(datavalue.SourceTimestamp)
+        return columns
+
     def _explode_events(self, eventlist: ua.EventNotificationList) -> Iterable[OpcEvent]:
         for event in eventlist.Events:
             data = self._monitored_items.get(event.ClientHandle)
@@ -327,6 +456,44 @@ class Subscription:
             self._dispatch_tasks.add(task)
             task.add_done_callback(self._dispatch_tasks.discard)
 
+    def _deliver_batch(self, events: list[_BatchEvent]) -> None:
+        """Queue the events of one publish response for the batch consumer task."""
+        if not events:
+            return
+        if self._batch_queue is None:
+            self._batch_queue = asyncio.Queue()
+        if self._batch_consumer is None or self._batch_consumer.done():
+            self._batch_consumer = asyncio.create_task(self._consume_batches(self._batch_queue))
+        self._batch_queue.put_nowait(events)
+
+    async def _consume_batches(self, queue: asyncio.Queue[list[_BatchEvent] | None]) -> None:
+        while (events := await queue.get()) is not None:
+            await self._dispatch_batch(events)
+
+    async def _dispatch_batch(self, events: list[_BatchEvent]) -> None:
+        """Hand consecutive data changes to datachange_notifications, other events one by one."""
+        datachanges: list[DataChangeEvent] = []
+        for event in events:
+            if isinstance(event, DataChangeColumns):
+                if event:
+                    await self._call_handler(self._datachange_columns_method, "", event)
+                continue
+            if isinstance(event, DataChangeEvent):
+                datachanges.append(event)
+                continue
+            if datachanges:
+                await self._call_handler(self._datachange_batch_method, "", datachanges)
+                datachanges = []
+            await self._dispatch_to_handler(event)
+        if datachanges:
+            await self._call_handler(self._datachange_batch_method, "", datachanges)
+
+    def _stop_batch_consumer(self) -> None:
+        """Let the batch consumer task end once it has delivered the pending batches."""
+        if self._batch_queue is not None:
+            self._batch_queue.put_nowait(None)
+            self._batch_queue = None
+
     def _handle_overflow(self, event: SubEvent) -> None:
         """Apply the configured overflow policy when the iterator queue is full."""
         assert self._event_queue is not None
@@ -352,39 +519,40 @@ class Subscription:
         # DROP_NEWEST: do nothing — the new event is discarded.
 
     async def _dispatch_to_handler(self, event: SubEvent) -> None:
-        """Call the right legacy handler method for `event`, in its own task."""
+        """Call the right handler method for `event`."""
         if self._handler is None:
             return
+        if isinstance(event, DataChangeEvent):
+            await self._call_handler(
+                self._datachange_method,
+                "DataChange subscription created but handler has no datachange_notification method",
+                event.node,
+                event.value,
+                event.data,
+            )
+        elif isinstance(event, OpcEvent):
+            await self._call_handler(
+                self._event_method,
+                "Event subscription created but handler has no event_notification method",
+                event.event,
+            )
+        elif isinstance(event, StatusChangeEvent):
+            await self._call_handler(
+                self._status_change_method,
+                "DataChange subscription has no status_change_notification method",
+                event.notification,
+            )
+
+    async def _call_handler(self, method: _HandlerMethod, missing_message: str, *args: Any) -> None:
+        func, is_coroutine = method
+        if func is None:
+            self.logger.error(missing_message)
+            return
         try:
-            if isinstance(event, DataChangeEvent):
-                method = getattr(self._handler, "datachange_notification", None)
-                if method is None:
-                    self.logger.error(
-                        "DataChange subscription created but handler has no datachange_notification method"
-                    )
-                    return
-                if inspect.iscoroutinefunction(method):
-                    await method(event.node, event.value, event.data)
-                else:
-                    method(event.node, event.value, event.data)
-            elif isinstance(event, OpcEvent):
-                method = getattr(self._handler, "event_notification", None)
-                if method is None:
-                    self.logger.error("Event subscription created but handler has no event_notification method")
-                    return
-                if inspect.iscoroutinefunction(method):
-                    await method(event.event)
-                else:
-                    method(event.event)
-            elif isinstance(event, StatusChangeEvent):
-                method = getattr(self._handler, "status_change_notification", None)
-                if method is None:
-                    self.logger.error("DataChange subscription has no status_change_notification method")
-                    return
-                if inspect.iscoroutinefunction(method):
-                    await method(event.notification)
-                else:
-                    method(event.notification)
+            if is_coroutine:
+                await func(*args)
+            else:
+                func(*args)
         except Exception:
             self.logger.exception("Exception calling subscription handler")
 
@@ -453,6 +621,7 @@ class Subscription:
         finally:
             self._deleted = True
             self._close_iterator()
+            self._stop_batch_consumer()
 
     def _close_iterator(self) -> None:
         """Push the sentinel so any active `async for ev in sub` loop ends."""
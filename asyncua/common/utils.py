@@ -6,6 +6,7 @@ Helper function and classes depending on ua object are in ua_utils.py
 import asyncio
 import logging
 import os
+import struct
 import sys
 from collections.abc import Awaitable
 from dataclasses import Field, fields
@@ -34,9 +35,13 @@ class Buffer:
     """
     Alternative to io.BytesIO making debug easier
     and added a few convenience methods.
+
+    A Buffer can be backed by bytes, a bytearray or a memoryview. When backed by a memoryview
+    read() returns memoryview slices so payloads are not copied until materialized
+    with bytes(), see view().
     """
 
-    def __init__(self, data: bytes, start_pos: int = 0, size: int = -1) -> None:
+    def __init__(self, data: bytes | bytearray | memoryview, start_pos: int = 0, size: int = -1) -> None:
         self._data = data
         self._cur_pos = start_pos
         if size == -1:
@@ -44,7 +49,7 @@ class Buffer:
         self._size = size
 
     def __str__(self) -> str:
-        return f"Buffer(size:{self._size}, data:{self._data[self._cur_pos : self._cur_pos + self._size]!r})"
+        return f"Buffer(size:{self._size}, data:{bytes(self._data[self._cur_pos : self._cur_pos + self._size])!r})"
 
     __repr__ = __str__
 
@@ -56,9 +61,9 @@ class Buffer:
 
     def __bytes__(self) -> bytes:
         """Return remains of buffer as bytes."""
-        return bytes(self._data[self._cur_pos :])
+        return bytes(self._data[self._cur_pos : self._cur_pos + self._size])
 
-    def read(self, size: int) -> bytes:
+    def read(self, size: int) -> bytes | bytearray | memoryview:
         """
         read and pop number of bytes for buffer
         """
@@ -69,6 +74,18 @@ class Buffer:
         self._cur_pos += size
         return self._data[pos : self._cur_pos]
 
+    def unpack(self, st: struct.Struct) -> tuple[Any, ...]:
+        """
+        unpack and pop st.size bytes in place, without slicing the underlying data
+        """
+        size = st.size
+        if size > self._size:
+            raise NotEnoughData(f"Not enough data left in buffer, request for {size}, we have {self._size}")
+        values = st.unpack_from(self._data, self._cur_pos)
+        self._size -= size
+        self._cur_pos += size
+        return values
+
     def copy(self, size: int = -1) -> "Buffer":
         """
         return a shadow copy, optionally only copy 'size' bytes
@@ -77,6 +94,14 @@ class Buffer:
             size = self._size
         return Buffer(self._data, self._cur_pos, size)
 
+    def view(self, size: int = -1) -> "Buffer":
+        """
+        return a zero-copy Buffer backed by a memoryview, optionally only over 'size' bytes
+        """
+        if size == -1 or size > self._size:
+            size = self._size
+        return Buffer(memoryview(self._data)[self._cur_pos : self._cur_pos + size])
+
     def skip(self, size: int) -> None:
         """
         skip size bytes in buffer
@@ -98,6 +123,86 @@ class Buffer:
         self._size = len(self._data) - cur_pos
 
 
+class ReceiveBuffer:
+    """
+    Growable receive buffer for stream transports, usable from asyncio.BufferedProtocol.
+    Incoming data is written in place at the end and complete messages are consumed from the
+    front, so reassembling a message costs O(message size) instead of re-copying everything
+    received so far on every segment.
+    """
+
+    def __init__(self, read_size: int = 65536) -> None:
+        self._read_size = read_size
+        self._data = bytearray(read_size)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __bool__(self) -> bool:
+        return self._end > self._start
+
+    def get_buffer(self, sizehint: int = -1) -> memoryview:
+        """
+        return a writable memoryview over at least sizehint free bytes at the end of the buffer
+        """
+        size = sizehint if sizehint > 0 else self._read_size
+        if self._start == self._end:
+            self._start = self._end = 0
+        if len(self._data) - self._end < size:
+            self._reserve(size)
+        return memoryview(self._data)[self._end :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """
+        mark nbytes written into the last memoryview returned by get_buffer as received
+        """
+        self._end += nbytes
+
+    def extend(self, data: bytes) -> None:
+        size = len(data)
+        self.get_buffer(size)[:size] = data
+        self._end += size
+
+    def peek(self) -> Buffer:
+        """
+        return a Buffer over the received but not yet consumed data, without copying it
+        """
+        return Buffer(self._data, self._start, self._end - self._start)
+
+    def consume(self, size: int) -> bytes:
+        """
+        pop size bytes from the front of the buffer and return them as bytes
+        """
+        if size > self._end - self._start:
+            raise NotEnoughData(f"Not enough data left in buffer, request for {size}, we have {len(self)}")
+        with memoryview(self._data) as view:
+            data = bytes(view[self._start : self._start + size])
+        self._start += size
+        if self._start == self._end:
+            self.clear()
+        return data
+
+    def clear(self) -> None:
+        self._start = self._end = 0
+        if len(self._data) > 4 * self._read_size:
+            # do not keep the memory grown for a large message for the lifetime of the connection
+            self._data = bytearray(self._read_size)
+
+    def _reserve(self, size: int) -> None:
+        used = self._end - self._start
+        capacity = len(self._data)
+        while used + size > capacity:
+            capacity *= 2
+        data = bytearray(capacity)
+        with memoryview(self._data) as view:
+            data[:used] = view[self._start : self._end]
+        self._data = data
+        self._start = 0
+        self._end = used
+
+
 def create_nonce(size: int = 32) -> bytes:
     return os.urandom(size)
 
@@ -19,6 +19,7 @@ USER_TYPES = [
     ua.ObjectIds.ReadRequest_Encoding_DefaultBinary,
     ua.ObjectIds.WriteRequest_Encoding_DefaultBinary,
     ua.ObjectIds.BrowseRequest_Encoding_DefaultBinary,
+    ua.ObjectIds.BrowseNextRequest_Encoding_DefaultBinary,
     ua.ObjectIds.GetEndpointsRequest_Encoding_DefaultBinary,
     ua.ObjectIds.FindServersRequest_Encoding_DefaultBinary,
     ua.ObjectIds.TranslateBrowsePathsToNodeIdsRequest_Encoding_DefaultBinary,
@@ -31,6 +31,12 @@ class Signer:
     def signature(self, data):
         pass
 
+    def signature_parts(self, parts):
+        """
+        Signature of the concatenation of parts
+        """
+        return self.signature(b"".join(parts))
+
 
 class Verifier:
     """
@@ -103,6 +109,8 @@ class CryptographyNone:
     Base class for symmetric/asymmetric cryptography
     """
 
+    is_encrypted = False
+
     def __init__(self):
         pass
 
@@ -135,6 +143,9 @@ class CryptographyNone:
     def signature(self, data):
         return b""
 
+    def signature_parts(self, parts):
+        return b""
+
     def encrypt(self, data):
         return data
 
@@ -218,6 +229,9 @@ class Cryptography(CryptographyNone):
     def signature(self, data):
         return self.Signer.signature(data)
 
+    def signature_parts(self, parts):
+        return self.Signer.signature_parts(parts)
+
     def vsignature_size(self):
         return self.Verifier.signature_size()
 
@@ -355,6 +369,9 @@ class SignerAesCbc(Signer):
     def signature(self, data):
         return uacrypto.hmac_sha1(self.key, data)
 
+    def signature_parts(self, parts):
+        return uacrypto.hmac_sha1_parts(self.key, parts)
+
 
 class VerifierAesCbc(Verifier):
     def __init__(self, key):
@@ -431,6 +448,9 @@ class SignerHMac256(Signer):
     def signature(self, data):
         return uacrypto.hmac_sha256(self.key, data)
 
+    def signature_parts(self, parts):
+        return uacrypto.hmac_sha256_parts(self.key, parts)
+
 
 class VerifierHMac256(Verifier):
     def __init__(self, key):
@@ -242,14 +242,24 @@ def cipher_decrypt(cipher, data):
 
 
 def hmac_sha1(key, message):
+    return hmac_sha1_parts(key, (message,))
+
+
+def hmac_sha1_parts(key, parts):
     hasher = hmac.HMAC(key, hashes.SHA1(), backend=default_backend())
-    hasher.update(message)
+    for part in parts:
+        hasher.update(part)
     return hasher.finalize()
 
 
 def hmac_sha256(key, message):
+    return hmac_sha256_parts(key, (message,))
+
+
+def hmac_sha256_parts(key, parts):
     hasher = hmac.HMAC(key, hashes.SHA256(), backend=default_backend())
-    hasher.update(message)
+    for part in parts:
+        hasher.update(part)
     return hasher.finalize()
 
 
@@ -4,6 +4,7 @@ import asyncio
 import collections.abc
 import dataclasses
 import inspect
+import itertools
 import logging
 import pickle
 import shelve
@@ -14,7 +15,7 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Generator
+    from collections.abc import Callable, Generator, Iterable, Iterator
 
     from asyncua.ua.uaprotocol_auto import (
         DataTypeAttributes,
@@ -57,6 +58,109 @@ class AttributeValue:
     __repr__ = __str__
 
 
+class NodeReferences:
+    """
+    The references of a node, in insertion order, indexed by ReferenceTypeId and direction,
+    by BrowseName and by target. Iterates, indexes and mutates like the list it replaces,
+    references must not be modified in place once added.
+    """
+
+    def __init__(self, references: Iterable[ua.ReferenceDescription] = ()) -> None:
+        self._counter = 0
+        # insertion counter -> reference, the counters of the indexes keep their references sorted
+        self._refs: dict[int, ua.ReferenceDescription] = {}
+        # (ReferenceTypeId, IsForward), (NamespaceIndex, Name) of BrowseName, (ReferenceTypeId, NodeId, IsForward)
+        self._by_type: dict[tuple[Any, ...], dict[int, None]] = {}
+        self._by_name: dict[tuple[Any, ...], dict[int, None]] = {}
+        self._by_target: dict[tuple[Any, ...], dict[int, None]] = {}
+        self.extend(references)
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def __iter__(self) -> Iterator[ua.ReferenceDescription]:
+        return iter(self._refs.values())
+
+    def __getitem__(self, index: int | slice) -> Any:
+        """
+        Indexing copies the references into a list first, it is O(n), iterate or use the lookups instead.
+        """
+        return list(self._refs.values())[index]
+
+    def __contains__(self, ref: object) -> bool:
+        if not isinstance(ref, ua.ReferenceDescription):
+            return False
+        return ref in self.find(ref.ReferenceTypeId, ref.NodeId, ref.IsForward)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (NodeReferences, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def _keys(self, ref: ua.ReferenceDescription) -> tuple[tuple[Any, ...], tuple[Any, ...], tuple[Any, ...]]:
+        name = ref.BrowseName
+        return (
+            (ref.ReferenceTypeId, ref.IsForward),
+            (name.NamespaceIndex, name.Name) if name is not None else (0, None),
+            (ref.ReferenceTypeId, ref.NodeId, ref.IsForward),
+        )
+
+    def append(self, ref: ua.ReferenceDescription) -> None:
+        self._counter += 1
+        counter = self._counter
+        self._refs[counter] = ref
+        for index, key in zip((self._by_type, self._by_name, self._by_target), self._keys(ref)):
+            index.setdefault(key, {})[counter] = None
+
+    def extend(self, refs: Iterable[ua.ReferenceDescription]) -> None:
+        for ref in refs:
+            self.append(ref)
+
+    def remove(self, ref: ua.ReferenceDescription) -> None:
+        keys = self._keys(ref)
+        for counter in self._by_target.get(keys[2], ()):
+            if self._refs[counter] == ref:
+                break
+        else:
+            raise ValueError(f"{ref} is not in the references")
+        del self._refs[counter]
+        for index, key in zip((self._by_type, self._by_name, self._by_target), keys):
+            counters = index[key]
+            del counters[counter]
+            if not counters:
+                del index[key]
+
+    def clear(self) -> None:
+        self._refs.clear()
+        self._by_type.clear()
+        self._by_name.clear()
+        self._by_target.clear()
+
+    def _select(self, *groups: dict[int, None] | None) -> list[ua.ReferenceDescription]:
+        present = [group for group in groups if group]
+        if len(present) == 1:
+            return [self._refs[counter] for counter in present[0]]
+        return [self._refs[counter] for counter in sorted(itertools.chain.from_iterable(present))]
+
+    def by_reference_types(
+        self, reftypes: Iterable[ua.NodeId], is_forward: bool | None = None
+    ) -> list[ua.ReferenceDescription]:
+        """
+        References of any of `reftypes`, in the given direction or both if `is_forward` is None.
+        """
+        directions = (True, False) if is_forward is None else (is_forward,)
+        return self._select(*(self._by_type.get((reftype, forward)) for reftype in reftypes for forward in directions))
+
+    def by_browse_name(self, name: ua.QualifiedName) -> list[ua.ReferenceDescription]:
+        return self._select(self._by_name.get((name.NamespaceIndex, name.Name)))
+
+    def find(self, reftype: ua.NodeId, nodeid: ua.NodeId, is_forward: bool) -> list[ua.ReferenceDescription]:
+        return self._select(self._by_target.get((reftype, nodeid, is_forward)))
+
+
 class NodeData:
     """
     The class is internal to asyncua and holds all the information about a Node.
@@ -65,9 +169,15 @@ class NodeData:
     def __init__(self, nodeid: ua.NodeId) -> None:
         self.nodeid: "ua.NodeId" = nodeid
         self.attributes: "dict[ua.AttributeIds, AttributeValue]" = {}
-        self.references: "list[ua.ReferenceDescription]" = []
+        self.references: NodeReferences = NodeReferences()
         self.call: "Callable[..., Any] | None" = None
 
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        # address spaces pickled before references were indexed hold a list
+        if isinstance(state.get("references"), list):
+            state["references"] = NodeReferences(state["references"])
+        self.__dict__.update(state)
+
     def __str__(self) -> str:
         return f"NodeData(id:{self.nodeid}, attrs:{self.attributes}, refs:{self.references})"
 
@@ -93,7 +203,9 @@ class AttributeService:
 
     async def write(self, params: ua.WriteParameters, user: User = User(role=UserRole.Admin)) -> list[ua.StatusCode]:
         # self.logger.debug("write %s as user %s", params, user)
-        res: list[ua.StatusCode] = []
+        # None marks the results of the writes done in one batch below
+        res: list[ua.StatusCode | None] = []
+        writes: list[tuple[ua.NodeId, ua.AttributeIds, ua.DataValue]] = []
         for writevalue in params.NodesToWrite:
             if user.role != UserRole.Admin:
                 if writevalue.AttributeId != ua.AttributeIds.Value:
@@ -117,8 +229,57 @@ class AttributeService:
                 )
             else:
                 dv = writevalue.Value
-            res.append(await self._aspace.write_attribute_value(writevalue.NodeId, writevalue.AttributeId, dv))
-        return res
+            res.append(None)
+            writes.append((writevalue.NodeId, writevalue.AttributeId, dv))
+        results = iter(await self._aspace.write_attribute_values(writes))
+        return [status if status is not None else next(results) for status in res]
+
+
+class BrowseContinuationPoints:
+    """
+    The continuation points of the Browse requests of a session: cursors over the references
+    left to return, at most `limit` of them (0 for no limit).
+    https://reference.opcfoundation.org/v104/Core/docs/Part4/7.6/
+    """
+
+    def __init__(self, limit: int = 0) -> None:
+        self.limit = limit
+        self._cursors: dict[bytes, tuple[list[ua.ReferenceDescription], int, int]] = {}
+        self._counter = itertools.count(1)
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    def add(self, references: list[ua.ReferenceDescription], max_references: int) -> bytes | None:
+        """
+        Store the references following the first page, return None if there are too many continuation points.
+        """
+        if self.limit and len(self._cursors) >= self.limit:
+            return None
+        point = next(self._counter).to_bytes(8, "little")
+        self._cursors[point] = (references, max_references, max_references)
+        return point
+
+    def next_page(self, point: bytes) -> tuple[list[ua.ReferenceDescription], bytes | None] | None:
+        """
+        Return the next page of references and the continuation point if more are left,
+        None if the continuation point is unknown.
+        """
+        cursor = self._cursors.pop(point, None)
+        if cursor is None:
+            return None
+        references, offset, max_references = cursor
+        end = offset + max_references
+        if end >= len(references):
+            return references[offset:], None
+        self._cursors[point] = (references, end, max_references)
+        return references[offset:end], point
+
+    def release(self, point: bytes) -> bool:
+        return self._cursors.pop(point, None) is not None
+
+    def clear(self) -> None:
+        self._cursors.clear()
 
 
 class ViewService:
@@ -131,56 +292,101 @@ class ViewService:
         self.logger = logging.getLogger(__name__)
         self._aspace: AddressSpace = aspace
 
-    def browse(self, params: ua.BrowseParameters) -> list[ua.BrowseResult]:
+    def browse(
+        self,
+        params: ua.BrowseParameters,
+        continuation_points: BrowseContinuationPoints | None = None,
+        max_references_per_node: int = 0,
+    ) -> list[ua.BrowseResult]:
+        """
+        Results with more references than RequestedMaxReferencesPerNode, or `max_references_per_node`
+        if lower, are split in pages returned by browse_next(). Without `continuation_points` all
+        references are returned at once.
+        """
         # self.logger.debug("browse %s", params)
+        max_refs = params.RequestedMaxReferencesPerNode
+        if max_references_per_node and (not max_refs or max_refs > max_references_per_node):
+            max_refs = max_references_per_node
         res: list[ua.BrowseResult] = []
         for desc in params.NodesToBrowse:
-            res.append(self._browse(desc))
+            res.append(self._browse(desc, max_refs, continuation_points))
         return res
 
-    def _browse(self, desc: ua.BrowseDescription) -> ua.BrowseResult:
+    def browse_next(
+        self, params: ua.BrowseNextParameters, continuation_points: BrowseContinuationPoints
+    ) -> list[ua.BrowseResult]:
+        res: list[ua.BrowseResult] = []
+        for point in params.ContinuationPoints:
+            result = ua.BrowseResult()
+            if params.ReleaseContinuationPoints:
+                if not continuation_points.release(point):
+                    result.StatusCode = ua.StatusCode(ua.StatusCodes.BadContinuationPointInvalid)
+            else:
+                page = continuation_points.next_page(point)
+                if page is None:
+                    result.StatusCode = ua.StatusCode(ua.StatusCodes.BadContinuationPointInvalid)
+                else:
+                    result.References, result.ContinuationPoint = page
+            res.append(result)
+        return res
+
+    def _browse(
+        self,
+        desc: ua.BrowseDescription,
+        max_refs: int = 0,
+        continuation_points: BrowseContinuationPoints | None = None,
+    ) -> ua.BrowseResult:
         res = ua.BrowseResult()
         if desc.NodeId not in self._aspace:
             res.StatusCode = ua.StatusCode(ua.StatusCodes.BadNodeIdInvalid)
             return res
         node = self._aspace[desc.NodeId]
-        for ref in node.references:
-            if not self._is_suitable_ref(desc, ref):
+        for ref in self._candidate_refs(node, desc):
+            if desc.NodeClassMask and ((desc.NodeClassMask & ref.NodeClass) == 0):
                 continue
             res.References.append(ref)
+        if continuation_points is not None and max_refs and len(res.References) > max_refs:
+            point = continuation_points.add(res.References, max_refs)
+            if point is None:
+                res.References = []
+                res.StatusCode = ua.StatusCode(ua.StatusCodes.BadNoContinuationPoints)
+                return res
+            res.References = res.References[:max_refs]
+            res.ContinuationPoint = point
         return res
 
-    def _is_suitable_ref(self, desc: ua.BrowseDescription, ref: ua.ReferenceDescription) -> bool:
-        if not self._suitable_direction(desc.BrowseDirection, ref.IsForward):
-            # self.logger.debug("%s is not suitable due to direction", ref)
-            return False
-        if not self._suitable_reftype(desc.ReferenceTypeId, ref.ReferenceTypeId, desc.IncludeSubtypes):
-            # self.logger.debug("%s is not suitable due to type", ref)
-            return False
-        if desc.NodeClassMask and ((desc.NodeClassMask & ref.NodeClass) == 0):
-            # self.logger.debug("%s is not suitable due to class", ref)
-            return False
-        # self.logger.debug("%s is a suitable ref for desc %s", ref, desc)
-        return True
-
-    def _suitable_reftype(self, ref1: ua.NodeId, ref2: ua.NodeId, subtypes: bool) -> bool:
-        if ref1 == ua.NodeId(ua.ObjectIds.Null):
+    def _candidate_refs(self, node: NodeData, desc: ua.BrowseDescription) -> Iterable[ua.ReferenceDescription]:
+        """
+        References of the node matching the direction and reference type of `desc`, from the indexes of the node.
+        """
+        if desc.ReferenceTypeId == ua.NodeId(ua.ObjectIds.Null):
             # If ReferenceTypeId is not specified in the BrowseDescription,
             # all References are returned and includeSubtypes is ignored.
-            return True
-        if ref1 == ref2:
-            return True
-        if subtypes and ref2 in self._get_sub_ref(ref1):
-            return True
-        return False
+            return [ref for ref in node.references if self._suitable_direction(desc.BrowseDirection, ref.IsForward)]
+        if desc.BrowseDirection == ua.BrowseDirection.Both:
+            is_forward = None
+        elif desc.BrowseDirection in (ua.BrowseDirection.Forward, ua.BrowseDirection.Inverse):
+            is_forward = desc.BrowseDirection == ua.BrowseDirection.Forward
+        else:
+            return []
+        reftypes = self._reference_types(desc.ReferenceTypeId, desc.IncludeSubtypes)
+        return node.references.by_reference_types(reftypes, is_forward)
+
+    def _reference_types(self, reftype: ua.NodeId, subtypes: bool) -> dict[ua.NodeId, None]:
+        """
+        The reference type and, if `subtypes` is set, all its subtypes.
+        """
+        reftypes = {reftype: None}
+        if subtypes:
+            reftypes.update(dict.fromkeys(self._get_sub_ref(reftype)))
+        return reftypes
 
     def _get_sub_ref(self, ref: ua.NodeId) -> Generator[ua.NodeId, None, None]:
         nodedata = self._aspace.get(ref)
         if nodedata is not None:
-            for ref_desc in nodedata.references:
-                if ref_desc.ReferenceTypeId == ua.NodeId(ua.ObjectIds.HasSubtype) and ref_desc.IsForward:
-                    yield ref_desc.NodeId
-                    yield from self._get_sub_ref(ref_desc.NodeId)
+            for ref_desc in nodedata.references.by_reference_types([ua.NodeId(ua.ObjectIds.HasSubtype)], True):
+                yield ref_desc.NodeId
+                yield from self._get_sub_ref(ref_desc.NodeId)
 
     def _suitable_direction(self, direction: ua.BrowseDirection, isforward: bool) -> bool:
         if direction == ua.BrowseDirection.Both:
@@ -237,13 +443,15 @@ class ViewService:
     def _find_elements_in_node(self, el: ua.RelativePathElement, nodeid: ua.NodeId) -> list[ua.NodeId]:
         nodedata: NodeData = self._aspace[nodeid]
         nodeids: list[ua.NodeId] = []
-        for ref in nodedata.references:
-            if ref.BrowseName != el.TargetName:
-                continue
+        reftypes: dict[ua.NodeId, None] | None = None
+        for ref in nodedata.references.by_browse_name(el.TargetName):
             if ref.IsForward == el.IsInverse:
                 continue
-            if not self._suitable_reftype(el.ReferenceTypeId, ref.ReferenceTypeId, el.IncludeSubtypes):
-                continue
+            if el.ReferenceTypeId != ua.NodeId(ua.ObjectIds.Null):
+                if reftypes is None:
+                    reftypes = self._reference_types(el.ReferenceTypeId, el.IncludeSubtypes)
+                if ref.ReferenceTypeId not in reftypes:
+                    continue
             nodeids.append(ref.NodeId)
         return nodeids
 
@@ -315,19 +523,19 @@ class NodeManagementService:
 
         if item.ParentNodeId in self._aspace:
             # check properties
-            for ref in self._aspace[item.ParentNodeId].references:
-                if ref.ReferenceTypeId == ua.NodeId(ua.ObjectIds.HasProperty):
-                    if item.BrowseName.Name == ref.BrowseName.Name:
-                        self.logger.warning(
-                            "AddNodesItem: Requested Browsename %s"
-                            " already exists in Parent Node. ParentID:%s --- "
-                            "ItemId:%s",
-                            item.BrowseName.Name,
-                            item.ParentNodeId,
-                            item.RequestedNewNodeId,
-                        )
-                        result.StatusCode = ua.StatusCode(ua.StatusCodes.BadBrowseNameDuplicated)
-                        return result
+            parent_refs = self._aspace[item.ParentNodeId].references
+            for ref in parent_refs.by_reference_types([ua.NodeId(ua.ObjectIds.HasProperty)]):
+                if item.BrowseName.Name == ref.BrowseName.Name:
+                    self.logger.warning(
+                        "AddNodesItem: Requested Browsename %s"
+                        " already exists in Parent Node. ParentID:%s --- "
+                        "ItemId:%s",
+                        item.BrowseName.Name,
+                        item.ParentNodeId,
+                        item.RequestedNewNodeId,
+                    )
+                    result.StatusCode = ua.StatusCode(ua.StatusCodes.BadBrowseNameDuplicated)
+                    return result
 
         if not item.TypeDefinition.is_null() and item.TypeDefinition not in self._aspace:
             result.StatusCode = ua.StatusCode(ua.StatusCodes.BadTypeDefinitionInvalid)
@@ -368,14 +576,13 @@ class NodeManagementService:
         self._add_nodeattributes(item.NodeAttributes, nodedata, add_timestamps)
 
     def _add_unique_reference(self, nodedata: NodeData, desc: ua.ReferenceDescription) -> ua.StatusCode:
-        for r in nodedata.references:
-            if r.ReferenceTypeId == desc.ReferenceTypeId and r.NodeId == desc.NodeId:
-                if r.IsForward != desc.IsForward:
-                    self.logger.error("Cannot add conflicting reference %s ", str(desc))
-                    return ua.StatusCode(ua.StatusCodes.BadReferenceNotAllowed)
-                break  # ref already exists
-        else:
-            nodedata.references.append(desc)
+        refs = nodedata.references
+        if refs.find(desc.ReferenceTypeId, desc.NodeId, desc.IsForward):
+            return ua.StatusCode()  # ref already exists
+        if refs.find(desc.ReferenceTypeId, desc.NodeId, not desc.IsForward):
+            self.logger.error("Cannot add conflicting reference %s ", str(desc))
+            return ua.StatusCode(ua.StatusCodes.BadReferenceNotAllowed)
+        refs.append(desc)
         return ua.StatusCode()
 
     def _add_ref_from_parent(self, nodedata: NodeData, item: ua.AddNodesItem, parentdata: NodeData) -> None:
@@ -428,7 +635,7 @@ class NodeManagementService:
 
         if item.DeleteTargetReferences:
             for elem in self._aspace.keys():
-                for rdesc in self._aspace[elem].references[:]:
+                for rdesc in list(self._aspace[elem].references):
                     if rdesc.NodeId == item.NodeId:
                         self._aspace[elem].references.remove(rdesc)
 
@@ -506,11 +713,10 @@ class NodeManagementService:
             source, target, forward = item.TargetNodeId, item.SourceNodeId, not item.IsForward
         else:
             source, target, forward = item.SourceNodeId, item.TargetNodeId, item.IsForward
-        for rdesc in self._aspace[source].references:
-            if rdesc.NodeId == target and rdesc.ReferenceTypeId == item.ReferenceTypeId:
-                if rdesc.IsForward == forward:
-                    self._aspace[source].references.remove(rdesc)
-                    return ua.StatusCode()
+        refs = self._aspace[source].references
+        for rdesc in refs.find(item.ReferenceTypeId, target, forward):
+            refs.remove(rdesc)
+            return ua.StatusCode()
         return ua.StatusCode(ua.StatusCodes.BadNotFound)
 
     def _delete_reference(self, item: ua.DeleteReferencesItem, user: User) -> ua.StatusCode:
@@ -652,6 +858,7 @@ class AddressSpace:
         self._nodes: dict[ua.NodeId, NodeData] = {}
         self._datachange_callback_counter = 200
         self._handle_to_attribute_map: dict[int, tuple[ua.NodeId, ua.AttributeIds]] = {}
+        self._datachange_batch_callbacks: dict[int, Callable[[list[tuple[int, ua.DataValue]]], Any]] = {}
         self._default_idx = 2
         self._nodeid_counter = {0: 20000, 1: 2000}
 
@@ -808,33 +1015,77 @@ class AddressSpace:
         self, nodeid: ua.NodeId, attr: ua.AttributeIds, value: ua.DataValue
     ) -> ua.StatusCode:
         # self.logger.debug("set attr val: %s %s %s", nodeid, attr, value)
+        status, attval, value = self._set_attribute_value(nodeid, attr, value)
+        if attval is None:
+            return status
+
+        for k, v in attval.datachange_callbacks.items():
+            try:
+                await v(k, value)
+            except Exception as ex:
+                self.logger.exception("Error calling datachange callback %s, %s, %s", k, v, ex)
+
+        return status
+
+    async def write_attribute_values(
+        self, writes: Iterable[tuple[ua.NodeId, ua.AttributeIds, ua.DataValue]]
+    ) -> list[ua.StatusCode]:
+        """
+        Write several attributes, then run their datachange callbacks.
+        Callbacks registered with a batch callback get all their changes in a single call.
+        """
+        results: list[ua.StatusCode] = []
+        changes: list[tuple[AttributeValue, ua.DataValue]] = []
+        for nodeid, attr, value in writes:
+            status, attval, value = self._set_attribute_value(nodeid, attr, value)
+            results.append(status)
+            if attval is not None and attval.datachange_callbacks:
+                changes.append((attval, value))
+
+        batches: dict[Callable[[list[tuple[int, ua.DataValue]]], Any], list[tuple[int, ua.DataValue]]] = {}
+        for attval, value in changes:
+            for k, v in list(attval.datachange_callbacks.items()):
+                batch_callback = self._datachange_batch_callbacks.get(k)
+                if batch_callback is not None:
+                    batches.setdefault(batch_callback, []).append((k, value))
+                    continue
+                try:
+                    await v(k, value)
+                except Exception as ex:
+                    self.logger.exception("Error calling datachange callback %s, %s, %s", k, v, ex)
+        for batch_callback, batch in batches.items():
+            try:
+                await batch_callback(batch)
+            except Exception as ex:
+                self.logger.exception("Error calling datachange batch callback %s, %s", batch_callback, ex)
+        return results
+
+    def _set_attribute_value(
+        self, nodeid: ua.NodeId, attr: ua.AttributeIds, value: ua.DataValue
+    ) -> tuple[ua.StatusCode, AttributeValue | None, ua.DataValue]:
+        """
+        Store a value without running the datachange callbacks, return the written attribute on success.
+        """
         node = self._nodes.get(nodeid, None)
         if node is None:
-            return ua.StatusCode(ua.StatusCodes.BadNodeIdUnknown)
+            return ua.StatusCode(ua.StatusCodes.BadNodeIdUnknown), None, value
         attval = node.attributes.get(attr, None)
         if attval is None:
-            return ua.StatusCode(ua.StatusCodes.BadAttributeIdInvalid)
+            return ua.StatusCode(ua.StatusCodes.BadAttributeIdInvalid), None, value
         if value.StatusCode is not None and value.StatusCode.is_bad():
             # https://reference.opcfoundation.org/v104/Core/docs/Part4/7.7.1/
             # If the StatusCode indicates an error then the value is to be ignored and the Server shall set it to null.
             value = dataclasses.replace(value, Value=ua.Variant(None, ua.VariantType.Null))
         elif not self._is_expected_variant_type(value, attval, node):
             # Only check datatype if no bad StatusCode is set
-            return ua.StatusCode(ua.StatusCodes.BadTypeMismatch)
+            return ua.StatusCode(ua.StatusCodes.BadTypeMismatch), None, value
 
         if attval.value_setter is not None:
             attval.value_setter(node, attr, value)
         else:
             attval.value = value
             attval.value_callback = None
-
-        for k, v in attval.datachange_callbacks.items():
-            try:
-                await v(k, value)
-            except Exception as ex:
-                self.logger.exception("Error calling datachange callback %s, %s, %s", k, v, ex)
-
-        return ua.StatusCode()
+        return ua.StatusCode(), attval, value
 
     def _is_expected_variant_type(self, value: ua.DataValue, attval: AttributeValue, node: NodeData) -> bool:
         if attval.value is None or attval.value.Value is None:
@@ -892,6 +1143,13 @@ class AddressSpace:
 
         return ua.StatusCode()
 
+    def has_attribute_value_callback(self, nodeid: ua.NodeId, attr: ua.AttributeIds) -> bool:
+        node = self._nodes.get(nodeid, None)
+        if node is None:
+            return False
+        attval = node.attributes.get(attr, None)
+        return attval is not None and attval.value_callback is not None
+
     def set_attribute_value_setter(
         self,
         nodeid: ua.NodeId,
@@ -908,8 +1166,17 @@ class AddressSpace:
         return ua.StatusCode()
 
     def add_datachange_callback(
-        self, nodeid: ua.NodeId, attr: ua.AttributeIds, callback: Callable
+        self,
+        nodeid: ua.NodeId,
+        attr: ua.AttributeIds,
+        callback: Callable,
+        batch_callback: Callable[[list[tuple[int, ua.DataValue]]], Any] | None = None,
     ) -> tuple[ua.StatusCode, int]:
+        """
+        Register `callback(handle, value)` for writes of the attribute. Writes done with
+        write_attribute_values() call `batch_callback([(handle, value), ...])` instead when given,
+        once for all changes with the same batch callback.
+        """
         # self.logger.debug("set attr callback: %s %s %s", nodeid, attr, callback)
         if nodeid not in self._nodes:
             return ua.StatusCode(ua.StatusCodes.BadNodeIdUnknown), 0
@@ -921,9 +1188,12 @@ class AddressSpace:
         handle = self._datachange_callback_counter
         attval.datachange_callbacks[handle] = callback
         self._handle_to_attribute_map[handle] = (nodeid, attr)
+        if batch_callback is not None:
+            self._datachange_batch_callbacks[handle] = batch_callback
         return ua.StatusCode(), handle
 
     def delete_datachange_callback(self, handle: int) -> None:
+        self._datachange_batch_callbacks.pop(handle, None)
         if handle in self._handle_to_attribute_map:
             nodeid, attr = self._handle_to_attribute_map.pop(handle)
             self._nodes[nodeid].attributes[attr].datachange_callbacks.pop(handle)
@@ -9,7 +9,7 @@ import logging
 from typing import Any
 
 from ..common.connection import TransportLimits
-from ..common.utils import Buffer, NotEnoughData
+from ..common.utils import Buffer, NotEnoughData, ReceiveBuffer
 from ..ua.ua_binary import header_from_binary
 from .internal_server import InternalServer
 from .uaprocessor import UaProcessor
@@ -17,7 +17,7 @@ from .uaprocessor import UaProcessor
 _logger = logging.getLogger(__name__)
 
 
-class OPCUAProtocol(asyncio.Protocol):
+class OPCUAProtocol(asyncio.BufferedProtocol):
     """
     Instantiated for every connection.
     """
@@ -33,7 +33,7 @@ class OPCUAProtocol(asyncio.Protocol):
         self.peer_name: Any = None
         self.transport: asyncio.Transport | None = None
         self.processor: UaProcessor | None = None
-        self._buffer = b""
+        self._buffer = ReceiveBuffer()
         self.iserver: InternalServer = iserver
         self.policies = policies
         self.clients = clients
@@ -107,12 +107,22 @@ class OPCUAProtocol(asyncio.Protocol):
         except Exception:
             _logger.exception("activation watchdog crashed")
 
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._buffer.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self._buffer.buffer_updated(nbytes)
+        self._process_received_data()
+
     def data_received(self, data: bytes) -> None:
-        self._buffer += data
+        self._buffer.extend(data)
+        self._process_received_data()
+
+    def _process_received_data(self) -> None:
         # try to parse the incoming data
         while self._buffer:
             try:
-                buf = Buffer(self._buffer)
+                buf = self._buffer.peek()
                 try:
                     header = header_from_binary(buf)
                 except NotEnoughData:
@@ -131,8 +141,9 @@ class OPCUAProtocol(asyncio.Protocol):
                     )
                     return
                 # we have a complete message
+                data = self._buffer.consume(header.header_size + header.body_size)
                 try:
-                    self.messages.put_nowait((header, buf))
+                    self.messages.put_nowait((header, Buffer(data, header.header_size)))
                 except asyncio.QueueFull:
                     _logger.warning(
                         "Inbound queue full for %s (max=%s); closing connection",
@@ -142,7 +153,6 @@ class OPCUAProtocol(asyncio.Protocol):
                     if self.transport is not None:
                         self.transport.close()
                     return
-                self._buffer = self._buffer[(header.header_size + header.body_size) :]
             except Exception:
                 _logger.exception("Exception raised while parsing message from client")
                 return
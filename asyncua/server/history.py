@@ -1,22 +1,29 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
 from asyncua import ua
 from asyncua.common.subscription import Subscription, SubscriptionHandler
 
-from ..common.utils import Buffer
+from ..common.utils import Buffer, NotEnoughData
+from .history_aggregates import AGGREGATES, AggregateEngine, ProcessingIntervals, is_usable, utc
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
     from asyncua.common.events import Event
     from asyncua.common.node import Node
 
     from .internal_server import InternalServer
 
 _logger = logging.getLogger(__name__)
+# smallest step between timestamps of the storages, used to read the values strictly before or after a time
+_RESOLUTION = timedelta(microseconds=1)
+_EARLIEST = ua.get_win_epoch() + _RESOLUTION
 
 
 class UaNodeAlreadyHistorizedError(ua.UaError):
@@ -59,7 +66,7 @@ class HistoryStorageInterface:
         start: datetime | None,
         end: datetime | None,
         nb_values: int,
-    ) -> tuple[list[ua.DataValue], datetime | None]:
+    ) -> tuple[list[ua.DataValue], datetime | bytes | None]:
         """
         Called when a client make a history read request for a node
         if start or end is missing then nb_values is used to limit query
@@ -67,9 +74,41 @@ class HistoryStorageInterface:
         Start time and end time are inclusive
         Returns a list of DataValues and a continuation point which
         is None if all nodes are read or the SourceTimeStamp of the last rejected DataValue
+        or a backend specific continuation point, see continue_node_history
         """
         raise NotImplementedError
 
+    async def continue_node_history(
+        self,
+        node_id: ua.NodeId,
+        continuation_point: bytes,
+        start: datetime | None,
+        end: datetime | None,
+        nb_values: int,
+    ) -> tuple[list[ua.DataValue], datetime | bytes | None]:
+        """
+        Called when a client continues a history read with the continuation point of a previous read
+        By default the continuation point is the SourceTimeStamp returned by read_node_history
+        and the read starts over from it. Backends can instead return their own continuation points
+        as bytes from read_node_history and resume from them here.
+        """
+        starttime = ua.ua_binary.Primitives.DateTime.unpack(Buffer(continuation_point))
+        return await self.read_node_history(node_id, starttime, end, nb_values)
+
+    async def read_nodes_history(
+        self,
+        node_ids: list[ua.NodeId],
+        start: datetime | None,
+        end: datetime | None,
+        nb_values: int,
+    ) -> Mapping[ua.NodeId, tuple[list[ua.DataValue], datetime | bytes | None]]:
+        """
+        Called when a client reads the history of several nodes over the same time range
+        Returns the result of read_node_history for each node, by default the nodes are read one by one.
+        Backends able to read many nodes at once override it.
+        """
+        return {node_id: await self.read_node_history(node_id, start, end, nb_values) for node_id in node_ids}
+
     async def new_historized_event(
         self,
         source_id: ua.NodeId,
@@ -114,16 +153,84 @@ class HistoryStorageInterface:
         raise NotImplementedError
 
 
+_T = TypeVar("_T")
+
+
+class _TimeSeries(Generic[_T]):
+    """
+    Items sorted by timestamp in parallel lists searched with bisect. Items dropped from the front
+    are only skipped by an offset and deleted once they make up half of the lists, so retention is
+    amortized O(1) per item, like a ring buffer which still supports range lookups.
+    """
+
+    def __init__(self) -> None:
+        self.times: list[datetime] = []
+        self.items: list[_T] = []
+        self.first = 0
+
+    def __len__(self) -> int:
+        return len(self.times) - self.first
+
+    def add(self, timestamp: datetime, item: _T) -> None:
+        if not self.times or timestamp >= self.times[-1]:
+            self.times.append(timestamp)
+            self.items.append(item)
+        else:
+            # late values are inserted after the values sharing their timestamp
+            index = bisect.bisect_right(self.times, timestamp, self.first)
+            self.times.insert(index, timestamp)
+            self.items.insert(index, item)
+
+    def drop_before(self, timestamp: datetime) -> None:
+        self.first = bisect.bisect_left(self.times, timestamp, self.first)
+        self._compact()
+
+    def keep_last(self, count: int) -> None:
+        if len(self) > count:
+            self.first = len(self.times) - count
+            self._compact()
+
+    def _compact(self) -> None:
+        if self.first * 2 >= len(self.times):
+            del self.times[: self.first]
+            del self.items[: self.first]
+            self.first = 0
+
+    def index(self, timestamp: datetime, right: bool = False) -> int:
+        if right:
+            return bisect.bisect_right(self.times, timestamp, self.first)
+        return bisect.bisect_left(self.times, timestamp, self.first)
+
+    def select(self, start: datetime | None, end: datetime | None) -> tuple[int, int, bool]:
+        """
+        The index range and order of the items a history read of `start` and `end` returns.
+        """
+        epoch = ua.get_win_epoch()
+        if start is None:
+            start = epoch
+        if end is None:
+            end = epoch
+        if start == epoch:
+            return self.first, len(self.times), False
+        if end == epoch:
+            return self.index(start), len(self.times), True
+        if start > end:
+            return self.index(end), self.index(start, right=True), False
+        return self.index(start), self.index(end, right=True), True
+
+
 class HistoryDict(HistoryStorageInterface):
     """
     Very minimal history backend storing data in memory using a Python dictionary
+    Values and events of each node are kept sorted by timestamp, reads are range lookups.
+    Continuation points of data change reads are positions in the values of the node.
     """
 
     def __init__(self, max_history_data_response_size: int = 10000) -> None:
         self.max_history_data_response_size = max_history_data_response_size
-        self._datachanges: dict[ua.NodeId, list[ua.DataValue]] = {}
+        self._datachanges: dict[ua.NodeId, _TimeSeries[ua.DataValue]] = {}
         self._datachanges_period: dict[ua.NodeId, tuple[timedelta | None, int]] = {}
-        self._events: dict[ua.NodeId, list[Event]] = {}
+        self._events: dict[ua.NodeId, _TimeSeries[Event]] = {}
         self._events_periods: dict[ua.NodeId, tuple[timedelta | None, int]] = {}
 
     async def init(self) -> None:
@@ -132,19 +239,18 @@ class HistoryDict(HistoryStorageInterface):
     async def new_historized_node(self, node_id: ua.NodeId, period: timedelta | None, count: int = 0) -> None:
         if node_id in self._datachanges:
             raise UaNodeAlreadyHistorizedError(node_id)
-        self._datachanges[node_id] = []
+        self._datachanges[node_id] = _TimeSeries()
         self._datachanges_period[node_id] = period, count
 
     async def save_node_value(self, node_id: ua.NodeId, datavalue: ua.DataValue) -> None:
         data = self._datachanges[node_id]
         period, count = self._datachanges_period[node_id]
-        data.append(datavalue)
         now = datetime.now(timezone.utc)
+        data.add(datavalue.SourceTimestamp or datavalue.ServerTimestamp or now, datavalue)
         if period:
-            while len(data) and now - data[0].SourceTimestamp > period:  # type: ignore[operator]
-                data.pop(0)
-        if count and len(data) > count:
-            data.pop(0)
+            data.drop_before(now - period)
+        if count:
+            data.keep_last(count)
 
     async def read_node_history(
         self,
@@ -152,31 +258,66 @@ class HistoryDict(HistoryStorageInterface):
         start: datetime | None,
         end: datetime | None,
         nb_values: int,
-    ) -> tuple[list[ua.DataValue], datetime | None]:
-        cont = None
-        if node_id not in self._datachanges:
-            _logger.warning("Error attempt to read history for a node which is not historized")
-            return [], cont
-        if start is None:
-            start = ua.get_win_epoch()
-        if end is None:
-            end = ua.get_win_epoch()
-        if start == ua.get_win_epoch():
-            results = [dv for dv in reversed(self._datachanges[node_id]) if start <= dv.SourceTimestamp]  # type: ignore[operator]
-        elif end == ua.get_win_epoch():
-            results = [dv for dv in self._datachanges[node_id] if start <= dv.SourceTimestamp]  # type: ignore[operator]
-        elif start > end:
-            results = [dv for dv in reversed(self._datachanges[node_id]) if end <= dv.SourceTimestamp <= start]  # type: ignore[operator]
+    ) -> tuple[list[ua.DataValue], datetime | bytes | None]:
+        return self._read_datachanges(node_id, start, end, nb_values)
 
-        else:
-            results = [dv for dv in self._datachanges[node_id] if start <= dv.SourceTimestamp <= end]  # type: ignore[operator]
-
-        if nb_values and len(results) > nb_values:
-            results = results[:nb_values]
+    async def continue_node_history(
+        self,
+        node_id: ua.NodeId,
+        continuation_point: bytes,
+        start: datetime | None,
+        end: datetime | None,
+        nb_values: int,
+    ) -> tuple[list[ua.DataValue], datetime | bytes | None]:
+        buf = Buffer(continuation_point)
+        timestamp = ua.ua_binary.Primitives.DateTime.unpack(buf)
+        offset = ua.ua_binary.Primitives.UInt32.unpack(buf)
+        return self._read_datachanges(node_id, start, end, nb_values, (timestamp, offset))
 
-        if len(results) > self.max_history_data_response_size:
-            cont = results[self.max_history_data_response_size].SourceTimestamp
-            results = results[: self.max_history_data_response_size]
+    def _read_datachanges(
+        self,
+        node_id: ua.NodeId,
+        start: datetime | None,
+        end: datetime | None,
+        nb_values: int,
+        resume: tuple[datetime, int] | None = None,
+    ) -> tuple[list[ua.DataValue], bytes | None]:
+        """
+        The continuation point is the timestamp of the first value not returned and its position
+        among the values sharing that timestamp, so values with colliding timestamps are neither
+        repeated nor skipped and values dropped by retention meanwhile do not shift it.
+        """
+        data = self._datachanges.get(node_id)
+        if data is None:
+            _logger.warning("Error attempt to read history for a node which is not historized")
+            return [], None
+        lo, hi, forward = data.select(start, end)
+        if resume is not None:
+            timestamp, offset = resume
+            if forward:
+                lo = max(lo, data.index(timestamp) + offset)
+            else:
+                hi = min(hi, data.index(timestamp, right=True) - offset)
+        available = max(hi - lo, 0)
+        if nb_values:
+            available = min(available, nb_values)
+        size = min(available, self.max_history_data_response_size)
+        if forward:
+            results = data.items[lo : lo + size]
+        else:
+            results = data.items[hi - size : hi][::-1]
+        if size == available:
+            return results, None
+        # position of the first value left out
+        if forward:
+            index = lo + size
+            timestamp = data.times[index]
+            offset = index - data.index(timestamp)
+        else:
+            index = hi - size - 1
+            timestamp = data.times[index]
+            offset = data.index(timestamp, right=True) - 1 - index
+        cont = ua.ua_binary.Primitives.DateTime.pack(timestamp) + ua.ua_binary.Primitives.UInt32.pack(offset)
         return results, cont
 
     async def new_historized_event(  # type: ignore[override]
@@ -184,22 +325,20 @@ class HistoryDict(HistoryStorageInterface):
     ) -> None:
         if source_id in self._events:
             raise UaNodeAlreadyHistorizedError(source_id)
-        self._events[source_id] = []
+        self._events[source_id] = _TimeSeries()
         self._events_periods[source_id] = period, count
 
     async def save_event(self, event: Event) -> None:
         if event.emitting_node not in self._events:
-            self._events[event.emitting_node] = []
-        evts = self._events[event.emitting_node]
+            self._events[event.emitting_node] = _TimeSeries()
         evts = self._events[event.emitting_node]
-        evts.append(event)
+        evts.add(event.Time, event)  # type: ignore[attr-defined]
         period, count = self._events_periods[event.emitting_node]
         now = datetime.now(timezone.utc)
         if period:
-            while len(evts) and now - evts[0].Time > period:  # type: ignore[attr-defined,operator]
-                evts.pop(0)
-        if count and len(evts) > count:
-            evts.pop(0)
+            evts.drop_before(now - period)
+        if count:
+            evts.keep_last(count)
 
     async def read_event_history(
         self,
@@ -216,22 +355,12 @@ class HistoryDict(HistoryStorageInterface):
                 source_id,
             )
             return [], cont
-        if start is None:
-            start = ua.get_win_epoch()
-        if end is None:
-            end = ua.get_win_epoch()
-        if start == ua.get_win_epoch():
-            results = [ev for ev in reversed(self._events[source_id]) if start <= ev.Time]  # type: ignore[attr-defined,operator]
-        elif end == ua.get_win_epoch():
-            results = [ev for ev in self._events[source_id] if start <= ev.Time]  # type: ignore[attr-defined,operator]
-        elif start > end:
-            results = [ev for ev in reversed(self._events[source_id]) if end <= ev.Time <= start]  # type: ignore[attr-defined,operator]
-
-        else:
-            results = [ev for ev in self._events[source_id] if start <= ev.Time <= end]  # type: ignore[attr-defined,operator]
-
-        if nb_values and len(results) > nb_values:
-            results = results[:nb_values]
+        evts = self._events[source_id]
+        lo, hi, forward = evts.select(start, end)
+        if nb_values and hi - lo > nb_values:
+            # only slice the events returned
+            lo, hi = (lo, lo + nb_values) if forward else (hi - nb_values, hi)
+        results = evts.items[lo:hi] if forward else evts.items[lo:hi][::-1]
 
         if len(results) > self.max_history_data_response_size:
             cont = results[self.max_history_data_response_size].Time  # type: ignore[attr-defined]
@@ -349,15 +478,34 @@ class HistoryManager:
         """
         results = []
 
-        for rv in params.NodesToRead:
-            res = await self._read_history(params.HistoryReadDetails, rv)
+        details = params.HistoryReadDetails
+        if isinstance(details, ua.ReadProcessedDetails) and len(details.AggregateType) != len(params.NodesToRead):
+            status = ua.StatusCode(ua.StatusCodes.BadAggregateListMismatch)
+            return [ua.HistoryReadResult(StatusCode=status) for _ in params.NodesToRead]
+        pages: Mapping[ua.NodeId, tuple[list[ua.DataValue], datetime | bytes | None]] = {}
+        if isinstance(details, ua.ReadRawModifiedDetails):
+            # the first page of all the nodes is read at once, continued reads are per node
+            node_ids = list(dict.fromkeys(rv.NodeId for rv in params.NodesToRead if not rv.ContinuationPoint))
+            if node_ids:
+                pages = await self.storage.read_nodes_history(
+                    node_ids, details.StartTime, details.EndTime, details.NumValuesPerNode
+                )
+        for index, rv in enumerate(params.NodesToRead):
+            page = None if rv.ContinuationPoint else pages.get(rv.NodeId)
+            res = await self._read_history(details, rv, index, page)
             results.append(res)
         return results
 
-    async def _read_history(self, details: Any, rv: ua.HistoryReadValueId) -> ua.HistoryReadResult:
+    async def _read_history(
+        self,
+        details: Any,
+        rv: ua.HistoryReadValueId,
+        index: int = 0,
+        page: tuple[list[ua.DataValue], datetime | bytes | None] | None = None,
+    ) -> ua.HistoryReadResult:
         """
         determine if the history read is for a data changes or events;
-        then read the history for that node
+        then read the history for that node, unless its data changes were already read into `page`
         """
         result = ua.HistoryReadResult()
         if isinstance(details, ua.ReadRawModifiedDetails):
@@ -366,7 +514,7 @@ class HistoryManager:
                 # we do not support modified history by design so we return what we have
             else:
                 result.HistoryData = ua.HistoryData()
-            dv, cont = await self._read_datavalue_history(rv, details)
+            dv, cont = await self._read_datavalue_history(rv, details, page)
             result.HistoryData.DataValues = dv
             result.ContinuationPoint = cont
 
@@ -378,29 +526,146 @@ class HistoryManager:
             result.HistoryData.Events = ev
             result.ContinuationPoint = cont
 
+        elif isinstance(details, ua.ReadProcessedDetails):
+            result.HistoryData = ua.HistoryData()
+            (
+                result.StatusCode,
+                result.HistoryData.DataValues,
+                result.ContinuationPoint,
+            ) = await self._read_processed_history(rv, details, details.AggregateType[index])
+
+        elif isinstance(details, ua.ReadAtTimeDetails):
+            result.HistoryData = ua.HistoryData()
+            result.StatusCode, result.HistoryData.DataValues = await self._read_at_time_history(rv, details)
+
         else:
             # we do not currently support the other types, clients can process data themselves
             result.StatusCode = ua.StatusCode(ua.StatusCodes.BadNotImplemented)
         return result
 
     async def _read_datavalue_history(
-        self, rv: ua.HistoryReadValueId, details: ua.ReadRawModifiedDetails
+        self,
+        rv: ua.HistoryReadValueId,
+        details: ua.ReadRawModifiedDetails,
+        page: tuple[list[ua.DataValue], datetime | bytes | None] | None = None,
     ) -> tuple[list[ua.DataValue], Any]:
-        starttime = details.StartTime
-        if rv.ContinuationPoint:
+        if page is not None:
+            dv, cont = page
+        elif rv.ContinuationPoint:
             # Spec says we should ignore details if cont point is present
             # but they also say we can use cont point as timestamp to enable stateless
             # implementation. This is contradictory, so we assume details is
             # send correctly with continuation point
-            starttime = ua.ua_binary.Primitives.DateTime.unpack(Buffer(rv.ContinuationPoint))
-
-        dv, cont = await self.storage.read_node_history(rv.NodeId, starttime, details.EndTime, details.NumValuesPerNode)
-        if cont:
+            dv, cont = await self.storage.continue_node_history(
+                rv.NodeId, rv.ContinuationPoint, details.StartTime, details.EndTime, details.NumValuesPerNode
+            )
+        else:
+            dv, cont = await self.storage.read_node_history(
+                rv.NodeId, details.StartTime, details.EndTime, details.NumValuesPerNode
+            )
+        if isinstance(cont, datetime):
             cont = ua.ua_binary.Primitives.DateTime.pack(cont)
         # rv.IndexRange
         # rv.DataEncoding # xml or binary, seems spec say we can ignore that one
         return dv, cont
 
+    async def _read_processed_history(
+        self, rv: ua.HistoryReadValueId, details: ua.ReadProcessedDetails, aggregate_type: ua.NodeId
+    ) -> tuple[ua.StatusCode, list[ua.DataValue], bytes | None]:
+        """
+        Compute the aggregate of the node for each processing interval from its raw history.
+        At most max_history_data_response_size values are returned at once, the continuation point
+        is the position of the next processing interval.
+        """
+        aggregate = AGGREGATES.get(aggregate_type.Identifier) if aggregate_type.NamespaceIndex == 0 else None
+        if aggregate is None:
+            return ua.StatusCode(ua.StatusCodes.BadAggregateNotSupported), [], None
+        start, end = details.StartTime, details.EndTime
+        if start is None or end is None or ua.get_win_epoch() in (start, end) or start == end:
+            return ua.StatusCode(ua.StatusCodes.BadInvalidTimestampArgument), [], None
+        if details.ProcessingInterval > 0 and not timedelta(milliseconds=details.ProcessingInterval):
+            # shorter than the microsecond resolution of timestamps
+            return ua.StatusCode(ua.StatusCodes.BadInvalidArgument), [], None
+        intervals = ProcessingIntervals(start, end, details.ProcessingInterval)
+        first = 0
+        if rv.ContinuationPoint:
+            try:
+                first = ua.ua_binary.Primitives.UInt64.unpack(Buffer(rv.ContinuationPoint))
+            except NotEnoughData:
+                first = intervals.count
+            if first >= intervals.count:
+                return ua.StatusCode(ua.StatusCodes.BadContinuationPointInvalid), [], None
+        last = min(intervals.count, first + (self.storage.max_history_data_response_size or intervals.count))
+        treat_uncertain_as_bad = details.AggregateConfiguration.TreatUncertainAsBad
+        # only the raw values of the intervals of this response are read
+        lower, upper = intervals.span(first, last - 1)
+        values = await self._read_raw_with_bounds(
+            rv.NodeId, lower, upper, lambda dv: is_usable(dv.StatusCode, treat_uncertain_as_bad)
+        )
+        engine = AggregateEngine(values, treat_uncertain_as_bad)
+        results = engine.process(aggregate, start, end, details.ProcessingInterval, first, last - first)
+        cont = ua.ua_binary.Primitives.UInt64.pack(last) if last < intervals.count else None
+        return ua.StatusCode(), results, cont
+
+    async def _read_at_time_history(
+        self, rv: ua.HistoryReadValueId, details: ua.ReadAtTimeDetails
+    ) -> tuple[ua.StatusCode, list[ua.DataValue]]:
+        """
+        The values of the node at each requested time, resolved against a single read of the raw values
+        spanning all of them.
+        """
+        if not details.ReqTimes:
+            return ua.StatusCode(), []
+        if any(timestamp is None or timestamp == ua.get_win_epoch() for timestamp in details.ReqTimes):
+            return ua.StatusCode(ua.StatusCodes.BadInvalidTimestampArgument), []
+        usable = None if details.UseSimpleBounds else (lambda dv: is_usable(dv.StatusCode, False))
+        values = await self._read_raw_with_bounds(rv.NodeId, min(details.ReqTimes), max(details.ReqTimes), usable)
+        engine = AggregateEngine(values)
+        return ua.StatusCode(), [engine.value_at(timestamp, details.UseSimpleBounds) for timestamp in details.ReqTimes]
+
+    async def _read_raw_with_bounds(
+        self,
+        node_id: ua.NodeId,
+        start: datetime,
+        end: datetime,
+        usable: Callable[[ua.DataValue], bool] | None = None,
+    ) -> list[ua.DataValue]:
+        """
+        All raw values from start to end, following continuation points, with the values outside
+        needed to interpolate at the edges: the closest value before start and after end or,
+        if `usable` is given, all values up to the closest usable ones.
+        """
+        values = await self._read_bounds(node_id, start, False, usable)
+        values.reverse()
+        page, cont = await self.storage.read_node_history(node_id, start, end, 0)
+        values.extend(page)
+        while cont is not None:
+            point = ua.ua_binary.Primitives.DateTime.pack(cont) if isinstance(cont, datetime) else cont
+            page, next_cont = await self.storage.continue_node_history(node_id, point, start, end, 0)
+            values.extend(page)
+            if next_cont == cont:
+                break
+            cont = next_cont
+        values.extend(await self._read_bounds(node_id, end, True, usable))
+        return values
+
+    async def _read_bounds(
+        self, node_id: ua.NodeId, timestamp: datetime, forward: bool, usable: Callable[[ua.DataValue], bool] | None
+    ) -> list[ua.DataValue]:
+        bounds: list[ua.DataValue] = []
+        while True:
+            if forward:
+                found, _ = await self.storage.read_node_history(node_id, timestamp + _RESOLUTION, None, 1)
+            else:
+                # with end before start storages return values latest first
+                found, _ = await self.storage.read_node_history(node_id, timestamp - _RESOLUTION, _EARLIEST, 1)
+            if not found or found[0].SourceTimestamp is None:
+                return bounds
+            bounds.append(found[0])
+            if usable is None or usable(found[0]):
+                return bounds
+            timestamp = utc(found[0].SourceTimestamp)
+
     async def _read_event_history(
         self, rv: ua.HistoryReadValueId, details: ua.ReadEventDetails
     ) -> tuple[list[ua.HistoryEventFieldList], Any]:
@@ -0,0 +1,443 @@
+"""
+Aggregates of OPC UA Part 13 computed from the raw history of a node, they answer ReadProcessedDetails
+and, through the interpolation of values at given times, ReadAtTimeDetails.
+The raw values are sorted once and split into processing intervals by bisecting their timestamps,
+each aggregate then only looks at the values of its interval and the bounding values around it.
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+import math
+import statistics
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+
+from asyncua import ua
+
+# StatusCode info bits of processed values: InfoType DataValue with the Calculated or Interpolated historian bits
+_CALCULATED_INFO_BITS = 0x0401
+_INTERPOLATED_INFO_BITS = 0x0402
+
+Point = tuple[datetime, float]
+
+
+def utc(timestamp: datetime) -> datetime:
+    """
+    Storages may return naive timestamps, history timestamps are always UTC.
+    """
+    return timestamp if timestamp.tzinfo is not None else timestamp.replace(tzinfo=timezone.utc)
+
+
+def interpolate(timestamp: datetime, before: Point | None, after: Point | None, stepped: bool = False) -> float | None:
+    """
+    Value at `timestamp` between two bounding points, None if it cannot be computed.
+    Without a later point the earlier value is extrapolated as a step.
+    """
+    if before is None:
+        return None
+    if before[0] == timestamp or after is None or stepped:
+        return before[1]
+    span = (after[0] - before[0]).total_seconds()
+    if span <= 0:
+        return before[1]
+    return before[1] + (after[1] - before[1]) * (timestamp - before[0]).total_seconds() / span
+
+
+@dataclass
+class ProcessingInterval:
+    """
+    The raw values of one processing interval [start, end) and the values bounding it.
+    `points` are the usable numeric values, `before` and `after` the closest usable numeric values
+    outside the interval. `prior` is the last raw value before start, whatever its status.
+    """
+
+    start: datetime
+    end: datetime
+    values: Sequence[ua.DataValue] = ()
+    points: Sequence[Point] = ()
+    before: Point | None = None
+    after: Point | None = None
+    prior: ua.DataValue | None = None
+    treat_uncertain_as_bad: bool = False
+
+    def point_at(self, timestamp: datetime) -> Point | None:
+        """
+        Interpolated point at `timestamp`, within or at the edges of the interval.
+        """
+        index = bisect.bisect_left(self.points, timestamp, key=lambda point: point[0])
+        if index < len(self.points) and self.points[index][0] == timestamp:
+            return self.points[index]
+        before = self.points[index - 1] if index > 0 else self.before
+        after = self.points[index] if index < len(self.points) else self.after
+        value = interpolate(timestamp, before, after)
+        return None if value is None else (timestamp, value)
+
+    def is_usable(self, status: ua.StatusCode | None) -> bool:
+        return is_usable(status, self.treat_uncertain_as_bad)
+
+
+def is_usable(status: ua.StatusCode | None, treat_uncertain_as_bad: bool) -> bool:
+    if status is None:
+        return True
+    if treat_uncertain_as_bad:
+        return status.is_good()
+    return not status.is_bad()
+
+
+def _no_data(interval: ProcessingInterval) -> ua.DataValue:
+    return ua.DataValue(StatusCode=ua.StatusCode(ua.StatusCodes.BadNoData), SourceTimestamp=interval.start)
+
+
+def _calculated(
+    interval: ProcessingInterval,
+    value: float | int | None,
+    variant_type: ua.VariantType = ua.VariantType.Double,
+    timestamp: datetime | None = None,
+    info_bits: int = _CALCULATED_INFO_BITS,
+) -> ua.DataValue:
+    if value is None:
+        return _no_data(interval)
+    return ua.DataValue(
+        ua.Variant(value, variant_type),
+        StatusCode=ua.StatusCode(ua.StatusCodes.Good | info_bits),
+        SourceTimestamp=timestamp or interval.start,
+    )
+
+
+def _raw(interval: ProcessingInterval, dv: ua.DataValue | None, actual_time: bool = True) -> ua.DataValue:
+    if dv is None:
+        return _no_data(interval)
+    status = dv.StatusCode.value if dv.StatusCode is not None else ua.StatusCodes.Good
+    return ua.DataValue(
+        dv.Value,
+        StatusCode=ua.StatusCode(status | _CALCULATED_INFO_BITS),
+        SourceTimestamp=utc(dv.SourceTimestamp) if actual_time and dv.SourceTimestamp else interval.start,
+    )
+
+
+def _area(interval: ProcessingInterval) -> float | None:
+    """
+    Integral in value * seconds of the values over the interval, linear between points.
+    """
+    start = interval.point_at(interval.start)
+    end = interval.point_at(interval.end)
+    points = [point for point in interval.points if interval.start < point[0] < interval.end]
+    if start is not None:
+        points.insert(0, start)
+    elif interval.points:
+        # no earlier value, the interval is only covered from its first value on
+        points.insert(0, interval.points[0])
+    else:
+        return None
+    if end is not None and end[0] > points[-1][0]:
+        points.append(end)
+    area = 0.0
+    for (t0, v0), (t1, v1) in itertools.pairwise(points):
+        area += (v0 + v1) / 2 * (t1 - t0).total_seconds()
+    return area
+
+
+def _interpolative(interval: ProcessingInterval) -> ua.DataValue:
+    point = interval.point_at(interval.start)
+    return _calculated(interval, None if point is None else point[1], info_bits=_INTERPOLATED_INFO_BITS)
+
+
+def _average(interval: ProcessingInterval) -> ua.DataValue:
+    return _calculated(interval, statistics.fmean(v for _, v in interval.points) if interval.points else None)
+
+
+def _time_average(interval: ProcessingInterval) -> ua.DataValue:
+    area = _area(interval)
+    duration = (interval.end - interval.start).total_seconds()
+    return _calculated(interval, None if area is None or not duration else area / duration)
+
+
+def _total(interval: ProcessingInterval) -> ua.DataValue:
+    return _calculated(interval, _area(interval))
+
+
+def _extreme(pick: Callable[..., Point], actual_time: bool) -> Callable[[ProcessingInterval], ua.DataValue]:
+    def aggregate(interval: ProcessingInterval) -> ua.DataValue:
+        if not interval.points:
+            return _no_data(interval)
+        timestamp, value = pick(interval.points, key=lambda point: point[1])
+        return _calculated(interval, value, timestamp=timestamp if actual_time else None)
+
+    return aggregate
+
+
+def _range(interval: ProcessingInterval) -> ua.DataValue:
+    if not interval.points:
+        return _no_data(interval)
+    values = [v for _, v in interval.points]
+    return _calculated(interval, max(values) - min(values))
+
+
+def _count(interval: ProcessingInterval) -> ua.DataValue:
+    return _calculated(interval, len(interval.points), ua.VariantType.Int32)
+
+
+def _start(interval: ProcessingInterval) -> ua.DataValue:
+    return _raw(interval, interval.values[0] if interval.values else None)
+
+
+def _end(interval: ProcessingInterval) -> ua.DataValue:
+    return _raw(interval, interval.values[-1] if interval.values else None)
+
+
+def _delta(interval: ProcessingInterval) -> ua.DataValue:
+    if not interval.points:
+        return _no_data(interval)
+    return _calculated(interval, interval.points[-1][1] - interval.points[0][1])
+
+
+def _bound(at_end: bool) -> Callable[[ProcessingInterval], ua.DataValue]:
+    def aggregate(interval: ProcessingInterval) -> ua.DataValue:
+        timestamp = interval.end if at_end else interval.start
+        point = interval.point_at(timestamp)
+        return _calculated(interval, None if point is None else point[1], info_bits=_INTERPOLATED_INFO_BITS)
+
+    return aggregate
+
+
+def _good_duration(interval: ProcessingInterval) -> float:
+    """
+    Seconds of the interval during which the last value was usable, statuses hold until the next value.
+    """
+    good = 0.0
+    usable = interval.prior is not None and interval.is_usable(interval.prior.StatusCode)
+    since = interval.start
+    for dv in interval.values:
+        timestamp = utc(dv.SourceTimestamp)  # type: ignore[arg-type]
+        if usable:
+            good += (timestamp - since).total_seconds()
+        usable, since = interval.is_usable(dv.StatusCode), timestamp
+    if usable:
+        good += (interval.end - since).total_seconds()
+    return good
+
+
+def _duration(good: bool, percent: bool) -> Callable[[ProcessingInterval], ua.DataValue]:
+    def aggregate(interval: ProcessingInterval) -> ua.DataValue:
+        duration = (interval.end - interval.start).total_seconds()
+        seconds = _good_duration(interval)
+        if not good:
+            seconds = duration - seconds
+        if percent:
+            return _calculated(interval, seconds / duration * 100 if duration else 0.0)
+        return _calculated(interval, seconds * 1000)
+
+    return aggregate
+
+
+def _worst_quality(interval: ProcessingInterval) -> ua.DataValue:
+    if not interval.values:
+        return _no_data(interval)
+
+    def severity(dv: ua.DataValue) -> int:
+        status = dv.StatusCode or ua.StatusCode()
+        return 2 if status.is_bad() else 1 if status.is_uncertain() else 0
+
+    worst = max(interval.values, key=severity)
+    status = (worst.StatusCode or ua.StatusCode()).value
+    return _calculated(interval, status, ua.VariantType.StatusCode)
+
+
+def _number_of_transitions(interval: ProcessingInterval) -> ua.DataValue:
+    previous = interval.before[1] if interval.before is not None else None
+    transitions = 0
+    for _, value in interval.points:
+        if previous is not None and value != previous:
+            transitions += 1
+        previous = value
+    return _calculated(interval, transitions, ua.VariantType.Int32)
+
+
+def _spread(func: Callable[[list[float]], float], minimum: int) -> Callable[[ProcessingInterval], ua.DataValue]:
+    def aggregate(interval: ProcessingInterval) -> ua.DataValue:
+        if len(interval.points) < minimum:
+            return _no_data(interval)
+        return _calculated(interval, func([v for _, v in interval.points]))
+
+    return aggregate
+
+
+AGGREGATES: dict[int, Callable[[ProcessingInterval], ua.DataValue]] = {
+    ua.ObjectIds.AggregateFunction_Interpolative: _interpolative,
+    ua.ObjectIds.AggregateFunction_Average: _average,
+    ua.ObjectIds.AggregateFunction_TimeAverage: _time_average,
+    ua.ObjectIds.AggregateFunction_TimeAverage2: _time_average,
+    ua.ObjectIds.AggregateFunction_Total: _total,
+    ua.ObjectIds.AggregateFunction_Total2: _total,
+    ua.ObjectIds.AggregateFunction_Minimum: _extreme(min, actual_time=False),
+    ua.ObjectIds.AggregateFunction_Maximum: _extreme(max, actual_time=False),
+    ua.ObjectIds.AggregateFunction_Minimum2: _extreme(min, actual_time=False),
+    ua.ObjectIds.AggregateFunction_Maximum2: _extreme(max, actual_time=False),
+    ua.ObjectIds.AggregateFunction_MinimumActualTime: _extreme(min, actual_time=True),
+    ua.ObjectIds.AggregateFunction_MaximumActualTime: _extreme(max, actual_time=True),
+    ua.ObjectIds.AggregateFunction_MinimumActualTime2: _extreme(min, actual_time=True),
+    ua.ObjectIds.AggregateFunction_MaximumActualTime2: _extreme(max, actual_time=True),
+    ua.ObjectIds.AggregateFunction_Range: _range,
+    ua.ObjectIds.AggregateFunction_Range2: _range,
+    ua.ObjectIds.AggregateFunction_Count: _count,
+    ua.ObjectIds.AggregateFunction_Start: _start,
+    ua.ObjectIds.AggregateFunction_End: _end,
+    ua.ObjectIds.AggregateFunction_Delta: _delta,
+    ua.ObjectIds.AggregateFunction_StartBound: _bound(at_end=False),
+    ua.ObjectIds.AggregateFunction_EndBound: _bound(at_end=True),
+    ua.ObjectIds.AggregateFunction_DurationGood: _duration(good=True, percent=False),
+    ua.ObjectIds.AggregateFunction_DurationBad: _duration(good=False, percent=False),
+    ua.ObjectIds.AggregateFunction_PercentGood: _duration(good=True, percent=True),
+    ua.ObjectIds.AggregateFunction_PercentBad: _duration(good=False, percent=True),
+    ua.ObjectIds.AggregateFunction_WorstQuality: _worst_quality,
+    ua.ObjectIds.AggregateFunction_WorstQuality2: _worst_quality,
+    ua.ObjectIds.AggregateFunction_NumberOfTransitions: _number_of_transitions,
+    ua.ObjectIds.AggregateFunction_StandardDeviationSample: _spread(statistics.stdev, 2),
+    ua.ObjectIds.AggregateFunction_StandardDeviationPopulation: _spread(statistics.pstdev, 1),
+    ua.ObjectIds.AggregateFunction_VarianceSample: _spread(statistics.variance, 2),
+    ua.ObjectIds.AggregateFunction_VariancePopulation: _spread(statistics.pvariance, 1),
+}
+
+
+def _number(dv: ua.DataValue) -> float | None:
+    value = dv.Value.Value if dv.Value is not None else None
+    if isinstance(value, (int, float)) and not (isinstance(value, float) and math.isnan(value)):
+        return float(value)
+    return None
+
+
+@dataclass
+class AggregateEngine:
+    """
+    Splits raw values, sorted by SourceTimestamp and including the values bounding the requested range,
+    into processing intervals and computes an aggregate for each of them.
+    """
+
+    values: list[ua.DataValue]
+    treat_uncertain_as_bad: bool = False
+    _times: list[datetime] = field(init=False)
+    _points: list[Point] = field(init=False)
+    _point_times: list[datetime] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.values = sorted(
+            (dv for dv in self.values if dv.SourceTimestamp is not None),
+            key=lambda dv: utc(dv.SourceTimestamp),  # type: ignore[arg-type]
+        )
+        self._times = [utc(dv.SourceTimestamp) for dv in self.values]  # type: ignore[arg-type]
+        self._points = []
+        for timestamp, dv in zip(self._times, self.values):
+            number = _number(dv)
+            if number is not None and is_usable(dv.StatusCode, self.treat_uncertain_as_bad):
+                self._points.append((timestamp, number))
+        self._point_times = [timestamp for timestamp, _ in self._points]
+
+    def interval(self, start: datetime, end: datetime) -> ProcessingInterval:
+        lo, hi = bisect.bisect_left(self._times, start), bisect.bisect_left(self._times, end)
+        plo, phi = bisect.bisect_left(self._point_times, start), bisect.bisect_left(self._point_times, end)
+        return ProcessingInterval(
+            start,
+            end,
+            self.values[lo:hi],
+            self._points[plo:phi],
+            self._points[plo - 1] if plo > 0 else None,
+            self._points[phi] if phi < len(self._points) else None,
+            self.values[lo - 1] if lo > 0 else None,
+            self.treat_uncertain_as_bad,
+        )
+
+    def value_at(self, timestamp: datetime, simple_bounds: bool = True) -> ua.DataValue:
+        """
+        The raw value stored at `timestamp`, else a value interpolated between the values bounding it.
+        Simple bounds are the closest raw values whatever their status, otherwise the closest usable ones.
+        Numbers are interpolated linearly and other values stepped, after the last value it is held.
+        """
+        index = bisect.bisect_left(self._times, timestamp)
+        if index < len(self._times) and self._times[index] == timestamp:
+            return replace(self.values[index], SourceTimestamp=timestamp)
+        before = self._bound(index - 1, -1, simple_bounds)
+        if before is None:
+            return ua.DataValue(StatusCode=ua.StatusCode(ua.StatusCodes.BadNoData), SourceTimestamp=timestamp)
+        after = self._bound(index, 1, simple_bounds)
+        status = ua.StatusCodes.Good
+        if any(dv is not None and not is_usable(dv.StatusCode, self.treat_uncertain_as_bad) for dv in (before, after)):
+            status = ua.StatusCodes.UncertainDataSubNormal
+        first = _number(before)
+        last = _number(after) if after is not None else None
+        if first is None or last is None or after is None:
+            variant = before.Value
+        else:
+            start, end = utc(before.SourceTimestamp), utc(after.SourceTimestamp)  # type: ignore[arg-type]
+            value = interpolate(timestamp, (start, first), (end, last))
+            variant = ua.Variant(value, ua.VariantType.Double)
+        return ua.DataValue(
+            variant, StatusCode=ua.StatusCode(status | _INTERPOLATED_INFO_BITS), SourceTimestamp=timestamp
+        )
+
+    def _bound(self, index: int, step: int, simple_bounds: bool) -> ua.DataValue | None:
+        while 0 <= index < len(self.values):
+            dv = self.values[index]
+            if simple_bounds or is_usable(dv.StatusCode, self.treat_uncertain_as_bad):
+                return dv
+            index += step
+        return None
+
+    def process(
+        self,
+        aggregate: Callable[[ProcessingInterval], ua.DataValue],
+        start: datetime,
+        end: datetime,
+        interval: float,
+        first: int = 0,
+        count: int = 0,
+    ) -> list[ua.DataValue]:
+        """
+        One value per `interval` milliseconds from `start` to `end`, a single interval if `interval` is 0.
+        With `end` before `start` the intervals are computed forward over [end, start] and returned latest first.
+        If `count` is given only the values of `count` intervals from the `first` one are computed.
+        """
+        intervals = ProcessingIntervals(start, end, interval)
+        last = intervals.count if not count else min(intervals.count, first + count)
+        return [aggregate(self.interval(*intervals.bounds(position))) for position in range(first, last)]
+
+
+@dataclass(frozen=True)
+class ProcessingIntervals:
+    """
+    The processing intervals of `interval` milliseconds from `start` to `end`, a single interval if `interval`
+    is 0, numbered in the order their values are returned: latest first if `end` is before `start`.
+    Intervals are aligned on the earliest of `start` and `end`, the latest interval may be shorter.
+    """
+
+    start: datetime
+    end: datetime
+    interval: float
+
+    @property
+    def step(self) -> timedelta:
+        if self.interval > 0:
+            return timedelta(milliseconds=self.interval)
+        return abs(self.end - self.start)
+
+    @property
+    def count(self) -> int:
+        return -(-abs(self.end - self.start) // self.step)
+
+    def bounds(self, position: int) -> tuple[datetime, datetime]:
+        """
+        Start and end of the interval at `position`.
+        """
+        index = self.count - 1 - position if self.end < self.start else position
+        earliest, latest = min(self.start, self.end), max(self.start, self.end)
+        lower = earliest + index * self.step
+        return lower, min(lower + self.step, latest)
+
+    def span(self, first: int, last: int) -> tuple[datetime, datetime]:
+        """
+        Start of the earliest and end of the latest of the intervals at positions `first` to `last`.
+        """
+        first_bounds, last_bounds = self.bounds(first), self.bounds(last)
+        return min(first_bounds[0], last_bounds[0]), max(first_bounds[1], last_bounds[1])
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import itertools
 import logging
 import sqlite3
 from collections.abc import Iterable
@@ -26,23 +28,115 @@ class HistorySQLite(HistoryStorageInterface):
     this backend is intended to only be accessed via OPC UA, therefore all UA Variants saved in
     the history database are in binary format (SQLite BLOBs)
     note that PARSE_DECLTYPES is active so certain data types (such as datetime) will not be BLOBs
+
+    if `flush_interval` (seconds) is set, data changes are written behind: they are buffered in memory
+    and inserted with one executemany and one commit per table every `flush_interval` seconds, or as soon as
+    `flush_rows` values are buffered. The period and count limits of the nodes are then enforced by a sweep
+    every `retention_interval` seconds instead of after every insert. Reads flush the buffered values
+    of the node first, `stop` flushes everything left unless `flush_on_stop` is False.
     """
 
-    def __init__(self, path: str = "history.db", max_history_data_response_size: int = 10000) -> None:
+    def __init__(
+        self,
+        path: str = "history.db",
+        max_history_data_response_size: int = 10000,
+        flush_interval: float | None = None,
+        flush_rows: int = 1000,
+        retention_interval: float = 1.0,
+        flush_on_stop: bool = True,
+    ) -> None:
         self.max_history_data_response_size = max_history_data_response_size
         self.logger = logging.getLogger(__name__)
         self._datachanges_period: dict[ua.NodeId, Any] = {}
         self._db_file = path
         self._event_fields: dict[ua.NodeId, list[str]] = {}
         self._db: aiosqlite.Connection = None  # type: ignore[assignment]
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.retention_interval = retention_interval
+        self.flush_on_stop = flush_on_stop
+        # table name -> (node id, rows waiting to be inserted)
+        self._pending: dict[str, tuple[ua.NodeId, list[tuple[Any, ...]]]] = {}
+        self._pending_rows = 0
+        self._flush_lock = asyncio.Lock()
+        self._write_behind_task: asyncio.Task[None] | None = None
+        self._write_behind_stop = asyncio.Event()
 
     async def init(self) -> None:
         self._db = await aiosqlite.connect(self._db_file, detect_types=sqlite3.PARSE_DECLTYPES)
+        if self.flush_interval is not None:
+            self._write_behind_stop.clear()
+            self._write_behind_task = asyncio.create_task(self._write_behind_loop())
 
     async def stop(self) -> None:
+        if self._write_behind_task is not None:
+            # do not cancel the loop, a flush in progress must commit the rows it took from the buffer
+            self._write_behind_stop.set()
+            await self._write_behind_task
+            self._write_behind_task = None
+        if self.flush_on_stop:
+            await self.flush()
+            await self.apply_retention()
+        elif self._pending_rows:
+            self.logger.warning("Historizing SQL discarding %s buffered values on stop", self._pending_rows)
+            self._pending.clear()
+            self._pending_rows = 0
         await self._db.close()
         self.logger.info("Historizing SQL connection closed")
 
+    async def _write_behind_loop(self) -> None:
+        assert self.flush_interval is not None
+        loop = asyncio.get_running_loop()
+        last_sweep = loop.time()
+        while True:
+            try:
+                await asyncio.wait_for(self._write_behind_stop.wait(), self.flush_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+                if loop.time() - last_sweep >= self.retention_interval:
+                    last_sweep = loop.time()
+                    await self.apply_retention()
+            except Exception:
+                self.logger.exception("Historizing SQL write behind error")
+
+    async def flush(self, table: str | None = None) -> None:
+        """
+        Insert the buffered data changes, of one table or of all of them, in a single transaction.
+        """
+        async with self._flush_lock:
+            if table is None:
+                pending = list(self._pending.items())
+                self._pending.clear()
+            elif table in self._pending:
+                pending = [(table, self._pending.pop(table))]
+            else:
+                return
+            if not pending:
+                return
+            for _table, (node_id, rows) in pending:
+                self._pending_rows -= len(rows)
+                try:
+                    await self._insert_values(node_id, rows)
+                except aiosqlite.Error as e:
+                    self.logger.error("Historizing SQL Insert Error for %s: %s", node_id, e)
+            try:
+                await self._db.commit()
+            except aiosqlite.Error as e:
+                self.logger.error("Historizing SQL Commit Error: %s", e)
+
+    async def apply_retention(self) -> None:
+        """
+        Delete the values outside the period and count limits of every historized node.
+        """
+        for node_id, limits in list(self._datachanges_period.items()):
+            if not isinstance(limits, tuple):
+                continue  # event sources only store a period
+            period, count = limits
+            await self._delete_old_values(node_id, period, count, keep_newest=True)
+
     async def new_historized_node(
         self, node_id: ua.NodeId, period: timedelta | None, count: int = 0
     ) -> None:
@@ -78,31 +172,58 @@ class HistorySQLite(HistoryStorageInterface):
 
     async def save_node_value(self, node_id: ua.NodeId, datavalue: ua.DataValue) -> None:
         table = self._get_table_name(node_id)
+        row = (
+            datavalue.ServerTimestamp,
+            datavalue.SourceTimestamp,
+            datavalue.StatusCode.value,  # type: ignore[union-attr]
+            str(datavalue.Value.Value),  # type: ignore[union-attr]
+            datavalue.Value.VariantType.name,  # type: ignore[union-attr]
+            sqlite3.Binary(variant_to_binary(datavalue.Value)),
+        )
+        if self.flush_interval is not None:
+            # write behind, the retention limits are applied by the periodic sweep
+            self._pending.setdefault(table, (node_id, []))[1].append(row)
+            self._pending_rows += 1
+            if self._pending_rows >= self.flush_rows:
+                await self.flush()
+            return
         # insert the data change into the database
         try:
-            validate_table_name(table)
-            await self._db.execute(
-                f'INSERT INTO "{table}" VALUES (NULL, ?, ?, ?, ?, ?, ?)',
-                (
-                    datavalue.ServerTimestamp,
-                    datavalue.SourceTimestamp,
-                    datavalue.StatusCode.value,  # type: ignore[union-attr]
-                    str(datavalue.Value.Value),  # type: ignore[union-attr]
-                    datavalue.Value.VariantType.name,  # type: ignore[union-attr]
-                    sqlite3.Binary(variant_to_binary(datavalue.Value)),
-                ),
-            )
+            await self._insert_values(node_id, [row])
             await self._db.commit()
         except aiosqlite.Error as e:
             self.logger.error("Historizing SQL Insert Error for %s: %s", node_id, e)
         # get this node's period from the period dict and calculate the limit
         period, count = self._datachanges_period[node_id]
+        await self._delete_old_values(node_id, period, count)
+
+    async def _insert_values(self, node_id: ua.NodeId, rows: list[tuple[Any, ...]]) -> None:
+        """
+        Insert rows of (ServerTimestamp, SourceTimestamp, StatusCode, Value, VariantType, VariantBinary), uncommitted.
+        """
+        table = self._get_table_name(node_id)
+        validate_table_name(table)
+        await self._db.executemany(f'INSERT INTO "{table}" VALUES (NULL, ?, ?, ?, ?, ?, ?)', rows)
+
+    async def _delete_old_values(
+        self, node_id: ua.NodeId, period: timedelta | None, count: int, keep_newest: bool = False
+    ) -> None:
+        table = self._get_table_name(node_id)
         if period:
             # after the insert, if a period was specified delete all records older than period
             date_limit = datetime.now(timezone.utc) - period
             validate_table_name(table)
             await self.execute_sql_delete("SourceTimestamp < ?", (date_limit,), table, node_id)
-        if count:
+        if count and keep_newest:
+            # a sweep may find many values over the count, keep only the newest count records
+            validate_table_name(table)
+            await self.execute_sql_delete(
+                f'_Id IN (SELECT _Id FROM "{table}" ORDER BY SourceTimestamp DESC, _Id DESC LIMIT -1 OFFSET ?)',
+                (count,),
+                table,
+                node_id,
+            )
+        elif count:
             # ensure that no more than count records are stored for the specified node
             validate_table_name(table)
             await self.execute_sql_delete(
@@ -117,8 +238,9 @@ class HistorySQLite(HistoryStorageInterface):
         self, node_id: ua.NodeId, start: datetime | None, end: datetime | None, nb_values: int
     ) -> tuple[list[ua.DataValue], datetime | None]:
         table = self._get_table_name(node_id)
+        if table in self._pending:
+            await self.flush(table)
         start_time, end_time, order, limit = self._get_bounds(start, end, nb_values)
-        cont = None
         results = []
         # select values from the database; recreate UA Variant from binary
         try:
@@ -133,19 +255,25 @@ class HistorySQLite(HistoryStorageInterface):
             ) as cursor:
                 async for row in cursor:
                     # rebuild the data value object
-                    dv = ua.DataValue(
-                        variant_from_binary(Buffer(row[6])),
-                        ServerTimestamp=row[1],
-                        SourceTimestamp=row[2],
-                        StatusCode=ua.StatusCode(row[3]),
-                    )
-                    results.append(dv)
+                    results.append(self._datavalue_from_row(row[1], row[2], row[3], row[6]))
         except aiosqlite.Error as e:
             self.logger.error("Historizing SQL Read Error for %s: %s", node_id, e)
+        return self._limit_response(results)
+
+    @staticmethod
+    def _datavalue_from_row(server_timestamp: Any, source_timestamp: Any, status: int, binary: bytes) -> ua.DataValue:
+        return ua.DataValue(
+            variant_from_binary(Buffer(binary)),
+            ServerTimestamp=server_timestamp,
+            SourceTimestamp=source_timestamp,
+            StatusCode=ua.StatusCode(status),
+        )
+
+    def _limit_response(self, results: list[ua.DataValue]) -> tuple[list[ua.DataValue], datetime | None]:
+        cont = None
         if len(results) > self.max_history_data_response_size:
             cont = results[self.max_history_data_response_size].SourceTimestamp
-        results = results[: self.max_history_data_response_size]
-        return results, cont
+        return results[: self.max_history_data_response_size], cont
 
     async def new_historized_event(  # type: ignore[override]
         self, source_id: ua.NodeId, evtypes: list[Node], period: timedelta | None, count: int = 0
@@ -326,3 +454,146 @@ class HistorySQLite(HistoryStorageInterface):
     def _list_to_sql_str(ls: list[str], quotes: bool = True) -> str:
         items = [f'"{item}"' if quotes else str(item) for item in ls]
         return ", ".join(items)
+
+
+class HistorySQLiteSingleTable(HistorySQLite):
+    """
+    HistorySQLite variant storing the data changes of all nodes in one table instead of one table per node,
+    which keeps the schema small with many historized nodes. Node ids are interned to integer keys and
+    the values are clustered by a (node key, SourceTimestamp) primary key so range reads are index seeks,
+    the database is opened in write-ahead logging mode. Events are stored like HistorySQLite does.
+    Values without SourceTimestamp are stored under their ServerTimestamp.
+    """
+
+    _DATA_TABLE = "_DataValues"
+    _NODES_TABLE = "_Nodes"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._node_keys: dict[ua.NodeId, int] = {}
+        self._ids = itertools.count(1)
+
+    async def init(self) -> None:
+        await super().init()
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute(
+            f'CREATE TABLE IF NOT EXISTS "{self._NODES_TABLE}" (NodeKey INTEGER PRIMARY KEY NOT NULL,'
+            " NodeId TEXT UNIQUE NOT NULL)"
+        )
+        # note: Value/VariantType TEXT is only for human reading, the actual data is stored in VariantBinary column
+        await self._db.execute(
+            f'CREATE TABLE IF NOT EXISTS "{self._DATA_TABLE}" (NodeKey INTEGER NOT NULL,'
+            " SourceTimestamp TIMESTAMP NOT NULL,"
+            " _Id INTEGER NOT NULL,"
+            " ServerTimestamp TIMESTAMP,"
+            " StatusCode INTEGER,"
+            " Value TEXT,"
+            " VariantType TEXT,"
+            " VariantBinary BLOB,"
+            " PRIMARY KEY (NodeKey, SourceTimestamp, _Id)) WITHOUT ROWID"
+        )
+        await self._db.commit()
+        async with self._db.execute(f'SELECT NodeId, NodeKey FROM "{self._NODES_TABLE}"') as cursor:
+            async for row in cursor:
+                self._node_keys[ua.NodeId.from_string(row[0])] = row[1]
+        async with self._db.execute(f'SELECT MAX(_Id) FROM "{self._DATA_TABLE}"') as cursor:
+            row = await cursor.fetchone()
+        # _Id orders values of a node sharing a SourceTimestamp by insertion
+        self._ids = itertools.count((row[0] or 0) + 1 if row else 1)
+
+    async def new_historized_node(self, node_id: ua.NodeId, period: timedelta | None, count: int = 0) -> None:
+        self._datachanges_period[node_id] = period, count
+        if node_id in self._node_keys:
+            return
+        try:
+            await self._db.execute(
+                f'INSERT OR IGNORE INTO "{self._NODES_TABLE}" (NodeId) VALUES (?)', (node_id.to_string(),)
+            )
+            async with self._db.execute(
+                f'SELECT NodeKey FROM "{self._NODES_TABLE}" WHERE NodeId = ?', (node_id.to_string(),)
+            ) as cursor:
+                row = await cursor.fetchone()
+            await self._db.commit()
+        except aiosqlite.Error as e:
+            self.logger.error("Historizing SQL Node Registration Error for %s: %s", node_id, e)
+            return
+        if row is not None:
+            self._node_keys[node_id] = row[0]
+
+    async def _insert_values(self, node_id: ua.NodeId, rows: list[tuple[Any, ...]]) -> None:
+        key = self._node_keys.get(node_id)
+        if key is None:
+            self.logger.error("Historizing SQL Insert Error for %s: node is not registered", node_id)
+            return
+        await self._db.executemany(
+            f'INSERT INTO "{self._DATA_TABLE}" VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            [
+                (
+                    key,
+                    source_ts or server_ts or datetime.now(timezone.utc),
+                    next(self._ids),
+                    server_ts,
+                    status,
+                    value,
+                    variant_type,
+                    binary,
+                )
+                for server_ts, source_ts, status, value, variant_type, binary in rows
+            ],
+        )
+
+    async def _delete_old_values(
+        self, node_id: ua.NodeId, period: timedelta | None, count: int, keep_newest: bool = False
+    ) -> None:
+        key = self._node_keys.get(node_id)
+        if key is None:
+            return
+        if period:
+            date_limit = datetime.now(timezone.utc) - period
+            await self.execute_sql_delete(
+                "NodeKey = ? AND SourceTimestamp < ?", (key, date_limit), self._DATA_TABLE, node_id
+            )
+        if count:
+            # the primary key walks the values of the node newest first, everything past count goes
+            await self.execute_sql_delete(
+                f'NodeKey = ? AND _Id IN (SELECT _Id FROM "{self._DATA_TABLE}" WHERE NodeKey = ?'
+                " ORDER BY SourceTimestamp DESC, _Id DESC LIMIT -1 OFFSET ?)",
+                (key, key, count),
+                self._DATA_TABLE,
+                node_id,
+            )
+
+    async def read_node_history(
+        self, node_id: ua.NodeId, start: datetime | None, end: datetime | None, nb_values: int
+    ) -> tuple[list[ua.DataValue], datetime | None]:
+        return (await self.read_nodes_history([node_id], start, end, nb_values))[node_id]
+
+    async def read_nodes_history(
+        self, node_ids: list[ua.NodeId], start: datetime | None, end: datetime | None, nb_values: int
+    ) -> dict[ua.NodeId, tuple[list[ua.DataValue], datetime | None]]:
+        """
+        Read the history of several nodes over the same time range with a single query,
+        `nb_values` limits the values of each node.
+        """
+        for node_id in node_ids:
+            table = self._get_table_name(node_id)
+            if table in self._pending:
+                await self.flush(table)
+        keys = {self._node_keys[node_id]: node_id for node_id in node_ids if node_id in self._node_keys}
+        values: dict[ua.NodeId, list[ua.DataValue]] = {node_id: [] for node_id in node_ids}
+        start_time, end_time, order, limit = self._get_bounds(start, end, nb_values)
+        placeholders = ", ".join("?" * len(keys))
+        try:
+            async with self._db.execute(
+                "SELECT NodeKey, ServerTimestamp, SourceTimestamp, StatusCode, VariantBinary FROM"
+                " (SELECT *, ROW_NUMBER() OVER"
+                f" (PARTITION BY NodeKey ORDER BY SourceTimestamp {order}, _Id {order}) AS _Row"
+                f' FROM "{self._DATA_TABLE}" WHERE NodeKey IN ({placeholders}) AND SourceTimestamp BETWEEN ? AND ?)'
+                " WHERE ? < 0 OR _Row <= ? ORDER BY NodeKey, _Row",
+                (*keys, start_time, end_time, limit, limit),
+            ) as cursor:
+                async for row in cursor:
+                    values[keys[row[0]]].append(self._datavalue_from_row(*row[1:]))
+        except aiosqlite.Error as e:
+            self.logger.error("Historizing SQL Read Error for %s: %s", node_ids, e)
+        return {node_id: self._limit_response(results) for node_id, results in values.items()}
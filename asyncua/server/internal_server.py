@@ -7,7 +7,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from copy import copy
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
@@ -61,6 +61,13 @@ class InternalServer:
         self.min_session_timeout_ms: float = 5_000
         self.max_unacked_messages_per_subscription: int = 5_000
         self.max_monitored_item_queue_size: int = 10_000
+        # Notifications queued for publishing across all monitored items of a session.
+        # Past this, queues overflow as if full (DiscardOldest applies). 0 disables the cap.
+        self.max_queued_notifications_per_session: int = 0
+        # Report written values of monitored items with a SamplingInterval > 0 at most once
+        # per sampling interval instead of on every write. Nodes with a value callback are
+        # polled at the sampling interval either way.
+        self.sample_monitored_items: bool = False
         # Per-connection inbound message queue depth. data_received() refuses
         # further frames and closes the transport once this many parsed
         # messages are queued behind the processor coroutine.
@@ -72,6 +79,15 @@ class InternalServer:
         # Connections that haven't activated a session this many seconds after
         # connecting are closed by the binary server. 0 disables the watchdog.
         self.max_pending_activation_seconds: float = 30.0
+        # Requests of an activated session processed concurrently on its secure
+        # channel, answered as they complete. 1 processes them strictly in order.
+        self.max_concurrent_requests_per_session: int = 1
+        # Browse continuation points a session may hold, past this Browse returns
+        # BadNoContinuationPoints for nodes with more references than requested.
+        self.max_browse_continuation_points: int = 100
+        # References returned per node by Browse and BrowseNext when the client
+        # asks for more or for all of them. 0 leaves it to the client.
+        self.max_references_per_node: int = 0
         # Subscription parameter clamps — protect against clients that ask for
         # near-infinite RevisedLifetimeCount and then close the session without
         # deleting subscriptions (CVE-2022-24298 family). Orphaned-subscription
@@ -165,6 +181,15 @@ class InternalServer:
                 SourceTimestamp=datetime.now(timezone.utc),
             )
             params.NodesToWrite.append(attr)
+        attr = ua.WriteValue()
+        attr.NodeId = ua.NodeId(ua.ObjectIds.Server_ServerCapabilities_MaxBrowseContinuationPoints)
+        attr.AttributeId = ua.AttributeIds.Value
+        attr.Value = ua.DataValue(
+            ua.Variant(min(self.max_browse_continuation_points, 0xFFFF), ua.VariantType.UInt16),
+            StatusCode=ua.StatusCode(ua.StatusCodes.Good),
+            SourceTimestamp=datetime.now(timezone.utc),
+        )
+        params.NodesToWrite.append(attr)
         result = await self.isession.write(params)
         result[0].check()
 
@@ -239,6 +264,8 @@ class InternalServer:
             await self.time_task
         self.method_service.stop()
         await self.isession.close_session()
+        await self.subscription_service.publish_scheduler.stop()
+        await self.subscription_service.sampling_scheduler.stop()
         await self.history_manager.stop()
 
     async def _set_current_time_loop(self) -> None:
@@ -401,6 +428,19 @@ class InternalServer:
         """
         await self.aspace.write_attribute_value(nodeid, attr, datavalue)
 
+    async def write_attribute_values(
+        self,
+        nodeids_and_datavalues: Iterable[tuple[ua.NodeId, ua.DataValue]],
+        attr: ua.AttributeIds = ua.AttributeIds.Value,
+    ) -> list[ua.StatusCode]:
+        """
+        directly write several datavalues at once, the resulting data changes
+        are delivered to each subscription in one batch
+        """
+        return await self.aspace.write_attribute_values(
+            (nodeid, attr, datavalue) for nodeid, datavalue in nodeids_and_datavalues
+        )
+
     def set_attribute_value_callback(
         self,
         nodeid: ua.NodeId,
@@ -14,7 +14,7 @@ from asyncua.crypto.permission_rules import User, UserRole
 from ..common.callback import CallbackType, ServerItemCallback
 from ..common.utils import ServiceError, create_nonce
 from ..crypto.uacrypto import x509
-from .address_space import AddressSpace
+from .address_space import AddressSpace, BrowseContinuationPoints
 from .subscription_service import SubscriptionService
 
 if TYPE_CHECKING:
@@ -62,6 +62,9 @@ class InternalSession(AbstractSession):
         self.session_timeout: float | None = None
         self._last_activity: float = time.monotonic()
         self._timeout_task: asyncio.Task[None] | None = None
+        # bounds the requests UaProcessor runs concurrently for this session
+        self.request_semaphore = asyncio.Semaphore(max(1, internal_server.max_concurrent_requests_per_session))
+        self.browse_continuation_points = BrowseContinuationPoints(internal_server.max_browse_continuation_points)
         if self.external:
             self.iserver.register_external_session(self)
 
@@ -122,6 +125,7 @@ class InternalSession(AbstractSession):
         self.state = SessionState.Closed
         if self._timeout_task is not None and self._timeout_task is not asyncio.current_task():
             self._timeout_task.cancel()
+        self.browse_continuation_points.clear()
         if self.external:
             self.iserver.unregister_external_session(self)
         if delete_subs:
@@ -238,14 +242,13 @@ class InternalSession(AbstractSession):
         return write_result
 
     async def browse(self, params: ua.BrowseParameters) -> list[ua.BrowseResult]:
-        return self.iserver.view_service.browse(params)
+        return self.iserver.view_service.browse(
+            params, self.browse_continuation_points, self.iserver.max_references_per_node
+        )
 
     async def browse_next(self, parameters: ua.BrowseNextParameters) -> list[ua.BrowseResult]:
-        # TODO
-        # ContinuationPoint: https://reference.opcfoundation.org/v104/Core/docs/Part4/7.6/
-        # Add "ContinuationPoints" and some form of management for them to current sessionimplementation
         # BrowseNext: https://reference.opcfoundation.org/Core/Part4/v104/5.8.3/
-        raise NotImplementedError
+        return self.iserver.view_service.browse_next(parameters, self.browse_continuation_points)
 
     async def register_nodes(self, nodes: list[ua.NodeId]) -> list[ua.NodeId]:
         self.logger.info("Node registration not implemented")
@@ -5,9 +5,11 @@ server side implementation of a subscription object
 from __future__ import annotations
 
 import asyncio
+import dataclasses
 import logging
 import time
-from collections.abc import Awaitable, Callable, Iterable
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable, Iterator
 from typing import TYPE_CHECKING, Any
 
 from asyncua import ua
@@ -18,11 +20,83 @@ from .monitored_item_service import MonitoredItemService
 if TYPE_CHECKING:
     from asyncua.server.uaprocessor import PublishRequestData
 
+    from .publish_scheduler import PublishScheduler
+
     PublishResultCallback = Callable[..., Awaitable[None]]
     PublishRequestCallback = Callable[[int], PublishRequestData | None]
     DeleteCallback = Callable[[], Any]
 
 
+# InfoType DataValue with the Overflow bit, see OPC UA Part 4, 7.39.1
+_OVERFLOW_INFO_BITS = 0x0480
+
+
+class NotificationBudget:
+    """
+    Number of notifications the monitored item queues of one session may hold together.
+    A limit of 0 means no limit.
+    """
+
+    __slots__ = ("limit", "used")
+
+    def __init__(self, limit: int = 0) -> None:
+        self.limit = limit
+        self.used = 0
+
+    def exhausted(self) -> bool:
+        return 0 < self.limit <= self.used
+
+
+class MonitoredItemQueue:
+    """
+    Notifications of one monitored item waiting to be published.
+    When the queue is full the oldest notification is discarded, or with discard_oldest
+    False the newest one is replaced. Unless the queue size is 1, the Overflow bit is then
+    set on the DataValue next to the gap, as required by OPC UA Part 4, 5.12.1.5.
+    """
+
+    __slots__ = ("_notifications", "discard_oldest", "size")
+
+    def __init__(self, size: int = 0, discard_oldest: bool = True) -> None:
+        self.size = size
+        self.discard_oldest = discard_oldest
+        self._notifications: deque[ua.MonitoredItemNotification | ua.EventFieldList] = deque()
+
+    def __len__(self) -> int:
+        return len(self._notifications)
+
+    def __iter__(self) -> Iterator[ua.MonitoredItemNotification | ua.EventFieldList]:
+        return iter(self._notifications)
+
+    def put(self, notification: ua.MonitoredItemNotification | ua.EventFieldList, full: bool = False) -> bool:
+        """
+        Add a notification, overflowing if the queue is at its size or `full` is set.
+        Returns True if the queue grew, False if a notification was discarded.
+        """
+        notifications = self._notifications
+        if not notifications or (not full and (self.size == 0 or len(notifications) < self.size)):
+            notifications.append(notification)
+            return True
+        if self.discard_oldest:
+            notifications.popleft()
+            notifications.append(notification)
+            overflowed = notifications[0]
+        else:
+            notifications[-1] = notification
+            overflowed = notification
+        if self.size != 1:
+            _set_overflow(overflowed)
+        return False
+
+
+def _set_overflow(notification: ua.MonitoredItemNotification | ua.EventFieldList) -> None:
+    if isinstance(notification, ua.MonitoredItemNotification) and notification.Value is not None:
+        dv = notification.Value
+        code = dv.StatusCode.value if dv.StatusCode is not None else 0
+        # the DataValue can be shared with the address space and other subscriptions
+        notification.Value = dataclasses.replace(dv, StatusCode=ua.StatusCode(code | _OVERFLOW_INFO_BITS))
+
+
 class InternalSubscription:
     """
     Server internal subscription.
@@ -39,6 +113,10 @@ class InternalSubscription:
         delete_callback: DeleteCallback | None = None,
         no_acks_limit: int = 500,
         max_queue_size: int = 10_000,
+        scheduler: PublishScheduler | None = None,
+        budget: NotificationBudget | None = None,
+        sampler: PublishScheduler | None = None,
+        sample_writes: bool = False,
     ) -> None:
         """
         :param loop: Event loop instance
@@ -52,6 +130,14 @@ class InternalSubscription:
         :param delete_callback: Optional callback to call when the subscription
             is stopped due to the publish count exceeding the
             RevisedLifetimeCount.
+        :param scheduler: Optional server wide scheduler running the publication
+            cycles instead of a dedicated task per subscription.
+        :param budget: Optional notification budget shared by the subscriptions
+            of a session. When exhausted, monitored item queues overflow.
+        :param sampler: Optional scheduler sampling monitored items with a SamplingInterval > 0.
+            Without it all monitored items report every change.
+        :param sample_writes: Report written values at most once per sampling interval,
+            otherwise only nodes with a value callback are sampled.
         """
         self.logger = logging.getLogger(__name__)
         self.data: ua.CreateSubscriptionResult = data
@@ -60,8 +146,9 @@ class InternalSubscription:
         self.monitored_item_srv = MonitoredItemService(self, aspace)
         self.delete_callback: DeleteCallback | None = delete_callback
         self.session_id: ua.NodeId = session_id
-        self._triggered_datachanges: dict[int, list[ua.MonitoredItemNotification]] = {}
-        self._triggered_events: dict[int, list[ua.EventFieldList]] = {}
+        self._triggered_datachanges: dict[int, MonitoredItemQueue] = {}
+        self._triggered_events: dict[int, MonitoredItemQueue] = {}
+        self.budget: NotificationBudget = budget if budget is not None else NotificationBudget()
         self._triggered_statuschanges: list[ua.StatusCode] = []
         self._notification_seq = 1
         self._no_acks_limit = no_acks_limit
@@ -71,6 +158,9 @@ class InternalSubscription:
         self._keep_alive_count = 0
         self._publish_cycles_count = 0
         self._task: asyncio.Task[None] | None = None
+        self._scheduler: PublishScheduler | None = scheduler
+        self.sampler: PublishScheduler | None = sampler
+        self.sample_writes = sample_writes
         self._closing = False
 
     def __str__(self) -> str:
@@ -80,9 +170,15 @@ class InternalSubscription:
         self.logger.debug("starting subscription %s", self.data.SubscriptionId)
         if self.data.RevisedPublishingInterval > 0.0:
             self._closing = False
-            self._task = asyncio.create_task(self._subscription_loop())
+            if self._scheduler is not None:
+                self._scheduler.schedule(self, self.data.RevisedPublishingInterval / 1000.0, self.publish_results)
+            else:
+                self._task = asyncio.create_task(self._subscription_loop())
 
     async def stop(self) -> None:
+        if self._scheduler is not None and self._scheduler.unschedule(self):
+            self.logger.info("stopping internal subscription %s", self.data.SubscriptionId)
+            self._closing = True
         if self._task:
             self.logger.info("stopping internal subscription %s", self.data.SubscriptionId)
             self._closing = True
@@ -93,6 +189,7 @@ class InternalSubscription:
                 pass
             self._task = None
         self.monitored_item_srv.delete_all_monitored_items()
+        self._clear_queues()
 
     async def _trigger_publish(self) -> None:
         """
@@ -157,9 +254,12 @@ class InternalSubscription:
             if self._task:
                 self._closing = True
                 self._task = None
+            if self._scheduler is not None:
+                self._scheduler.unschedule(self)
             if self.delete_callback:
                 self.delete_callback()
             self.monitored_item_srv.delete_all_monitored_items()
+            self._clear_queues()
             return False
         if not self.has_published_results():
             return False
@@ -209,7 +309,8 @@ class InternalSubscription:
         """Append all enqueued data changes to the given `PublishResult` and clear the queue."""
         if self._triggered_datachanges:
             notif = ua.DataChangeNotification()
-            notif.MonitoredItems = [item for sublist in self._triggered_datachanges.values() for item in sublist]
+            notif.MonitoredItems = [item for queue in self._triggered_datachanges.values() for item in queue]
+            self.budget.used -= len(notif.MonitoredItems)
             self._triggered_datachanges = {}
             result.NotificationMessage.NotificationData.append(notif)
 
@@ -217,7 +318,8 @@ class InternalSubscription:
         """Append all enqueued events to the given `PublishResult` and clear the queue."""
         if self._triggered_events:
             notif = ua.EventNotificationList()
-            notif.Events = [item for sublist in self._triggered_events.values() for item in sublist]
+            notif.Events = [item for queue in self._triggered_events.values() for item in queue]
+            self.budget.used -= len(notif.Events)
             self._triggered_events = {}
             result.NotificationMessage.NotificationData.append(notif)
 
@@ -246,23 +348,42 @@ class InternalSubscription:
         self.logger.info("Error request to re-published non existing ack %s in subscription %s", nb, self)
         return ua.NotificationMessage()
 
-    async def enqueue_datachange_event(self, mid: int, eventdata: ua.MonitoredItemNotification, maxsize: int) -> None:
+    async def enqueue_datachange_event(
+        self, mid: int, eventdata: ua.MonitoredItemNotification, maxsize: int, discard_oldest: bool = True
+    ) -> None:
         """
         Enqueue a monitored item data change.
         :param mid: Monitored Item Id
         :param eventdata: Monitored Item Notification
         :param maxsize: Max queue size (0: No limit)
+        :param discard_oldest: Discard the oldest notification when the queue is full, else the newest
         """
-        await self._enqueue_event(mid, eventdata, maxsize, self._triggered_datachanges)
+        await self._enqueue_event(mid, eventdata, maxsize, self._triggered_datachanges, discard_oldest)
 
-    async def enqueue_event(self, mid: int, eventdata: ua.EventFieldList, maxsize: int) -> None:
+    async def enqueue_event(
+        self, mid: int, eventdata: ua.EventFieldList, maxsize: int, discard_oldest: bool = True
+    ) -> None:
         """
         Enqueue a event.
         :param mid: Monitored Item Id
         :param eventdata: Event Field List
         :param maxsize: Max queue size (0: No limit)
+        :param discard_oldest: Discard the oldest event when the queue is full, else the newest
         """
-        await self._enqueue_event(mid, eventdata, maxsize, self._triggered_events)
+        await self._enqueue_event(mid, eventdata, maxsize, self._triggered_events, discard_oldest)
+
+    async def enqueue_datachange_events(
+        self, events: Iterable[tuple[int, ua.MonitoredItemNotification, int, bool]]
+    ) -> None:
+        """
+        Enqueue the data changes of several monitored items, triggering at most one publication.
+        :param events: Monitored Item Id, Monitored Item Notification, max queue size and discard oldest flag
+        """
+        new_item = False
+        for mid, eventdata, maxsize, discard_oldest in events:
+            new_item |= self._put_event(mid, eventdata, maxsize, self._triggered_datachanges, discard_oldest)
+        if new_item:
+            await self._trigger_publish()
 
     async def enqueue_statuschange(self, code: ua.StatusCode) -> None:
         """
@@ -277,15 +398,48 @@ class InternalSubscription:
         mid: int,
         eventdata: ua.MonitoredItemNotification | ua.EventFieldList,
         size: int,
-        queue: dict[int, list[Any]],
+        queues: dict[int, MonitoredItemQueue],
+        discard_oldest: bool = True,
     ) -> None:
-        if mid not in queue:
-            # New Monitored Item Id
-            queue[mid] = [eventdata]
+        if self._put_event(mid, eventdata, size, queues, discard_oldest):
             await self._trigger_publish()
-            return
-        if size != 0:
-            # Limit queue size
-            if len(queue[mid]) >= size:
-                queue[mid].pop(0)
-        queue[mid].append(eventdata)
+
+    def _put_event(
+        self,
+        mid: int,
+        eventdata: ua.MonitoredItemNotification | ua.EventFieldList,
+        size: int,
+        queues: dict[int, MonitoredItemQueue],
+        discard_oldest: bool = True,
+    ) -> bool:
+        """
+        Queue the notification, return True if it is the first one of this monitored item.
+        """
+        queue = queues.get(mid)
+        if queue is None:
+            # New Monitored Item Id
+            queue = queues[mid] = MonitoredItemQueue(size, discard_oldest)
+            queue.put(eventdata)
+            self.budget.used += 1
+            return True
+        queue.size = size
+        queue.discard_oldest = discard_oldest
+        if queue.put(eventdata, self.budget.exhausted()):
+            self.budget.used += 1
+        return False
+
+    def set_budget(self, budget: NotificationBudget) -> None:
+        """
+        Move the queued notifications to another budget, when transferred to another session.
+        """
+        queued = sum(
+            len(queue) for queues in (self._triggered_datachanges, self._triggered_events) for queue in queues.values()
+        )
+        self.budget.used -= queued
+        budget.used += queued
+        self.budget = budget
+
+    def _clear_queues(self) -> None:
+        for queues in (self._triggered_datachanges, self._triggered_events):
+            self.budget.used -= sum(len(queue) for queue in queues.values())
+            queues.clear()
@@ -5,17 +5,22 @@ server side implementation of a subscription object
 from __future__ import annotations
 
 import copy
+import functools
 import logging
+import sys
 from logging import Logger
 from typing import TYPE_CHECKING, Any
 
 from asyncua import ua
+from asyncua.ua.uatypes import _is_ndarray
 
 from .address_space import AddressSpace
 
 if TYPE_CHECKING:
     from .internal_subscription import InternalSubscription
 
+_EU_RANGE = ua.QualifiedName("EURange", 0)
+
 
 class MonitoredItemData:
     def __init__(self) -> None:
@@ -27,6 +32,15 @@ class MonitoredItemData:
         self.mvalue = MonitoredItemValues()
         self.where_clause_evaluator: WhereClauseEvaluator | None = None
         self.queue_size: int = 0
+        self.discard_oldest: bool = True
+        self.item_to_monitor: ua.ReadValueId | None = None
+        # sampled items: interval in ms, polled nodes have a value callback, else the last written value
+        self.sampling_interval: float = 0.0
+        self.polled: bool = False
+        self.sample: ua.DataValue | None = None
+        # EURange of the node for percent deadbands, updated by a datachange callback on the property
+        self.eu_range: ua.Range | None = None
+        self.eu_range_handle: int | None = None
 
 
 class MonitoredItemValues:
@@ -45,6 +59,12 @@ class MonitoredItemValues:
     def get_old_datavalue(self) -> ua.DataValue | None:
         return self.old_dvalue
 
+    def discard_current_datavalue(self) -> None:
+        """
+        Forget a value which was not reported, so the next one is compared to the last reported value.
+        """
+        self.current_dvalue = self.old_dvalue
+
 
 class MonitoredItemService:
     """
@@ -95,11 +115,23 @@ class MonitoredItemService:
         for mdata in self._monitored_items.values():
             result = ua.MonitoredItemModifyResult()
             if mdata.monitored_item_id == params.MonitoredItemId:
+                eu_range = None
+                if _is_percent_deadband(params.RequestedParameters.Filter):
+                    if mdata.item_to_monitor is not None:
+                        eu_range = self._find_property(mdata.item_to_monitor.NodeId, _EU_RANGE)
+                    if eu_range is None:
+                        result.StatusCode = ua.StatusCode(ua.StatusCodes.BadFilterNotAllowed)
+                        return result
                 result.RevisedSamplingInterval = params.RequestedParameters.SamplingInterval
                 result.RevisedQueueSize = params.RequestedParameters.QueueSize
                 if params.RequestedParameters.Filter is not None:
                     mdata.filter = params.RequestedParameters.Filter
+                    self._unwatch_eu_range(mdata)
+                    if eu_range is not None:
+                        self._watch_eu_range(mdata, eu_range)
                 mdata.queue_size = params.RequestedParameters.QueueSize
+                mdata.discard_oldest = params.RequestedParameters.DiscardOldest
+                self._update_sampling(mdata, params.RequestedParameters.SamplingInterval)
                 return result
         result = ua.MonitoredItemModifyResult()
         result.StatusCode(ua.StatusCodes.BadMonitoredItemIdInvalid)
@@ -123,6 +155,7 @@ class MonitoredItemService:
         mdata.client_handle = params.RequestedParameters.ClientHandle
         mdata.monitored_item_id = result.MonitoredItemId
         mdata.queue_size = result.RevisedQueueSize
+        mdata.discard_oldest = params.RequestedParameters.DiscardOldest
         mdata.filter = params.RequestedParameters.Filter
         return result, mdata
 
@@ -167,8 +200,18 @@ class MonitoredItemService:
         )
 
         result, mdata = self._make_monitored_item_common(params)
+        eu_range = None
+        if _is_percent_deadband(mdata.filter):
+            # a PercentDeadband is only allowed on AnalogItems, which have an EURange
+            eu_range = self._find_property(params.ItemToMonitor.NodeId, _EU_RANGE)
+            if eu_range is None:
+                result.StatusCode = ua.StatusCode(ua.StatusCodes.BadFilterNotAllowed)
+                return result
         result.StatusCode, handle = self.aspace.add_datachange_callback(
-            params.ItemToMonitor.NodeId, params.ItemToMonitor.AttributeId, self.datachange_callback
+            params.ItemToMonitor.NodeId,
+            params.ItemToMonitor.AttributeId,
+            self.datachange_callback,
+            self.datachange_callbacks,
         )
 
         self.logger.debug("adding callback return status %s and handle %s", result.StatusCode, handle)
@@ -176,9 +219,83 @@ class MonitoredItemService:
         self._commit_monitored_item(result, mdata)
         if result.StatusCode.is_good():
             self._monitored_datachange[handle] = result.MonitoredItemId
+            mdata.item_to_monitor = params.ItemToMonitor
+            if self._update_sampling(mdata, params.RequestedParameters.SamplingInterval):
+                result.RevisedSamplingInterval = params.RequestedParameters.SamplingInterval
+            if eu_range is not None:
+                self._watch_eu_range(mdata, eu_range)
             await self.trigger_datachange(handle, params.ItemToMonitor.NodeId, params.ItemToMonitor.AttributeId)
         return result
 
+    def _watch_eu_range(self, mdata: MonitoredItemData, prop: ua.NodeId) -> None:
+        """
+        Cache the EURange property of an AnalogItem and keep it up to date when it is written.
+        """
+
+        async def eu_range_changed(handle: int, value: ua.DataValue | None, error: ua.StatusCode | None = None) -> None:
+            mdata.eu_range = _as_range(value) if value is not None else None
+
+        mdata.eu_range = _as_range(self.aspace.read_attribute_value(prop, ua.AttributeIds.Value))
+        _, mdata.eu_range_handle = self.aspace.add_datachange_callback(prop, ua.AttributeIds.Value, eu_range_changed)
+
+    def _unwatch_eu_range(self, mdata: MonitoredItemData) -> None:
+        if mdata.eu_range_handle is not None:
+            self.aspace.delete_datachange_callback(mdata.eu_range_handle)
+        mdata.eu_range = mdata.eu_range_handle = None
+
+    def _find_property(self, nodeid: ua.NodeId, name: ua.QualifiedName) -> ua.NodeId | None:
+        node = self.aspace.get(nodeid)
+        if node is None:
+            return None
+        has_property = ua.NodeId(ua.ObjectIds.HasProperty)
+        for ref in node.references.by_browse_name(name):
+            if ref.IsForward and ref.ReferenceTypeId == has_property:
+                return ref.NodeId
+        return None
+
+    def _update_sampling(self, mdata: MonitoredItemData, requested: float) -> bool:
+        """
+        Sample the item every `requested` ms if it can be sampled, else report its changes as they happen.
+        Return True if the item is sampled.
+        """
+        item = mdata.item_to_monitor
+        if requested > 0 and self.isub.sampler is not None and item is not None:
+            mdata.polled = self.aspace.has_attribute_value_callback(item.NodeId, item.AttributeId)
+            if mdata.polled or self.isub.sample_writes:
+                self._schedule_sampling(mdata, requested)
+                return True
+        self._unschedule_sampling(mdata)
+        return False
+
+    def _schedule_sampling(self, mdata: MonitoredItemData, interval: float) -> None:
+        """
+        Sample the item every `interval` ms, the first time right away.
+        """
+        if self.isub.sampler is None:
+            return
+        mdata.sampling_interval = interval
+        self.isub.sampler.schedule(
+            (self, mdata.monitored_item_id), interval / 1000.0, functools.partial(self._sample, mdata)
+        )
+
+    def _unschedule_sampling(self, mdata: MonitoredItemData) -> None:
+        if self.isub.sampler is not None and mdata.sampling_interval:
+            self.isub.sampler.unschedule((self, mdata.monitored_item_id))
+        mdata.sampling_interval = 0.0
+        mdata.polled = False
+        mdata.sample = None
+
+    async def _sample(self, mdata: MonitoredItemData) -> None:
+        if mdata.monitored_item_id not in self._monitored_items or mdata.item_to_monitor is None:
+            return
+        if mdata.polled:
+            value = self.aspace.read_attribute_value(mdata.item_to_monitor.NodeId, mdata.item_to_monitor.AttributeId)
+        else:
+            value, mdata.sample = mdata.sample, None
+            if value is None:
+                return
+        await self._report_datachange(mdata.monitored_item_id, mdata, value)
+
     def delete_monitored_items(self, ids: list[int]) -> list[ua.StatusCode]:
         self.logger.debug("delete monitored items %s", ids)
         results: list[ua.StatusCode] = []
@@ -195,6 +312,8 @@ class MonitoredItemService:
                 if not mid_list:
                     self._monitored_events.pop(node_key)
                 break
+        self._unschedule_sampling(self._monitored_items[mid])
+        self._unwatch_eu_range(self._monitored_items[mid])
         for handle, owner_mid in self._monitored_datachange.items():
             if owner_mid == mid:
                 self.aspace.delete_datachange_callback(handle)
@@ -240,35 +359,73 @@ class MonitoredItemService:
             )
             await self.trigger_statuschange(error)
         else:
-            event = ua.MonitoredItemNotification()
             mid = self._monitored_datachange[handle]
             mdata = self._monitored_items[mid]
-            mdata.mvalue.set_current_datavalue(value)
-            if mdata.filter:
-                deadband_flag_pass = self._is_data_changed(
-                    mdata.mvalue, mdata.filter.Trigger
-                ) and self._is_deadband_exceeded(mdata.mvalue, mdata.filter)
-            else:
-                deadband_flag_pass = self._is_data_changed(mdata.mvalue, ua.DataChangeTrigger.StatusValue)
-
-            if deadband_flag_pass:
-                event.ClientHandle = mdata.client_handle
-                event.Value = value
-                await self.isub.enqueue_datachange_event(mid, event, mdata.queue_size)
+            if mdata.sampling_interval and not mdata.polled:
+                # reported by the next sample
+                mdata.sample = value
+                return
+            await self._report_datachange(mid, mdata, value)
+
+    async def datachange_callbacks(self, changes: list[tuple[int, ua.DataValue]]) -> None:
+        """
+        Batch version of datachange_callback, for AddressSpace.write_attribute_values.
+        The notifications of all changes are enqueued together.
+        """
+        events: list[tuple[int, ua.MonitoredItemNotification, int, bool]] = []
+        for handle, value in changes:
+            mid = self._monitored_datachange.get(handle)
+            if mid is None:
+                continue
+            mdata = self._monitored_items[mid]
+            if mdata.sampling_interval and not mdata.polled:
+                mdata.sample = value
+                continue
+            event = self._make_datachange_notification(mdata, value)
+            if event is not None:
+                events.append((mid, event, mdata.queue_size, mdata.discard_oldest))
+        if events:
+            await self.isub.enqueue_datachange_events(events)
+
+    async def _report_datachange(self, mid: int, mdata: MonitoredItemData, value: ua.DataValue) -> None:
+        event = self._make_datachange_notification(mdata, value)
+        if event is not None:
+            await self.isub.enqueue_datachange_event(mid, event, mdata.queue_size, mdata.discard_oldest)
+
+    def _make_datachange_notification(
+        self, mdata: MonitoredItemData, value: ua.DataValue
+    ) -> ua.MonitoredItemNotification | None:
+        mdata.mvalue.set_current_datavalue(value)
+        if mdata.filter:
+            deadband_flag_pass = self._is_data_changed(
+                mdata.mvalue, mdata.filter.Trigger
+            ) and self._is_deadband_exceeded(mdata.mvalue, mdata.filter, mdata.eu_range)
+        else:
+            deadband_flag_pass = self._is_data_changed(mdata.mvalue, ua.DataChangeTrigger.StatusValue)
 
-    def _is_deadband_exceeded(self, values: MonitoredItemValues, flt: ua.DataChangeFilter) -> bool:
+        if not deadband_flag_pass:
+            mdata.mvalue.discard_current_datavalue()
+            return None
+        event = ua.MonitoredItemNotification()
+        event.ClientHandle = mdata.client_handle
+        event.Value = value
+        return event
+
+    def _is_deadband_exceeded(
+        self, values: MonitoredItemValues, flt: ua.DataChangeFilter, eu_range: ua.Range | None = None
+    ) -> bool:
         cur = values.get_current_datavalue()
         old = values.get_old_datavalue()
         if flt.DeadbandType == ua.DeadbandType.None_ or old is None:
             return True
         if cur is None or cur.Value is None or old.Value is None:
             return True
-        delta = cur.Value.Value - old.Value.Value
-        if flt.DeadbandType == ua.DeadbandType.Absolute and ((abs(delta)) > flt.DeadbandValue):
-            return True
+        if flt.DeadbandType == ua.DeadbandType.Absolute:
+            return _exceeds(cur.Value.Value, old.Value.Value, flt.DeadbandValue)
         if flt.DeadbandType == ua.DeadbandType.Percent:
-            self.logger.warning("DeadbandType Percent is not implemented !")
-            return True
+            if eu_range is None:
+                return True
+            return _exceeds(cur.Value.Value, old.Value.Value, flt.DeadbandValue / 100 * (eu_range.High - eu_range.Low))
         return False
 
     async def trigger_event(self, event: Any, mid: int | None = None) -> bool:
@@ -298,12 +455,40 @@ class MonitoredItemService:
         fieldlist = ua.EventFieldList()
         fieldlist.ClientHandle = mdata.client_handle
         fieldlist.EventFields = event.to_event_fields(mdata.filter.SelectClauses)
-        await self.isub.enqueue_event(mid, fieldlist, mdata.queue_size)
+        await self.isub.enqueue_event(mid, fieldlist, mdata.queue_size, mdata.discard_oldest)
 
     async def trigger_statuschange(self, code: ua.StatusCode) -> None:
         await self.isub.enqueue_statuschange(code)
 
 
+def _is_percent_deadband(flt: Any) -> bool:
+    return getattr(flt, "DeadbandType", None) == ua.DeadbandType.Percent
+
+
+def _as_range(dv: ua.DataValue) -> ua.Range | None:
+    value = dv.Value.Value if dv.Value is not None else None
+    return value if hasattr(value, "Low") and hasattr(value, "High") else None
+
+
+def _exceeds(cur: Any, old: Any, deadband: float) -> bool:
+    """
+    Compare values against a deadband, arrays element-wise: any element past it exceeds the deadband.
+    Arrays of a different shape always exceed it.
+    """
+    if _is_ndarray(cur) or _is_ndarray(old):
+        numpy = sys.modules["numpy"]
+        cur = numpy.asarray(cur, dtype=float)
+        old = numpy.asarray(old, dtype=float)
+        return cur.shape != old.shape or bool((numpy.abs(cur - old) > deadband).any())
+    if isinstance(cur, list | tuple) or isinstance(old, list | tuple):
+        if not isinstance(cur, list | tuple) or not isinstance(old, list | tuple):
+            return True
+        cur = ua.flatten(list(cur))
+        old = ua.flatten(list(old))
+        return len(cur) != len(old) or any(abs(c - o) > deadband for c, o in zip(cur, old, strict=True))
+    return abs(cur - old) > deadband
+
+
 class WhereClauseEvaluator:
     def __init__(self, logger: Logger, aspace: AddressSpace, whereclause: ua.ContentFilter) -> None:
         self.logger = logger
@@ -0,0 +1,157 @@
+"""
+server wide scheduler running the publishing and sampling cycles of all subscriptions
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class PublishSchedulerStats:
+    """
+    Counters of a PublishScheduler. Lags are in seconds, measured between the due time
+    of a cycle and the moment its callback is actually called.
+    """
+
+    wakeups: int = 0
+    cycles: int = 0
+    skipped_intervals: int = 0
+    last_lag: float = 0.0
+    max_lag: float = 0.0
+    total_lag: float = 0.0
+
+    @property
+    def mean_lag(self) -> float:
+        return self.total_lag / self.cycles if self.cycles else 0.0
+
+
+class PublishScheduler:
+    """
+    Runs the periodic cycles, publishing of subscriptions or sampling of monitored items,
+    of a server from a single task. Cycles are kept in a heap keyed on their next due time,
+    all cycles due within `resolution` seconds are started in the same wakeup.
+    Each callback runs in its own task so a slow cycle does not delay the others, a cycle
+    still running when it is due again is skipped. Cycles missed because the event loop
+    was busy are skipped, not replayed.
+    """
+
+    def __init__(self, resolution: float = 0.001) -> None:
+        self.logger = logging.getLogger(__name__)
+        self.resolution = resolution
+        self.stats = PublishSchedulerStats()
+        self._heap: list[list] = []
+        self._entries: dict[Hashable, list] = {}
+        self._counter = itertools.count()
+        self._running: set[asyncio.Task[None]] = set()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def schedule(self, key: Hashable, period: float, callback: Callable[[], Awaitable[Any]]) -> None:
+        """
+        Await `callback` now and then every `period` seconds until `key` is unscheduled.
+        """
+        self.unschedule(key)
+        entry = [asyncio.get_running_loop().time(), next(self._counter), callback, period, None]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        else:
+            self._wakeup.set()
+
+    def unschedule(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        # lazily removed from the heap once it reaches the top
+        entry[2] = None
+        return True
+
+    async def stop(self) -> None:
+        for entry in self._entries.values():
+            entry[2] = None
+        self._entries.clear()
+        self._heap.clear()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        running = list(self._running)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while self._entries:
+                while self._heap[0][2] is None:
+                    heapq.heappop(self._heap)
+                delay = self._heap[0][0] - loop.time()
+                if delay > self.resolution:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                self._publish_due(loop.time() + self.resolution)
+                # let the started callbacks run before looking at the heap again
+                await asyncio.sleep(0)
+            self._heap.clear()
+        finally:
+            self._task = None
+
+    def _publish_due(self, horizon: float) -> None:
+        batch = []
+        while self._heap and self._heap[0][0] <= horizon:
+            entry = heapq.heappop(self._heap)
+            if entry[2] is not None:
+                batch.append(entry)
+        self.stats.wakeups += 1
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        for entry in batch:
+            due, _, callback, period, running = entry
+            if running is not None and not running.done():
+                # the previous cycle of this callback is not finished yet
+                self.stats.skipped_intervals += 1
+            else:
+                self._record_lag(max(now - due, 0.0))
+                task = asyncio.create_task(self._run_callback(callback))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+                entry[4] = task
+            skipped = int((now - due) // period) if now - due >= period else 0
+            self.stats.skipped_intervals += skipped
+            entry[0] = due + (skipped + 1) * period
+            entry[1] = next(self._counter)
+            heapq.heappush(self._heap, entry)
+
+    async def _run_callback(self, callback: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await callback()
+        except Exception:
+            self.logger.exception("Exception in scheduled callback %s", callback)
+
+    def _record_lag(self, lag: float) -> None:
+        stats = self.stats
+        stats.cycles += 1
+        stats.last_lag = lag
+        stats.total_lag += lag
+        if lag > stats.max_lag:
+            stats.max_lag = lag
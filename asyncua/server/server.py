@@ -883,6 +883,18 @@ class Server:
         """
         return await self.iserver.write_attribute_value(nodeid, datavalue, attr)
 
+    async def write_attribute_values(
+        self,
+        nodeids_and_datavalues: Iterable[tuple[ua.NodeId, ua.DataValue]],
+        attr: ua.AttributeIds = ua.AttributeIds.Value,
+    ) -> list[ua.StatusCode]:
+        """
+        directly write several datavalues at once, bypassing the same checks as write_attribute_value().
+        Data changes are notified to each subscription in one batch, which is much faster when
+        updating many monitored nodes.
+        """
+        return await self.iserver.write_attribute_values(nodeids_and_datavalues, attr)
+
     def set_attribute_value_callback(
         self,
         nodeid: ua.NodeId,
@@ -13,7 +13,8 @@ from asyncua import ua
 from asyncua.common import uamethod, utils
 
 from .address_space import AddressSpace
-from .internal_subscription import InternalSubscription
+from .internal_subscription import InternalSubscription, NotificationBudget
+from .publish_scheduler import PublishScheduler
 
 if TYPE_CHECKING:
     from .internal_server import InternalServer
@@ -33,6 +34,9 @@ class SubscriptionService:
         self._sub_id_counter = 77
         self.standard_events: dict[int, Any] = {}
         self._conditions: dict[ua.NodeId, Any] = {}
+        self.publish_scheduler = PublishScheduler()
+        self.sampling_scheduler = PublishScheduler()
+        self._budgets: dict[ua.NodeId, NotificationBudget] = {}
 
     async def create_subscription(
         self,
@@ -63,11 +67,27 @@ class SubscriptionService:
             delete_callback=lambda: self.subscriptions.pop(result.SubscriptionId, None),
             no_acks_limit=no_acks_limit,
             max_queue_size=max_queue_size,
+            scheduler=self.publish_scheduler,
+            budget=self._session_budget(session_id),
+            sampler=self.sampling_scheduler,
+            sample_writes=self.iserver.sample_monitored_items if self.iserver else False,
         )
         await internal_sub.start()
         self.subscriptions[result.SubscriptionId] = internal_sub
         return result
 
+    def _session_budget(self, session_id: ua.NodeId) -> NotificationBudget:
+        budget = self._budgets.get(session_id)
+        if budget is None:
+            limit = self.iserver.max_queued_notifications_per_session if self.iserver else 0
+            budget = self._budgets[session_id] = NotificationBudget(limit)
+        return budget
+
+    def _release_budgets(self) -> None:
+        session_ids = {sub.session_id for sub in self.subscriptions.values()}
+        for session_id in [sid for sid in self._budgets if sid not in session_ids]:
+            del self._budgets[session_id]
+
     def _clamp_lifetime_count(self, requested: int) -> int:
         if self.iserver is None:
             return requested
@@ -109,6 +129,7 @@ class SubscriptionService:
         for stop_result in stop_results:
             if isinstance(stop_result, Exception):
                 self.logger.warning("Exception while stopping subscription", exc_info=stop_result)
+        self._release_budgets()
         return res
 
     def publish(self, acks: Iterable[ua.SubscriptionAcknowledgement]) -> tuple[int, list[ua.StatusCode]]:
@@ -172,8 +193,10 @@ class SubscriptionService:
                 continue
             sub.session_id = session_id
             sub.pub_result_callback = callback
+            sub.set_budget(self._session_budget(session_id))
             result.AvailableSequenceNumbers = sorted(sub._not_acknowledged_results.keys())
             results.append(result)
+        self._release_budgets()
         return results
 
     async def trigger_event(self, event: Any, subscription_id: int | None = None) -> None:
@@ -3,18 +3,33 @@ import copy
 import logging
 import time
 from collections import deque
-from typing import Literal
+from collections.abc import Awaitable, Callable
+from typing import Any, ClassVar, Literal, NamedTuple
 
 from asyncua import ua
 
 from ..common.connection import SecureConnection, TransportLimits
-from ..common.utils import ServiceError
+from ..common.utils import Buffer, ServiceError
 from ..crypto.security_policies import SecurityPolicyNone
-from ..ua.ua_binary import nodeid_from_binary, struct_from_binary, struct_to_binary, uatcp_to_binary
+from ..ua.ua_binary import from_binary, nodeid_from_binary, struct_from_binary, struct_to_binary, uatcp_to_binary
 from .internal_server import InternalServer, InternalSession
 
 _logger = logging.getLogger(__name__)
 
+SessionRequirement = Literal["none", "session", "activated"]
+ServiceHandler = Callable[["UaProcessor", Any, Any, ua.RequestHeader, Any], Awaitable[bool | None]]
+
+
+class Service(NamedTuple):
+    """
+    Entry of the UaProcessor dispatch table, see `UaProcessor.register_service`.
+    """
+
+    params_type: type | None
+    handler: ServiceHandler
+    response_type: type | None
+    session: SessionRequirement = "activated"
+
 
 class PublishRequestData:
     def __init__(self, requesthdr=None, seqhdr=None, results: list[ua.StatusCode] | None=None):
@@ -32,6 +47,9 @@ class UaProcessor:
     Processor for OPC UA messages. Implements the OPC UA protocol for the server side.
     """
 
+    # encoding NodeId of the request -> Service, filled at import below
+    _services: ClassVar[dict[ua.NodeId, Service]] = {}
+
     def __init__(self, internal_server: InternalServer, transport, limits: TransportLimits):
         self.iserver: InternalServer = internal_server
         self.name = transport.get_extra_info("peername")
@@ -49,16 +67,18 @@ class UaProcessor:
         self._closing: bool = False
         self._session_watchdog_task: asyncio.Task | None = None
         self._watchdog_interval: float = 1.0
+        # services running concurrently, see process_message
+        self._request_tasks: set[asyncio.Task] = set()
 
     def set_policies(self, policies):
         self._connection.set_policy_factories(policies)
 
     def send_response(self, requesthandle, seqhdr, response, msgtype=ua.MessageType.SecureMessage):
         response.ResponseHeader.RequestHandle = requesthandle
-        data = self._connection.message_to_binary(
+        data = self._connection.message_to_buffers(
             struct_to_binary(response), message_type=msgtype, request_id=seqhdr.RequestId
         )
-        self._transport.write(data)
+        self._transport.writelines(data)
 
     def open_secure_channel(self, algohdr, seqhdr, body):
         request = struct_from_binary(ua.OpenSecureChannelRequest, body)
@@ -148,6 +168,7 @@ class UaProcessor:
             if header.MessageType == ua.MessageType.SecureOpen:
                 self.open_secure_channel(msg.SecurityHeader(), msg.SequenceHeader(), msg.body())
             elif header.MessageType == ua.MessageType.SecureClose:
+                await self._wait_requests()
                 self._connection.close()
                 return False
             elif header.MessageType == ua.MessageType.SecureMessage:
@@ -168,10 +189,47 @@ class UaProcessor:
     async def process_message(self, seqhdr, body):
         """
         Process incoming messages.
+
+        With `InternalServer.max_concurrent_requests_per_session` above 1, services
+        of an activated session run as concurrent tasks and answer as they
+        complete; session management requests wait for them first.
         """
         typeid = nodeid_from_binary(body)
         requesthdr = struct_from_binary(ua.RequestHeader, body)
         _logger.debug("process_message %r %r", typeid, requesthdr)
+        service = self._services.get(typeid)
+        if service is not None and service.session == "activated":
+            if self.iserver.max_concurrent_requests_per_session > 1 and self.session is not None:
+                # bound the requests in flight, further messages queue up behind this one
+                semaphore = self.session.request_semaphore
+                await semaphore.acquire()
+                task = asyncio.create_task(
+                    self._process_concurrent_message(semaphore, typeid, requesthdr, seqhdr, body)
+                )
+                self._request_tasks.add(task)
+                task.add_done_callback(self._request_tasks.discard)
+                return True
+        else:
+            await self._wait_requests()
+        return await self._process_message_with_faults(typeid, requesthdr, seqhdr, body)
+
+    async def _process_concurrent_message(
+        self, semaphore: asyncio.Semaphore, typeid: ua.NodeId, requesthdr: ua.RequestHeader, seqhdr: Any, body: Buffer
+    ) -> None:
+        try:
+            if not await self._process_message_with_faults(typeid, requesthdr, seqhdr, body):
+                _logger.info("processor returned False, we close connection from %s", self.name)
+                self._transport.close()
+        finally:
+            semaphore.release()
+
+    async def _wait_requests(self) -> None:
+        if self._request_tasks:
+            await asyncio.wait(self._request_tasks)
+
+    async def _process_message_with_faults(
+        self, typeid: ua.NodeId, requesthdr: ua.RequestHeader, seqhdr: Any, body: Buffer
+    ) -> bool:
         try:
             return await self._process_message(typeid, requesthdr, seqhdr, body)
         except (ServiceError, ua.uaerrors.UaStatusCodeError) as e:
@@ -190,6 +248,8 @@ class UaProcessor:
             response = ua.ServiceFault()
             response.ResponseHeader.ServiceResult = ua.StatusCode(ua.StatusCodes.BadUserAccessDenied)
             self.send_response(requesthdr.RequestHandle, seqhdr, response)
+            # the connection of a denied user is closed
+            return False
         except Exception:
             _logger.exception("Error while processing message")
             response = ua.ServiceFault()
@@ -197,383 +257,298 @@ class UaProcessor:
             self.send_response(requesthdr.RequestHandle, seqhdr, response)
             return True
 
-    async def _process_message(self, typeid, requesthdr, seqhdr, body):
-        if typeid in [
-            ua.NodeId(ua.ObjectIds.CreateSessionRequest_Encoding_DefaultBinary),
-            ua.NodeId(ua.ObjectIds.CloseSessionRequest_Encoding_DefaultBinary),
-            ua.NodeId(ua.ObjectIds.ActivateSessionRequest_Encoding_DefaultBinary),
-            ua.NodeId(ua.ObjectIds.FindServersRequest_Encoding_DefaultBinary),
-            ua.NodeId(ua.ObjectIds.GetEndpointsRequest_Encoding_DefaultBinary),
-            ua.NodeId(ua.ObjectIds.RegisterServerRequest_Encoding_DefaultBinary),
-            ua.NodeId(ua.ObjectIds.RegisterServer2Request_Encoding_DefaultBinary),
-        ]:
-            # The connection is first created without a user being attached, and then during activation the
-            user = None
-        elif self.session is None:
-            _logger.warning("Received a request of type %d without an existing session", typeid.Identifier)
-            raise ua.uaerrors.BadUserAccessDenied
-        else:
-            user = self.session.user
-            if self._connection.security_policy.permissions is not None:
-                if self._connection.security_policy.permissions.check_validity(user, typeid, body) is False:
+    async def _process_message(
+        self, typeid: ua.NodeId, requesthdr: ua.RequestHeader, seqhdr: Any, body: Buffer
+    ) -> bool:
+        service = self._services.get(typeid)
+        requirement = service.session if service is not None else "activated"
+        if requirement != "none":
+            if self.session is None:
+                _logger.warning("Received a request of type %d without an existing session", typeid.Identifier)
+                raise ua.uaerrors.BadUserAccessDenied
+            permissions = self._connection.security_policy.permissions
+            if permissions is not None:
+                if permissions.check_validity(self.session.user, typeid, body) is False:
                     raise ua.uaerrors.BadUserAccessDenied
 
         self.session_last_activity = time.monotonic()
         if self.session is not None:
             self.session.touch()
 
-        if typeid == ua.NodeId(ua.ObjectIds.CreateSessionRequest_Encoding_DefaultBinary):
-            _logger.info("Create session request (%s)", user)
-            params = struct_from_binary(ua.CreateSessionParameters, body)
-            # create the session on server
-            self.session = self.iserver.create_session(self.name, external=True)
-            # get a session creation result to send back
-            sessiondata = await self.session.create_session(params, sockname=self.sockname)
-            self._closing = False
-            self._session_watchdog_task = asyncio.create_task(self._session_watchdog_loop())
-            response = ua.CreateSessionResponse()
-            response.Parameters = sessiondata
-            response.Parameters.ServerCertificate = self._connection.security_policy.host_certificate
-            data = b""
-            if self._connection.security_policy.peer_certificate is not None:
-                data += self._connection.security_policy.peer_certificate
-            if params.ClientNonce is not None:
-                data += params.ClientNonce
-            response.Parameters.ServerSignature.Signature = (
-                self._connection.security_policy.asymmetric_cryptography.signature(data)
-            )
-            response.Parameters.ServerSignature.Algorithm = self._connection.security_policy.AsymmetricSignatureURI
-            # _logger.info("sending create session response")
-            self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-        elif typeid == ua.NodeId(ua.ObjectIds.CloseSessionRequest_Encoding_DefaultBinary):
-            _logger.info("Close session request (%s)", user)
-            if self.session:
-                deletesubs = ua.ua_binary.Primitives.Boolean.unpack(body)
-                self._closing = True
-                await self.session.close_session(deletesubs)
-            else:
-                _logger.info("Request to close non-existing session (%s)", user)
-
-            response = ua.CloseSessionResponse()
-            _logger.info("sending close session response (%s)", user)
-            self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-        elif typeid == ua.NodeId(ua.ObjectIds.ActivateSessionRequest_Encoding_DefaultBinary):
-            _logger.info("Activate session request (%s)", user)
-            params = struct_from_binary(ua.ActivateSessionParameters, body)
-            if not self.session:
-                # Spec Part 4 §6.7 reconnect: a fresh SecureChannel may carry an
-                # ActivateSession for a still-live session. Look it up by auth_token
-                # and rebind any existing subscriptions' publish callbacks here.
-                existing = self.iserver.lookup_external_session(requesthdr.AuthenticationToken)
-                if existing is None:
-                    _logger.info("request to activate non-existing session (%s)", user)
-                    raise ServiceError(ua.StatusCodes.BadSessionIdInvalid)
-                self.session = existing
-                self._closing = False
-                if self._session_watchdog_task is None or self._session_watchdog_task.done():
-                    self._session_watchdog_task = asyncio.create_task(self._session_watchdog_loop())
-                for sub in self.iserver.subscription_service.subscriptions.values():
-                    if sub.session_id == existing.session_id:
-                        sub.pub_result_callback = self.forward_publish_response
-                        sub.pub_request_callback = self.get_publish_request
-            if self._connection.security_policy.host_certificate is None:
-                data = self.session.nonce
-            else:
-                data = self._connection.security_policy.host_certificate + self.session.nonce
-            self._connection.security_policy.asymmetric_cryptography.verify(data, params.ClientSignature.Signature)
-            result = self.session.activate_session(params, self._connection.security_policy.peer_certificate)
-            response = ua.ActivateSessionResponse()
-            response.Parameters = result
-            # _logger.info("sending read response")
-            self.send_response(requesthdr.RequestHandle, seqhdr, response)
-        elif typeid == ua.NodeId(ua.ObjectIds.GetEndpointsRequest_Encoding_DefaultBinary):
-            _logger.info("get endpoints request (%s)", user)
-            params = struct_from_binary(ua.GetEndpointsParameters, body)
-            endpoints = await self.iserver.get_endpoints(params, sockname=self.sockname)
-            response = ua.GetEndpointsResponse()
-            response.Endpoints = endpoints
-            # _logger.info("sending get endpoints response")
-            self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-        elif typeid == ua.NodeId(ua.ObjectIds.FindServersRequest_Encoding_DefaultBinary):
-            _logger.info("find servers request (%s)", user)
-            params = struct_from_binary(ua.FindServersParameters, body)
-            servers = self.iserver.find_servers(params, sockname=self.sockname)
-            response = ua.FindServersResponse()
-            response.Servers = servers
-            # _logger.info("sending find servers response")
-            self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-        elif typeid == ua.NodeId(ua.ObjectIds.RegisterServerRequest_Encoding_DefaultBinary):
-            _logger.info("register server request %s", user)
-            serv = struct_from_binary(ua.RegisteredServer, body)
-            self.iserver.register_server(serv)
-            response = ua.RegisterServerResponse()
-            # _logger.info("sending register server response")
+        if requirement == "activated":
+            # All services that require an active session
+            if not self._active_session.is_activated():
+                _logger.info("Request service that needs a activated session (%s)", self._user)
+                raise ServiceError(ua.StatusCodes.BadSessionNotActivated)
+        if service is None:
+            _logger.warning("Unknown message received %s (%s)", typeid, self._user)
+            raise ServiceError(ua.StatusCodes.BadServiceUnsupported)
+
+        params = from_binary(service.params_type, body) if service.params_type is not None else None
+        response = service.response_type() if service.response_type is not None else None
+        keep_open = await service.handler(self, params, response, requesthdr, seqhdr)
+        if response is not None:
             self.send_response(requesthdr.RequestHandle, seqhdr, response)
+        return keep_open is not False
+
+    @property
+    def _user(self):
+        return self.session.user if self.session is not None else None
+
+    @property
+    def _active_session(self) -> InternalSession:
+        # handlers of services requiring a session only run once _process_message checked it exists
+        assert self.session is not None
+        return self.session
+
+    @classmethod
+    def register_service(
+        cls,
+        request_type: type,
+        params_type: type | None,
+        handler: "ServiceHandler",
+        response_type: type | None,
+        session: SessionRequirement = "activated",
+    ) -> None:
+        """
+        Register or override the handler of a service.
+
+        `request_type` is the request structure (e.g. `ua.BrowseNextRequest`); its
+        binary encoding NodeId is the dispatch key. The request body following
+        the RequestHeader is decoded as `params_type` and passed to
+        `handler(processor, params, response, requesthdr, seqhdr)` together with
+        a fresh `response_type()` instance which is sent once the handler
+        returns. A handler that answers by itself (like Publish) uses a
+        `response_type` of None. Returning False closes the connection.
+
+        `session` tells what the service needs: "none" (session management
+        and discovery), "session" (an existing session) or "activated".
+        Registering on a subclass leaves UaProcessor untouched.
+        """
+        if "_services" not in cls.__dict__:
+            cls._services = dict(cls._services)
+        typeid = ua.NodeId(getattr(ua.ObjectIds, f"{request_type.__name__}_Encoding_DefaultBinary"))
+        cls._services[typeid] = Service(params_type, handler, response_type, session)
+
+    async def _create_session(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("Create session request (%s)", self._user)
+        # create the session on server
+        self.session = self.iserver.create_session(self.name, external=True)
+        # get a session creation result to send back
+        sessiondata = await self.session.create_session(params, sockname=self.sockname)
+        self._closing = False
+        self._session_watchdog_task = asyncio.create_task(self._session_watchdog_loop())
+        response.Parameters = sessiondata
+        response.Parameters.ServerCertificate = self._connection.security_policy.host_certificate
+        data = b""
+        if self._connection.security_policy.peer_certificate is not None:
+            data += self._connection.security_policy.peer_certificate
+        if params.ClientNonce is not None:
+            data += params.ClientNonce
+        response.Parameters.ServerSignature.Signature = (
+            self._connection.security_policy.asymmetric_cryptography.signature(data)
+        )
+        response.Parameters.ServerSignature.Algorithm = self._connection.security_policy.AsymmetricSignatureURI
 
-        elif typeid == ua.NodeId(ua.ObjectIds.RegisterServer2Request_Encoding_DefaultBinary):
-            _logger.info("register server 2 request %s", user)
-            params = struct_from_binary(ua.RegisterServer2Parameters, body)
-            results = self.iserver.register_server2(params)
-            response = ua.RegisterServer2Response()
-            response.ConfigurationResults = results
-            # _logger.info("sending register server 2 response")
-            self.send_response(requesthdr.RequestHandle, seqhdr, response)
-        elif typeid == ua.NodeId(ua.ObjectIds.CloseSecureChannelRequest_Encoding_DefaultBinary):
-            _logger.info("close secure channel request (%s)", user)
-            self._connection.close()
-            response = ua.CloseSecureChannelResponse()
-            self.send_response(requesthdr.RequestHandle, seqhdr, response)
-            return False
+    async def _close_session(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("Close session request (%s)", self._user)
+        if self.session:
+            self._closing = True
+            await self.session.close_session(params)
         else:
-            # All services that require an active session
-            if not self.session:
-                _logger.info("Request service that need a session (%s)", user)
+            _logger.info("Request to close non-existing session (%s)", self._user)
+        _logger.info("sending close session response (%s)", self._user)
+
+    async def _activate_session(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("Activate session request (%s)", self._user)
+        if not self.session:
+            # Spec Part 4 §6.7 reconnect: a fresh SecureChannel may carry an
+            # ActivateSession for a still-live session. Look it up by auth_token
+            # and rebind any existing subscriptions' publish callbacks here.
+            existing = self.iserver.lookup_external_session(requesthdr.AuthenticationToken)
+            if existing is None:
+                _logger.info("request to activate non-existing session (%s)", self._user)
                 raise ServiceError(ua.StatusCodes.BadSessionIdInvalid)
-            if not self.session.is_activated():
-                _logger.info("Request service that needs a activated session (%s)", user)
-                raise ServiceError(ua.StatusCodes.BadSessionNotActivated)
+            self.session = existing
+            self._closing = False
+            if self._session_watchdog_task is None or self._session_watchdog_task.done():
+                self._session_watchdog_task = asyncio.create_task(self._session_watchdog_loop())
+            for sub in self.iserver.subscription_service.subscriptions.values():
+                if sub.session_id == existing.session_id:
+                    sub.pub_result_callback = self.forward_publish_response
+                    sub.pub_request_callback = self.get_publish_request
+        nonce = self.session.nonce
+        # the nonce is set when the session is created
+        assert nonce is not None
+        if self._connection.security_policy.host_certificate is None:
+            data = nonce
+        else:
+            data = self._connection.security_policy.host_certificate + nonce
+        self._connection.security_policy.asymmetric_cryptography.verify(data, params.ClientSignature.Signature)
+        result = self.session.activate_session(params, self._connection.security_policy.peer_certificate)
+        response.Parameters = result
 
-            if typeid == ua.NodeId(ua.ObjectIds.ReadRequest_Encoding_DefaultBinary):
-                _logger.info("Read request (%s)", user)
-                params = struct_from_binary(ua.ReadParameters, body)
-                results = await self.session.read(params)
-                response = ua.ReadResponse()
-                response.Results = results
-                # _logger.info("sending read response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.WriteRequest_Encoding_DefaultBinary):
-                _logger.info("Write request (%s)", user)
-                params = struct_from_binary(ua.WriteParameters, body)
-                results = await self.session.write(params)
-                response = ua.WriteResponse()
-                response.Results = results
-                # _logger.info("sending write response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.BrowseRequest_Encoding_DefaultBinary):
-                _logger.info("Browse request (%s)", user)
-                params = struct_from_binary(ua.BrowseParameters, body)
-                results = await self.session.browse(params)
-                response = ua.BrowseResponse()
-                response.Results = results
-                # _logger.info("sending browse response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.TranslateBrowsePathsToNodeIdsRequest_Encoding_DefaultBinary):
-                _logger.info("translate browsepaths to nodeids request (%s)", user)
-                params = struct_from_binary(ua.TranslateBrowsePathsToNodeIdsParameters, body)
-                paths = await self.session.translate_browsepaths_to_nodeids(params.BrowsePaths)
-                response = ua.TranslateBrowsePathsToNodeIdsResponse()
-                response.Results = paths
-                # _logger.info("sending translate browsepaths to nodeids response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.AddNodesRequest_Encoding_DefaultBinary):
-                _logger.info("add nodes request (%s)", user)
-                params = struct_from_binary(ua.AddNodesParameters, body)
-                results = await self.session.add_nodes(params.NodesToAdd)
-                response = ua.AddNodesResponse()
-                response.Results = results
-                # _logger.info("sending add node response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.DeleteNodesRequest_Encoding_DefaultBinary):
-                _logger.info("delete nodes request (%s)", user)
-                params = struct_from_binary(ua.DeleteNodesParameters, body)
-                results = await self.session.delete_nodes(params)
-                response = ua.DeleteNodesResponse()
-                response.Results = results
-                # _logger.info("sending delete node response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.AddReferencesRequest_Encoding_DefaultBinary):
-                _logger.info("add references request (%s)", user)
-                params = struct_from_binary(ua.AddReferencesParameters, body)
-                results = await self.session.add_references(params.ReferencesToAdd)
-                response = ua.AddReferencesResponse()
-                response.Results = results
-                # _logger.info("sending add references response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.DeleteReferencesRequest_Encoding_DefaultBinary):
-                _logger.info("delete references request (%s)", user)
-                params = struct_from_binary(ua.DeleteReferencesParameters, body)
-                results = await self.session.delete_references(params.ReferencesToDelete)
-                response = ua.DeleteReferencesResponse()
-                response.Parameters.Results = results
-                # _logger.info("sending delete references response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.CreateSubscriptionRequest_Encoding_DefaultBinary):
-                _logger.info("create subscription request (%s)", user)
-                params = struct_from_binary(ua.CreateSubscriptionParameters, body)
-                result = await self.session.create_subscription(
-                    params, self.forward_publish_response, request_callback=self.get_publish_request
-                )
-                response = ua.CreateSubscriptionResponse()
-                response.Parameters = result
-                # _logger.info("sending create subscription response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.ModifySubscriptionRequest_Encoding_DefaultBinary):
-                _logger.info("modify subscription request")
-                params = struct_from_binary(ua.ModifySubscriptionParameters, body)
-
-                result = self.session.modify_subscription(params)
-
-                response = ua.ModifySubscriptionResponse()
-                response.Parameters = result
-
-                # _logger.info("sending modify subscription response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.DeleteSubscriptionsRequest_Encoding_DefaultBinary):
-                _logger.info("delete subscriptions request (%s)", user)
-                params = struct_from_binary(ua.DeleteSubscriptionsParameters, body)
-                results = await self.session.delete_subscriptions(params.SubscriptionIds)
-                response = ua.DeleteSubscriptionsResponse()
-                response.Results = results
-                # _logger.info("sending delete subscription response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.CreateMonitoredItemsRequest_Encoding_DefaultBinary):
-                _logger.info("create monitored items request (%s)", user)
-                params = struct_from_binary(ua.CreateMonitoredItemsParameters, body)
-                results = await self.session.create_monitored_items(params)
-                response = ua.CreateMonitoredItemsResponse()
-                response.Results = results
-                # _logger.info("sending create monitored items response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.ModifyMonitoredItemsRequest_Encoding_DefaultBinary):
-                _logger.info("modify monitored items request (%s)", user)
-                params = struct_from_binary(ua.ModifyMonitoredItemsParameters, body)
-                results = await self.session.modify_monitored_items(params)
-                response = ua.ModifyMonitoredItemsResponse()
-                response.Results = results
-                # _logger.info("sending modify monitored items response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.DeleteMonitoredItemsRequest_Encoding_DefaultBinary):
-                _logger.info("delete monitored items request (%s)", user)
-                params = struct_from_binary(ua.DeleteMonitoredItemsParameters, body)
-                results = await self.session.delete_monitored_items(params)
-                response = ua.DeleteMonitoredItemsResponse()
-                response.Results = results
-                # _logger.info("sending delete monitored items response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.HistoryReadRequest_Encoding_DefaultBinary):
-                _logger.info("history read request (%s)", user)
-                params = struct_from_binary(ua.HistoryReadParameters, body)
-                results = await self.session.history_read(params)
-                response = ua.HistoryReadResponse()
-                response.Results = results
-                # _logger.info("sending history read response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.RegisterNodesRequest_Encoding_DefaultBinary):
-                _logger.info("register nodes request (%s)", user)
-                params = struct_from_binary(ua.RegisterNodesParameters, body)
-                _logger.info("Node registration not implemented")
-                response = ua.RegisterNodesResponse()
-                response.Parameters.RegisteredNodeIds = params.NodesToRegister
-                # _logger.info("sending register nodes response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.UnregisterNodesRequest_Encoding_DefaultBinary):
-                _logger.info("unregister nodes request (%s)", user)
-                params = struct_from_binary(ua.UnregisterNodesParameters, body)
-                response = ua.UnregisterNodesResponse()
-                # _logger.info("sending unregister nodes response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.PublishRequest_Encoding_DefaultBinary):
-                _logger.debug("publish request (%s)", user)
-                if not self.session:
-                    return False
-                params = struct_from_binary(ua.PublishParameters, body)
-                subscriptions, results = self.session.publish(params.SubscriptionAcknowledgements)
-                data = PublishRequestData(requesthdr=requesthdr, seqhdr=seqhdr, results=results)
-                # If there is an enqueued publish results callback, try to call it immediately
-                while self._publish_results_subs:
-                    subscription_id = next(iter(self._publish_results_subs))
-                    self._publish_results_subs.pop(subscription_id)
-                    sub = self.session.subscription_service.subscriptions.get(subscription_id)
-                    if sub is None:
-                        # subscription is no longer active
-                        continue
-                    if await sub.publish_results(data):
-                        # publish request has been consumed
-                        break
-                else:
-                    if len(self._publish_requests) >= self.publish_request_limit(subscriptions):
-                        self._evict_publish_request()
-                    # Store the Publish Request (will be used to send publish answers from server)
-                    self._publish_requests.append(data)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.RepublishRequest_Encoding_DefaultBinary):
-                _logger.info("re-publish request (%s)", user)
-                params = struct_from_binary(ua.RepublishParameters, body)
-                msg = self.session.republish(params)
-                response = ua.RepublishResponse()
-                response.NotificationMessage = msg
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.TransferSubscriptionsRequest_Encoding_DefaultBinary):
-                _logger.info("transfer subscriptions request (%s)", user)
-                params = struct_from_binary(ua.TransferSubscriptionsParameters, body)
-                results = await self.session.transfer_subscriptions(params, self.forward_publish_response)
-                response = ua.TransferSubscriptionsResponse()
-                response.Parameters.Results = results
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.CallRequest_Encoding_DefaultBinary):
-                _logger.info("call request (%s)", user)
-                params = struct_from_binary(ua.CallParameters, body)
-                results = await self.session.call(params.MethodsToCall)
-                response = ua.CallResponse()
-                response.Results = results
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.SetMonitoringModeRequest_Encoding_DefaultBinary):
-                _logger.info("set monitoring mode request (%s)", user)
-                params = struct_from_binary(ua.SetMonitoringModeParameters, body)
-                # FIXME: Implement SetMonitoringMode
-                # For now send dummy results to keep clients happy
-                response = ua.SetMonitoringModeResponse()
-                results = ua.SetMonitoringModeResult()
-                ids = params.MonitoredItemIds
-                statuses = [ua.StatusCode(ua.StatusCodes.Good) for node_id in ids]
-                results.Results = statuses
-                response.Parameters = results
-                _logger.info("sending set monitoring mode response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
-
-            elif typeid == ua.NodeId(ua.ObjectIds.SetPublishingModeRequest_Encoding_DefaultBinary):
-                _logger.info("set publishing mode request (%s)", user)
-                params = struct_from_binary(ua.SetPublishingModeParameters, body)
-                # FIXME: Implement SetPublishingMode
-                # For now send dummy results to keep clients happy
-                response = ua.SetPublishingModeResponse()
-                results = ua.SetPublishingModeResult()
-                ids = params.SubscriptionIds
-                statuses = [ua.StatusCode(ua.StatusCodes.Good) for node_id in ids]
-                results.Results = statuses
-                response.Parameters = results
-                _logger.info("sending set publishing mode response")
-                self.send_response(requesthdr.RequestHandle, seqhdr, response)
+    async def _get_endpoints(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("get endpoints request (%s)", self._user)
+        response.Endpoints = await self.iserver.get_endpoints(params, sockname=self.sockname)
+
+    async def _find_servers(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("find servers request (%s)", self._user)
+        response.Servers = self.iserver.find_servers(params, sockname=self.sockname)
+
+    async def _register_server(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("register server request %s", self._user)
+        self.iserver.register_server(params)
+
+    async def _register_server2(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("register server 2 request %s", self._user)
+        self.iserver.register_server2(params)
+
+    async def _close_secure_channel(
+        self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any
+    ) -> bool:
+        _logger.info("close secure channel request (%s)", self._user)
+        self._connection.close()
+        return False
+
+    async def _read(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("Read request (%s)", self._user)
+        response.Results = await self._active_session.read(params)
+
+    async def _write(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("Write request (%s)", self._user)
+        response.Results = await self._active_session.write(params)
+
+    async def _browse(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("Browse request (%s)", self._user)
+        response.Results = await self._active_session.browse(params)
+
+    async def _translate_browsepaths_to_nodeids(
+        self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any
+    ) -> None:
+        _logger.info("translate browsepaths to nodeids request (%s)", self._user)
+        response.Results = await self._active_session.translate_browsepaths_to_nodeids(params.BrowsePaths)
+
+    async def _add_nodes(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("add nodes request (%s)", self._user)
+        response.Results = await self._active_session.add_nodes(params.NodesToAdd)
+
+    async def _delete_nodes(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("delete nodes request (%s)", self._user)
+        response.Results = await self._active_session.delete_nodes(params)
+
+    async def _add_references(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("add references request (%s)", self._user)
+        response.Results = await self._active_session.add_references(params.ReferencesToAdd)
+
+    async def _delete_references(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("delete references request (%s)", self._user)
+        response.Parameters.Results = await self._active_session.delete_references(params.ReferencesToDelete)
+
+    async def _create_subscription(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("create subscription request (%s)", self._user)
+        response.Parameters = await self._active_session.create_subscription(
+            params, self.forward_publish_response, request_callback=self.get_publish_request
+        )
 
-            else:
-                _logger.warning("Unknown message received %s (%s)", typeid, user)
-                raise ServiceError(ua.StatusCodes.BadServiceUnsupported)
+    async def _modify_subscription(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("modify subscription request")
+        response.Parameters = self._active_session.modify_subscription(params)
+
+    async def _delete_subscriptions(
+        self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any
+    ) -> None:
+        _logger.info("delete subscriptions request (%s)", self._user)
+        response.Results = await self._active_session.delete_subscriptions(params.SubscriptionIds)
+
+    async def _create_monitored_items(
+        self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any
+    ) -> None:
+        _logger.info("create monitored items request (%s)", self._user)
+        response.Results = await self._active_session.create_monitored_items(params)
+
+    async def _modify_monitored_items(
+        self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any
+    ) -> None:
+        _logger.info("modify monitored items request (%s)", self._user)
+        response.Results = await self._active_session.modify_monitored_items(params)
+
+    async def _delete_monitored_items(
+        self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any
+    ) -> None:
+        _logger.info("delete monitored items request (%s)", self._user)
+        response.Results = await self._active_session.delete_monitored_items(params)
+
+    async def _history_read(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("history read request (%s)", self._user)
+        response.Results = await self._active_session.history_read(params)
+
+    async def _browse_next(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("Browse next request (%s)", self._user)
+        response.Parameters.Results = await self._active_session.browse_next(params)
+
+    async def _register_nodes(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("register nodes request (%s)", self._user)
+        _logger.info("Node registration not implemented")
+        response.Parameters.RegisteredNodeIds = params.NodesToRegister
+
+    async def _unregister_nodes(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("unregister nodes request (%s)", self._user)
+
+    async def _publish(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.debug("publish request (%s)", self._user)
+        subscriptions, results = self._active_session.publish(params.SubscriptionAcknowledgements)
+        data = PublishRequestData(requesthdr=requesthdr, seqhdr=seqhdr, results=results)
+        # If there is an enqueued publish results callback, try to call it immediately
+        while self._publish_results_subs:
+            subscription_id = next(iter(self._publish_results_subs))
+            self._publish_results_subs.pop(subscription_id)
+            sub = self._active_session.subscription_service.subscriptions.get(subscription_id)
+            if sub is None:
+                # subscription is no longer active
+                continue
+            if await sub.publish_results(data):
+                # publish request has been consumed
+                break
+        else:
+            if len(self._publish_requests) >= self.publish_request_limit(subscriptions):
+                self._evict_publish_request()
+            # Store the Publish Request (will be used to send publish answers from server)
+            self._publish_requests.append(data)
+
+    async def _republish(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("re-publish request (%s)", self._user)
+        response.NotificationMessage = self._active_session.republish(params)
+
+    async def _transfer_subscriptions(
+        self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any
+    ) -> None:
+        _logger.info("transfer subscriptions request (%s)", self._user)
+        response.Parameters.Results = await self._active_session.transfer_subscriptions(
+            params, self.forward_publish_response
+        )
 
-        return True
+    async def _call(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("call request (%s)", self._user)
+        response.Results = await self._active_session.call(params.MethodsToCall)
+
+    async def _set_monitoring_mode(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("set monitoring mode request (%s)", self._user)
+        # FIXME: Implement SetMonitoringMode
+        # For now send dummy results to keep clients happy
+        results = ua.SetMonitoringModeResult()
+        results.Results = [ua.StatusCode(ua.StatusCodes.Good) for node_id in params.MonitoredItemIds]
+        response.Parameters = results
+        _logger.info("sending set monitoring mode response")
+
+    async def _set_publishing_mode(self, params: Any, response: Any, requesthdr: ua.RequestHeader, seqhdr: Any) -> None:
+        _logger.info("set publishing mode request (%s)", self._user)
+        # FIXME: Implement SetPublishingMode
+        # For now send dummy results to keep clients happy
+        results = ua.SetPublishingModeResult()
+        results.Results = [ua.StatusCode(ua.StatusCodes.Good) for node_id in params.SubscriptionIds]
+        response.Parameters = results
+        _logger.info("sending set publishing mode response")
 
     def publish_request_limit(self, subscription_count: int) -> int:
         # "A Server should limit the number of active Publish
@@ -599,6 +574,8 @@ class UaProcessor:
         """
         _logger.info("Cleanup client connection: %s", self.name)
         self._closing = True
+        for task in self._request_tasks:
+            task.cancel()
         try:
             if self._session_watchdog_task and self._session_watchdog_task is not asyncio.current_task():
                 self._session_watchdog_task.cancel()
@@ -634,3 +611,142 @@ class UaProcessor:
             if time.monotonic() - self.session_last_activity > session_timeout:
                 _logger.warning("Session timed out after %ss of inactivity", session_timeout)
                 await self.close()
+
+
+for _request, _params, _handler, _response, _session in (
+    (
+        ua.CreateSessionRequest,
+        ua.CreateSessionParameters,
+        UaProcessor._create_session,
+        ua.CreateSessionResponse,
+        "none",
+    ),
+    (ua.CloseSessionRequest, ua.Boolean, UaProcessor._close_session, ua.CloseSessionResponse, "none"),
+    (
+        ua.ActivateSessionRequest,
+        ua.ActivateSessionParameters,
+        UaProcessor._activate_session,
+        ua.ActivateSessionResponse,
+        "none",
+    ),
+    (ua.FindServersRequest, ua.FindServersParameters, UaProcessor._find_servers, ua.FindServersResponse, "none"),
+    (ua.GetEndpointsRequest, ua.GetEndpointsParameters, UaProcessor._get_endpoints, ua.GetEndpointsResponse, "none"),
+    (ua.RegisterServerRequest, ua.RegisteredServer, UaProcessor._register_server, ua.RegisterServerResponse, "none"),
+    (
+        ua.RegisterServer2Request,
+        ua.RegisterServer2Parameters,
+        UaProcessor._register_server2,
+        ua.RegisterServer2Response,
+        "none",
+    ),
+    (ua.CloseSecureChannelRequest, None, UaProcessor._close_secure_channel, ua.CloseSecureChannelResponse, "session"),
+    (ua.ReadRequest, ua.ReadParameters, UaProcessor._read, ua.ReadResponse, "activated"),
+    (ua.WriteRequest, ua.WriteParameters, UaProcessor._write, ua.WriteResponse, "activated"),
+    (ua.BrowseRequest, ua.BrowseParameters, UaProcessor._browse, ua.BrowseResponse, "activated"),
+    (ua.BrowseNextRequest, ua.BrowseNextParameters, UaProcessor._browse_next, ua.BrowseNextResponse, "activated"),
+    (
+        ua.TranslateBrowsePathsToNodeIdsRequest,
+        ua.TranslateBrowsePathsToNodeIdsParameters,
+        UaProcessor._translate_browsepaths_to_nodeids,
+        ua.TranslateBrowsePathsToNodeIdsResponse,
+        "activated",
+    ),
+    (ua.AddNodesRequest, ua.AddNodesParameters, UaProcessor._add_nodes, ua.AddNodesResponse, "activated"),
+    (ua.DeleteNodesRequest, ua.DeleteNodesParameters, UaProcessor._delete_nodes, ua.DeleteNodesResponse, "activated"),
+    (
+        ua.AddReferencesRequest,
+        ua.AddReferencesParameters,
+        UaProcessor._add_references,
+        ua.AddReferencesResponse,
+        "activated",
+    ),
+    (
+        ua.DeleteReferencesRequest,
+        ua.DeleteReferencesParameters,
+        UaProcessor._delete_references,
+        ua.DeleteReferencesResponse,
+        "activated",
+    ),
+    (
+        ua.CreateSubscriptionRequest,
+        ua.CreateSubscriptionParameters,
+        UaProcessor._create_subscription,
+        ua.CreateSubscriptionResponse,
+        "activated",
+    ),
+    (
+        ua.ModifySubscriptionRequest,
+        ua.ModifySubscriptionParameters,
+        UaProcessor._modify_subscription,
+        ua.ModifySubscriptionResponse,
+        "activated",
+    ),
+    (
+        ua.DeleteSubscriptionsRequest,
+        ua.DeleteSubscriptionsParameters,
+        UaProcessor._delete_subscriptions,
+        ua.DeleteSubscriptionsResponse,
+        "activated",
+    ),
+    (
+        ua.CreateMonitoredItemsRequest,
+        ua.CreateMonitoredItemsParameters,
+        UaProcessor._create_monitored_items,
+        ua.CreateMonitoredItemsResponse,
+        "activated",
+    ),
+    (
+        ua.ModifyMonitoredItemsRequest,
+        ua.ModifyMonitoredItemsParameters,
+        UaProcessor._modify_monitored_items,
+        ua.ModifyMonitoredItemsResponse,
+        "activated",
+    ),
+    (
+        ua.DeleteMonitoredItemsRequest,
+        ua.DeleteMonitoredItemsParameters,
+        UaProcessor._delete_monitored_items,
+        ua.DeleteMonitoredItemsResponse,
+        "activated",
+    ),
+    (ua.HistoryReadRequest, ua.HistoryReadParameters, UaProcessor._history_read, ua.HistoryReadResponse, "activated"),
+    (
+        ua.RegisterNodesRequest,
+        ua.RegisterNodesParameters,
+        UaProcessor._register_nodes,
+        ua.RegisterNodesResponse,
+        "activated",
+    ),
+    (
+        ua.UnregisterNodesRequest,
+        ua.UnregisterNodesParameters,
+        UaProcessor._unregister_nodes,
+        ua.UnregisterNodesResponse,
+        "activated",
+    ),
+    (ua.PublishRequest, ua.PublishParameters, UaProcessor._publish, None, "activated"),
+    (ua.RepublishRequest, ua.RepublishParameters, UaProcessor._republish, ua.RepublishResponse, "activated"),
+    (
+        ua.TransferSubscriptionsRequest,
+        ua.TransferSubscriptionsParameters,
+        UaProcessor._transfer_subscriptions,
+        ua.TransferSubscriptionsResponse,
+        "activated",
+    ),
+    (ua.CallRequest, ua.CallParameters, UaProcessor._call, ua.CallResponse, "activated"),
+    (
+        ua.SetMonitoringModeRequest,
+        ua.SetMonitoringModeParameters,
+        UaProcessor._set_monitoring_mode,
+        ua.SetMonitoringModeResponse,
+        "activated",
+    ),
+    (
+        ua.SetPublishingModeRequest,
+        ua.SetPublishingModeParameters,
+        UaProcessor._set_publishing_mode,
+        ua.SetPublishingModeResponse,
+        "activated",
+    ),
+):
+    UaProcessor.register_service(_request, _params, _handler, _response, _session)
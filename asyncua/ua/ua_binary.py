@@ -4,15 +4,20 @@ Binary protocol specific functions and constants
 
 from __future__ import annotations
 
+import contextlib
 import contextvars
+import copy
 import functools
+import importlib
 import logging
+import math
+import operator
 import struct
 import sys
 import typing
 import uuid
-from collections.abc import Callable, Iterable, Sequence
-from dataclasses import Field, fields, is_dataclass
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import fields, is_dataclass
 from enum import Enum, IntFlag
 from io import BytesIO
 from types import UnionType
@@ -23,6 +28,7 @@ from asyncua import ua
 from ..common.utils import Buffer
 from .uaerrors import UaError
 from .uatypes import (
+    _is_ndarray,
     type_allow_subclass,
     type_from_list,
     type_from_optional,
@@ -47,6 +53,80 @@ def set_string_encoding(new_encoding: str) -> None:
     _string_encoding.set(new_encoding)
 
 
+_numpy_arrays = contextvars.ContextVar("ua_numpy_arrays", default=False)
+
+_NUMPY_DTYPES: dict[ua.VariantType, str] = {
+    ua.VariantType.SByte: "<i1",
+    ua.VariantType.Byte: "<u1",
+    ua.VariantType.Int16: "<i2",
+    ua.VariantType.UInt16: "<u2",
+    ua.VariantType.Int32: "<i4",
+    ua.VariantType.UInt32: "<u4",
+    ua.VariantType.Int64: "<i8",
+    ua.VariantType.UInt64: "<u8",
+    ua.VariantType.Float: "<f4",
+    ua.VariantType.Double: "<f8",
+}
+
+
+def get_numpy_arrays() -> bool:
+    return _numpy_arrays.get()
+
+
+def set_numpy_arrays(enabled: bool) -> None:
+    """
+    Decode numeric array Variants to numpy arrays instead of lists in the current context.
+    The arrays are read-only views over the received data, multi-dimensional arrays are reshaped
+    to the Variant Dimensions. numpy must be installed.
+    """
+    if enabled:
+        importlib.import_module("numpy")
+    _numpy_arrays.set(enabled)
+
+
+@contextlib.contextmanager
+def numpy_arrays(enabled: bool = True) -> Iterator[None]:
+    """
+    Context manager enabling numpy array decoding for the calls made inside it
+    """
+    if enabled:
+        importlib.import_module("numpy")
+    token = _numpy_arrays.set(enabled)
+    try:
+        yield
+    finally:
+        _numpy_arrays.reset(token)
+
+
+_lazy_variants = contextvars.ContextVar("ua_lazy_variants", default=False)
+
+
+def get_lazy_variants() -> bool:
+    return _lazy_variants.get()
+
+
+def set_lazy_variants(enabled: bool) -> None:
+    """
+    Defer decoding of ExtensionObject and array Variants in the current context.
+    Such Variants, including DataValue.Value, are decoded to a LazyVariant which
+    keeps a reference to its slice of the received message and decodes it on first
+    access to Value, Dimensions or is_array.
+    """
+    _lazy_variants.set(enabled)
+
+
+@contextlib.contextmanager
+def lazy_variants(enabled: bool = True) -> Iterator[None]:
+    """
+    Context manager enabling lazy Variant decoding for the calls made inside it
+    """
+    token = _lazy_variants.set(enabled)
+    try:
+        yield
+    finally:
+        _lazy_variants.reset(token)
+
+
 def get_safe_type_hints(cls: type, extra_ns: dict[str, Any] | None = None) -> dict[str, Any]:
     # Use globalns=None so that get_type_hints automatically resolves the
     # module globals of cls (e.g. bare names like Byte).
@@ -74,6 +154,20 @@ def unset_bit(data: int, offset: int) -> int:
     return data & ~mask
 
 
+def _unpack(st: struct.Struct, data: Buffer | IO) -> tuple[Any, ...]:
+    """Unpack st.size bytes, in place when data is a Buffer."""
+    if isinstance(data, Buffer):
+        return data.unpack(st)
+    return st.unpack(data.read(st.size))
+
+
+_byte_struct = struct.Struct("<B")
+_four_byte_nodeid_struct = struct.Struct("<BH")
+_numeric_nodeid_struct = struct.Struct("<HI")
+_guid_struct = struct.Struct("<IHH8s")
+_header_struct = struct.Struct("<3scI")
+
+
 class _DateTime:
     @staticmethod
     def pack(dt: Any) -> bytes:
@@ -99,7 +193,7 @@ class _Bytes:
         length = Primitives.Int32.unpack(data)
         if length == -1:
             return None
-        return data.read(length)
+        return bytes(data.read(length))
 
 
 class _String:
@@ -111,12 +205,11 @@ class _String:
 
     @staticmethod
     def unpack(data: Buffer | IO) -> str | None:
-        b = _Bytes.unpack(data)
-        if b is None:
-            return b
-        return b.decode(
-            get_string_encoding(), errors="surrogateescape"
-        )  # not need to be strict here, this is user data
+        length = Primitives.Int32.unpack(data)
+        if length == -1:
+            return None
+        # decode straight from the buffer slice, not need to be strict here, this is user data
+        return str(data.read(length), get_string_encoding(), "surrogateescape")
 
 
 class _Null:
@@ -148,28 +241,22 @@ class _Guid:
     @staticmethod
     def unpack(data: Buffer | IO) -> uuid.UUID:
         # convert OPC UA 4 field format to python UUID bytes
-        f1 = struct.pack(">I", Primitives.UInt32.unpack(data))
-        f2 = struct.pack(">H", Primitives.UInt16.unpack(data))
-        f3 = struct.pack(">H", Primitives.UInt16.unpack(data))
-        f4 = data.read(8)
-        # concat byte fields
-        b = f1 + f2 + f3 + f4
-
-        return uuid.UUID(bytes=b)
+        f1, f2, f3, f4 = _unpack(_guid_struct, data)
+        return uuid.UUID(bytes=struct.pack(">IHH8s", f1, f2, f3, f4))
 
 
 class _Primitive1:
     def __init__(self, fmt: str) -> None:
         self._fmt = fmt
-        st = struct.Struct(fmt.format(1))
-        self.size = st.size
-        self.format = st.format
+        self._struct = struct.Struct(fmt.format(1))
+        self.size = self._struct.size
+        self.format = self._struct.format
 
     def pack(self, data: Any) -> bytes:
-        return struct.pack(self.format, data)
+        return self._struct.pack(data)
 
     def unpack(self, data: Buffer | IO) -> Any:
-        return struct.unpack(self.format, data.read(self.size))[0]
+        return _unpack(self._struct, data)[0]
 
     def pack_array(self, data: Sequence[Any] | None) -> bytes:
         if data is None:
@@ -185,7 +272,7 @@ class _Primitive1:
             return None
         if length == 0:
             return ()
-        return struct.unpack(self._fmt.format(length), data.read(self.size * length))
+        return _unpack(struct.Struct(self._fmt.format(length)), data)
 
 
 class Primitives1:
@@ -372,9 +459,99 @@ def field_serializer(uatype: Any, is_optional: bool, dataclazz: type) -> Callabl
     return serializer
 
 
+_FIXED_SIZE_FORMATS: dict[type, str] = {
+    ua.SByte: "b",
+    ua.Int16: "h",
+    ua.Int32: "i",
+    ua.Int64: "q",
+    ua.Byte: "B",
+    ua.UInt16: "H",
+    ua.UInt32: "I",
+    ua.UInt64: "Q",
+    ua.Boolean: "?",
+    ua.Double: "d",
+    ua.Float: "f",
+    ua.DateTime: "q",
+}
+
+_FixedFieldCodec = tuple[str, Callable[[Any], Any] | None, Callable[[Any], Any] | None]
+
+
+def _fixed_size_field_codec(uatype: Any) -> _FixedFieldCodec | None:
+    """
+    Return (struct format, encoder, decoder) for a field type with a fixed binary size,
+    or None if the field must be encoded on its own.
+    """
+    if not isinstance(uatype, type):
+        return None
+    if uatype is ua.DateTime:
+        return "q", ua.datetime_to_win_epoch, ua.win_epoch_to_datetime
+    if uatype in _FIXED_SIZE_FORMATS:
+        return _FIXED_SIZE_FORMATS[uatype], None, None
+    if issubclass(uatype, IntFlag):
+        typename = uatype.datatype() if hasattr(uatype, "datatype") else "UInt32"
+        return _FIXED_SIZE_FORMATS[getattr(ua, typename)], None, uatype
+    if issubclass(uatype, Enum):
+        return "i", None, uatype
+    return None
+
+
+def _create_fixed_run_serializer(names: Sequence[str], codecs: Sequence[_FixedFieldCodec]) -> Callable[[Any], bytes]:
+    pack = struct.Struct("<" + "".join(fmt for fmt, _, _ in codecs)).pack
+    getter = operator.attrgetter(*names)
+    encoders = [(idx, encoder) for idx, (_, encoder, _) in enumerate(codecs) if encoder is not None]
+    if not encoders:
+        return lambda obj: pack(*getter(obj))
+
+    def serialize(obj: Any) -> bytes:
+        values = list(getter(obj))
+        for idx, encoder in encoders:
+            values[idx] = encoder(values[idx])
+        return pack(*values)
+
+    return serialize
+
+
+def _create_fixed_run_deserializer(codecs: Sequence[_FixedFieldCodec]) -> Callable[[Buffer | IO], Sequence[Any]]:
+    st = struct.Struct("<" + "".join(fmt for fmt, _, _ in codecs))
+    decoders = [(idx, decoder) for idx, (_, _, decoder) in enumerate(codecs) if decoder is not None]
+    if not decoders:
+        return lambda data: _unpack(st, data)
+
+    def deserialize(data: Buffer | IO) -> list[Any]:
+        values = list(_unpack(st, data))
+        for idx, decoder in decoders:
+            values[idx] = decoder(values[idx])
+        return values
+
+    return deserialize
+
+
+def _group_fixed_size_runs(
+    fields_codecs: Sequence[tuple[str, _FixedFieldCodec | None]],
+) -> list[tuple[int, int]]:
+    """
+    Return (start, stop) index pairs of the runs of at least two adjacent fixed size fields.
+    Those runs are packed and unpacked with a single precompiled struct.Struct.
+    """
+    runs = []
+    start = 0
+    for idx in range(len(fields_codecs) + 1):
+        if idx < len(fields_codecs) and fields_codecs[idx][1] is not None:
+            continue
+        if idx - start >= 2:
+            runs.append((start, idx))
+        start = idx + 1
+    return runs
+
+
 @functools.cache
 def create_dataclass_serializer(dataclazz: type) -> Callable[[Any], bytes]:
     """Given a dataclass, return a function that serializes instances of this dataclass"""
+    if dataclazz is ua.QualifiedName:
+        return _qualified_name_to_binary
+    if dataclazz is ua.LocalizedText:
+        return _localized_text_to_binary
     data_fields = fields(dataclazz)
     # The result is cached, so get_type_hints only runs once per class.
     try:
@@ -409,15 +586,32 @@ def create_dataclass_serializer(dataclazz: type) -> Callable[[Any], bytes]:
                 enc |= enc_val
         return enc
 
-    encoding_functions = [
-        (f.name, field_serializer(*resolve_uatype(resolved_fieldtypes[f.name]), dataclazz)) for f in data_fields
+    resolved_uatypes = [(f.name, resolve_uatype(resolved_fieldtypes[f.name])) for f in data_fields]
+    fields_codecs = [
+        (name, None if is_optional or name == "Encoding" else _fixed_size_field_codec(uatype))
+        for name, (uatype, is_optional) in resolved_uatypes
     ]
+    runs = dict(_group_fixed_size_runs(fields_codecs))
+    encoding_functions: list[tuple[str | tuple[str, ...], Callable[[Any], bytes]]] = []
+    idx = 0
+    while idx < len(resolved_uatypes):
+        if idx in runs:
+            run = fields_codecs[idx : runs[idx]]
+            names = tuple(name for name, _ in run)
+            encoding_functions.append((names, _create_fixed_run_serializer(names, [codec for _, codec in run])))
+            idx = runs[idx]
+            continue
+        name, (uatype, is_optional) = resolved_uatypes[idx]
+        encoding_functions.append((name, field_serializer(uatype, is_optional, dataclazz)))
+        idx += 1
 
     def serialize(obj: Any) -> bytes:
         parts: list[bytes] = []
         for name, serializer in encoding_functions:
             if name == "Encoding":
                 parts.append(serializer(enc_value(obj)))
+            elif isinstance(name, tuple):
+                parts.append(serializer(obj))
             else:
                 parts.append(serializer(getattr(obj, name)))
         return b"".join(parts)
@@ -511,27 +705,58 @@ def list_to_binary(uatype: type, val: Sequence[Any] | None) -> bytes:
     return create_list_serializer(uatype)(val)
 
 
+# Bound of the caches of encoded NodeId, QualifiedName and LocalizedText values,
+# responses repeat the same identities of the address space over and over
+_FRAGMENT_CACHE_SIZE = 8192
+
+
+@functools.lru_cache(maxsize=_FRAGMENT_CACHE_SIZE)
+def _nodeid_fragment(nidtype: ua.NodeIdType, nidx: int, identifier: Any, encoding: str) -> bytes:
+    # encoding is only part of the cache key, _String.pack reads the same contextvar
+    if nidtype == ua.NodeIdType.TwoByte:
+        return struct.pack("<BB", nidtype.value, identifier)
+    if nidtype == ua.NodeIdType.FourByte:
+        return struct.pack("<BBH", nidtype.value, nidx, identifier)
+    if nidtype == ua.NodeIdType.Numeric:
+        return struct.pack("<BHI", nidtype.value, nidx, identifier)
+    if nidtype == ua.NodeIdType.String:
+        return struct.pack("<BH", nidtype.value, nidx) + Primitives.String.pack(identifier)
+    if nidtype == ua.NodeIdType.ByteString:
+        return struct.pack("<BH", nidtype.value, nidx) + Primitives.Bytes.pack(identifier)
+    if nidtype == ua.NodeIdType.Guid:
+        return struct.pack("<BH", nidtype.value, nidx) + Primitives.Guid.pack(identifier)
+    raise UaError(f"Unknown NodeIdType: {nidtype} for NodeId: {identifier!r}")
+
+
+@functools.lru_cache(maxsize=_FRAGMENT_CACHE_SIZE)
+def _qualified_name_fragment(nidx: int, name: str | None, encoding: str) -> bytes:
+    return Primitives.UInt16.pack(nidx) + Primitives.String.pack(name)
+
+
+@functools.lru_cache(maxsize=_FRAGMENT_CACHE_SIZE)
+def _localized_text_fragment(locale: str | None, text: str | None, encoding: str) -> bytes:
+    parts = [b""]
+    enc = 0
+    if locale is not None:
+        enc |= 1
+        parts.append(Primitives.String.pack(locale))
+    if text is not None:
+        enc |= 2
+        parts.append(Primitives.String.pack(text))
+    parts[0] = Primitives.Byte.pack(enc)
+    return b"".join(parts)
+
+
+def _qualified_name_to_binary(qname: ua.QualifiedName) -> bytes:
+    return _qualified_name_fragment(qname.NamespaceIndex, qname.Name, _string_encoding.get())
+
+
+def _localized_text_to_binary(ltext: ua.LocalizedText) -> bytes:
+    return _localized_text_fragment(ltext.Locale, ltext.Text, _string_encoding.get())
+
+
 def nodeid_to_binary(nodeid: ua.NodeId) -> bytes:
-    if nodeid.NodeIdType == ua.NodeIdType.TwoByte:
-        packed = struct.pack("<BB", nodeid.NodeIdType.value, nodeid.Identifier)
-    elif nodeid.NodeIdType == ua.NodeIdType.FourByte:
-        packed = struct.pack("<BBH", nodeid.NodeIdType.value, nodeid.NamespaceIndex, nodeid.Identifier)
-    elif nodeid.NodeIdType == ua.NodeIdType.Numeric:
-        packed = struct.pack("<BHI", nodeid.NodeIdType.value, nodeid.NamespaceIndex, nodeid.Identifier)
-    elif nodeid.NodeIdType == ua.NodeIdType.String:
-        packed = struct.pack("<BH", nodeid.NodeIdType.value, nodeid.NamespaceIndex) + Primitives.String.pack(
-            nodeid.Identifier
-        )
-    elif nodeid.NodeIdType == ua.NodeIdType.ByteString:
-        packed = struct.pack("<BH", nodeid.NodeIdType.value, nodeid.NamespaceIndex) + Primitives.Bytes.pack(
-            nodeid.Identifier
-        )
-    elif nodeid.NodeIdType == ua.NodeIdType.Guid:
-        packed = struct.pack("<BH", nodeid.NodeIdType.value, nodeid.NamespaceIndex) + Primitives.Guid.pack(
-            nodeid.Identifier
-        )
-    else:
-        raise UaError(f"Unknown NodeIdType: {nodeid.NodeIdType} for NodeId: {nodeid}")
+    packed = _nodeid_fragment(nodeid.NodeIdType, nodeid.NamespaceIndex, nodeid.Identifier, _string_encoding.get())
     if not isinstance(nodeid, ua.ExpandedNodeId):
         return packed
     if not nodeid.NamespaceUri and not nodeid.ServerIndex:
@@ -547,18 +772,18 @@ def nodeid_to_binary(nodeid: ua.NodeId) -> bytes:
 
 
 def nodeid_from_binary(data: BytesIO | Buffer) -> ua.NodeId | ua.ExpandedNodeId:
-    encoding = ord(data.read(1))
+    encoding = _unpack(_byte_struct, data)[0]
     nidtype = ua.NodeIdType(encoding & 0b00111111)
     uri = None
     server_idx = None
 
     if nidtype == ua.NodeIdType.TwoByte:
-        identifier = ord(data.read(1))
+        identifier = _unpack(_byte_struct, data)[0]
         nidx = 0
     elif nidtype == ua.NodeIdType.FourByte:
-        nidx, identifier = struct.unpack("<BH", data.read(3))
+        nidx, identifier = _unpack(_four_byte_nodeid_struct, data)
     elif nidtype == ua.NodeIdType.Numeric:
-        nidx, identifier = struct.unpack("<HI", data.read(6))
+        nidx, identifier = _unpack(_numeric_nodeid_struct, data)
     elif nidtype == ua.NodeIdType.String:
         nidx = Primitives.UInt16.unpack(data)
         identifier = Primitives.String.unpack(data)
@@ -581,9 +806,33 @@ def nodeid_from_binary(data: BytesIO | Buffer) -> ua.NodeId | ua.ExpandedNodeId:
     return ua.NodeId(identifier, nidx, nidtype)
 
 
+def _pack_numpy_array(vtype: ua.VariantType, array: Any) -> bytes:
+    if vtype not in _NUMPY_DTYPES:
+        return pack_uatype_array(vtype, ua.flatten(array.tolist()))
+    numpy = sys.modules["numpy"]
+    array = numpy.ascontiguousarray(array, dtype=_NUMPY_DTYPES[vtype])
+    return Primitives.Int32.pack(array.size) + array.tobytes()
+
+
+def _unpack_numpy_array(vtype: ua.VariantType, data: Buffer | IO) -> Any:
+    length = Primitives.Int32.unpack(data)
+    if length == -1:
+        return None
+    numpy = sys.modules["numpy"]
+    dtype = numpy.dtype(_NUMPY_DTYPES[vtype])
+    return numpy.frombuffer(data.read(length * dtype.itemsize), dtype=dtype)
+
+
 def variant_to_binary(var: ua.Variant) -> bytes:
     encoding = var.VariantType.value & 0b0011_1111
-    if var.is_array or isinstance(var.Value, list | tuple):
+    if _is_ndarray(var.Value):
+        body = _pack_numpy_array(var.VariantType, var.Value)
+        if var.Dimensions is None:
+            encoding |= 0b1000_0000
+        else:
+            encoding |= 0b1100_0000
+            body += pack_uatype_array(ua.VariantType.Int32, var.Dimensions)
+    elif var.is_array or isinstance(var.Value, list | tuple):
         body = pack_uatype_array(var.VariantType, ua.flatten(var.Value))
         if var.Dimensions is None:
             encoding |= 0b1000_0000
@@ -596,23 +845,152 @@ def variant_to_binary(var: ua.Variant) -> bytes:
 
 
 def variant_from_binary(data: Buffer | IO) -> ua.Variant:
+    encoding = _unpack(_byte_struct, data)[0]
+    if _lazy_variants.get() and isinstance(data, Buffer):
+        lazy = _lazy_variant_from_binary(encoding, data)
+        if lazy is not None:
+            return lazy
+    return _variant_body_from_binary(encoding, data)
+
+
+def _variant_body_from_binary(encoding: int, data: Buffer | IO) -> ua.Variant:
     dimensions = None
     array = False
-    encoding = ord(data.read(1))
     int_type = encoding & 0b00111111
     vtype = ua.datatype_to_varianttype(int_type)
     if test_bit(encoding, 7):
-        value = unpack_uatype_array(vtype, data)
+        if vtype in _NUMPY_DTYPES and _numpy_arrays.get():
+            value = _unpack_numpy_array(vtype, data)
+        else:
+            value = unpack_uatype_array(vtype, data)
         array = True
     else:
         value = unpack_uatype(vtype, data)
     if test_bit(encoding, 6):
         dimensions = unpack_uatype_array(ua.VariantType.Int32, data)
-        if value is not None:
+        if value is not None and not isinstance(value, list):
+            if math.prod(dimensions) == value.size:
+                value = value.reshape(dimensions)
+            else:
+                value = _reshape(value.tolist(), dimensions)
+        elif value is not None:
             value = _reshape(value, dimensions)
     return ua.Variant(value, vtype, dimensions, is_array=array)
 
 
+class LazyVariant(ua.Variant):
+    """
+    Variant whose Value is decoded from the received data on first access,
+    see set_lazy_variants(). VariantType is available without decoding.
+    """
+
+    __slots__ = ("_body", "_context", "_encoding")
+
+    def __init__(self, encoding: int, body: Buffer) -> None:
+        self.VariantType = ua.datatype_to_varianttype(encoding & 0b00111111)
+        self._encoding = encoding
+        self._body: Buffer | None = body
+        # decode later with the string encoding and numpy setting in use now
+        self._context: contextvars.Context | None = contextvars.copy_context()
+
+    def __getattr__(self, name: str) -> Any:
+        context = self._context
+        if name not in ("Value", "Dimensions", "is_array") or self._body is None or context is None:
+            raise AttributeError(name)
+        variant = context.run(_variant_body_from_binary, self._encoding, self._body)
+        self.Value = variant.Value
+        self.Dimensions = variant.Dimensions
+        self.is_array = variant.is_array
+        self._body = self._context = None
+        return getattr(self, name)
+
+    @property
+    def is_decoded(self) -> bool:
+        return self._body is None
+
+    # copies and pickles are decoded plain Variants, the decoding context cannot be copied
+    def _to_variant(self) -> ua.Variant:
+        return ua.Variant(self.Value, self.VariantType, self.Dimensions, self.is_array)
+
+    def __copy__(self) -> ua.Variant:
+        return self._to_variant()
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> ua.Variant:
+        return copy.deepcopy(self._to_variant(), memo)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return ua.Variant, (self.Value, self.VariantType, self.Dimensions, self.is_array)
+
+
+def _skip_extensionobject(data: Buffer) -> None:
+    nodeid_from_binary(data)
+    if _unpack(_byte_struct, data)[0] & (1 << 0):
+        length = Primitives.Int32.unpack(data)
+        if length == -1:
+            raise UaError("ExtensionObject without body length cannot be skipped")
+        data.skip(max(length, 0))
+
+
+def _skip_bytes(data: Buffer) -> None:
+    data.skip(max(Primitives.Int32.unpack(data), 0))
+
+
+_FIXED_SIZE_VARIANT_TYPES: dict[ua.VariantType, int] = {
+    ua.VariantType.Boolean: 1,
+    ua.VariantType.SByte: 1,
+    ua.VariantType.Byte: 1,
+    ua.VariantType.Int16: 2,
+    ua.VariantType.UInt16: 2,
+    ua.VariantType.Int32: 4,
+    ua.VariantType.UInt32: 4,
+    ua.VariantType.Float: 4,
+    ua.VariantType.StatusCode: 4,
+    ua.VariantType.Int64: 8,
+    ua.VariantType.UInt64: 8,
+    ua.VariantType.Double: 8,
+    ua.VariantType.DateTime: 8,
+    ua.VariantType.Guid: 16,
+}
+_SKIP_VARIANT_TYPES: dict[ua.VariantType, Callable[[Buffer], None]] = {
+    ua.VariantType.String: _skip_bytes,
+    ua.VariantType.ByteString: _skip_bytes,
+    ua.VariantType.XmlElement: _skip_bytes,
+    ua.VariantType.ExtensionObject: _skip_extensionobject,
+}
+
+
+def _lazy_variant_from_binary(encoding: int, data: Buffer) -> LazyVariant | None:
+    """
+    Skip over an ExtensionObject or array Variant and return it as LazyVariant.
+    Returns None, without consuming data, for Variants that are decoded right away.
+    """
+    vtype = ua.datatype_to_varianttype(encoding & 0b00111111)
+    size = _FIXED_SIZE_VARIANT_TYPES.get(vtype)
+    skip = _SKIP_VARIANT_TYPES.get(vtype)
+    is_array = test_bit(encoding, 7)
+    if (not is_array and vtype != ua.VariantType.ExtensionObject) or (size is None and skip is None):
+        return None
+    probe = data.copy()
+    try:
+        if not is_array:
+            skip(probe)
+        else:
+            length = Primitives.Int32.unpack(probe)
+            if size is not None:
+                probe.skip(max(length, 0) * size)
+            else:
+                for _ in range(length):
+                    skip(probe)
+        if test_bit(encoding, 6):
+            probe.skip(max(Primitives.Int32.unpack(probe), 0) * 4)
+    except UaError:
+        return None
+    consumed = len(data) - len(probe)
+    body = data.copy(consumed)
+    data.skip(consumed)
+    return LazyVariant(encoding, body)
+
+
 MAX_RESHAPE_ELEMENTS: int = 1_000_000
 """Upper bound on the declared total size of a Variant Dimensions array.
 
@@ -647,7 +1025,7 @@ def extensionobject_from_binary(data: Buffer) -> Any:
     Returns an object, or None if TypeId is zero
     """
     typeid = nodeid_from_binary(data)
-    encoding = ord(data.read(1))
+    encoding = _unpack(_byte_struct, data)[0]
     body = None
     if encoding & (1 << 0):
         length = Primitives.Int32.unpack(data)
@@ -667,7 +1045,7 @@ def extensionobject_from_binary(data: Buffer) -> Any:
             raise UaError(f"parsing ExtensionObject {cls.__name__} without data")
         return from_binary(cls, body)
     if body is not None:
-        body_data = body.read(len(body))
+        body_data = bytes(body.read(len(body)))
     else:
         body_data = None
     e = ua.ExtensionObject(
@@ -805,7 +1183,7 @@ def _create_dataclass_deserializer(objtype: type | str) -> Callable[[Buffer | IO
 
         return decode_union
     enc_count = 0
-    dc_field_deserializers: list[tuple[Field[Any], int, Callable[[Buffer | IO], Any]]] = []
+    dc_fields: list[tuple[str, int, Any]] = []
     resolved_fieldtypes = get_safe_type_hints(objtype, {"ua": ua})
     for field in fields(objtype):
         optional_enc_bit = 0
@@ -815,21 +1193,40 @@ def _create_dataclass_deserializer(objtype: type | str) -> Callable[[Buffer | IO
             optional_enc_bit = 1 << enc_count
             enc_count += 1
             field_type = type_from_optional(field_type)
+        dc_fields.append((field.name, optional_enc_bit, field_type))
+    fields_codecs = [
+        (name, None if optional_enc_bit or name == "Encoding" else _fixed_size_field_codec(field_type))
+        for name, optional_enc_bit, field_type in dc_fields
+    ]
+    runs = dict(_group_fixed_size_runs(fields_codecs))
+    dc_field_deserializers: list[tuple[str | tuple[str, ...], int, Callable[[Buffer | IO], Any]]] = []
+    idx = 0
+    while idx < len(dc_fields):
+        if idx in runs:
+            run = fields_codecs[idx : runs[idx]]
+            names = tuple(name for name, _ in run)
+            dc_field_deserializers.append((names, 0, _create_fixed_run_deserializer([codec for _, codec in run])))
+            idx = runs[idx]
+            continue
+        name, optional_enc_bit, field_type = dc_fields[idx]
         subtypes = type_allow_subclass(field_type)
         if subtypes:
             deserialize_field = extensionobject_from_binary
         else:
             deserialize_field = _create_type_deserializer(field_type, objtype)
-        dc_field_deserializers.append((field, optional_enc_bit, deserialize_field))
+        dc_field_deserializers.append((name, optional_enc_bit, deserialize_field))
+        idx += 1
 
     def decode(data: Buffer | IO) -> Any:
         kwargs: dict[str, Any] = {}
         enc: int = 0
-        for field, optional_enc_bit, deserialize_field in dc_field_deserializers:
-            if field.name == "Encoding":
+        for name, optional_enc_bit, deserialize_field in dc_field_deserializers:
+            if name == "Encoding":
                 enc = deserialize_field(data)
+            elif isinstance(name, tuple):
+                kwargs.update(zip(name, deserialize_field(data)))
             elif optional_enc_bit == 0 or enc & optional_enc_bit:
-                kwargs[field.name] = deserialize_field(data)
+                kwargs[name] = deserialize_field(data)
         return objtype(**kwargs)
 
     return decode
@@ -855,7 +1252,7 @@ def header_to_binary(hdr: ua.Header) -> bytes:
 
 def header_from_binary(data: Buffer | IO) -> ua.Header:
     hdr = ua.Header()
-    hdr.MessageType, hdr.ChunkType, hdr.packet_size = struct.unpack("<3scI", data.read(8))
+    hdr.MessageType, hdr.ChunkType, hdr.packet_size = _unpack(_header_struct, data)
     hdr.body_size = hdr.packet_size - 8
     if hdr.MessageType in (ua.MessageType.SecureOpen, ua.MessageType.SecureClose, ua.MessageType.SecureMessage):
         hdr.body_size -= 4
@@ -8,6 +8,7 @@ import binascii
 import itertools
 import logging
 import re
+import sys
 import types
 import uuid
 from base64 import b64decode, b64encode
@@ -960,7 +961,7 @@ class Variant:
 
     def __post_init__(self) -> None:
         if self.is_array is None:
-            if isinstance(self.Value, list | tuple) or self.Dimensions:
+            if isinstance(self.Value, list | tuple) or self.Dimensions or _is_ndarray(self.Value):
                 object.__setattr__(self, "is_array", True)
             else:
                 object.__setattr__(self, "is_array", False)
@@ -996,16 +997,24 @@ class Variant:
             dims = get_shape(self.Value)
             if len(dims) > 1:
                 object.__setattr__(self, "Dimensions", dims)
+        elif self.Dimensions is None and _is_ndarray(self.Value) and self.Value.ndim > 1:
+            object.__setattr__(self, "Dimensions", list(self.Value.shape))
 
     def __eq__(self, other: object) -> bool:
-        if isinstance(other, Variant) and self.VariantType == other.VariantType and self.Value == other.Value:
-            return True
-        return False
+        if not isinstance(other, Variant) or self.VariantType != other.VariantType:
+            return False
+        if _is_ndarray(self.Value) or _is_ndarray(other.Value):
+            return _array_to_list(self.Value) == _array_to_list(other.Value)
+        return self.Value == other.Value
 
     def __ne__(self, other: object) -> bool:
         return not self.__eq__(other)
 
     def _guess_type(self, val: Any) -> _VariantTypeUnion:
+        if _is_ndarray(val):
+            if val.dtype.name in _NDARRAY_DTYPE_VARIANT_TYPES:
+                return _NDARRAY_DTYPE_VARIANT_TYPES[val.dtype.name]
+            val = val.tolist()
         error_val = None
         if isinstance(val, list | tuple):
             error_val = val
@@ -1044,6 +1053,35 @@ class Variant:
         raise UaError(f"Could not guess UA type of {val} with type {type(val)}, specify UA type")
 
 
+_NDARRAY_DTYPE_VARIANT_TYPES = {
+    "bool": VariantType.Boolean,
+    "int8": VariantType.SByte,
+    "uint8": VariantType.Byte,
+    "int16": VariantType.Int16,
+    "uint16": VariantType.UInt16,
+    "int32": VariantType.Int32,
+    "uint32": VariantType.UInt32,
+    "int64": VariantType.Int64,
+    "uint64": VariantType.UInt64,
+    "float32": VariantType.Float,
+    "float64": VariantType.Double,
+}
+
+
+def _is_ndarray(value: Any) -> bool:
+    """
+    Check for a numpy.ndarray without importing numpy, which is an optional dependency
+    """
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def _array_to_list(value: Any) -> Any:
+    if _is_ndarray(value):
+        return value.tolist()
+    return value
+
+
 def flatten_and_get_shape(mylist: list[Any]) -> tuple[list[Any], list[int]]:
     dims = [len(mylist)]
     while isinstance(mylist[0], list | tuple):
@@ -0,0 +1,6 @@
+"""
+Micro-benchmarks of the binary codec, message chunking and security policies.
+
+Run ``python -m benchmarks`` for a JSON report, or ``pytest benchmarks`` when
+pytest-benchmark is installed.
+"""
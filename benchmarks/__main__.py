@@ -0,0 +1,55 @@
+"""
+Command line entry point: ``python -m benchmarks [-k PATTERN] [-o report.json]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any
+
+from .runner import run, select_cases
+
+
+def _print_result(result: dict[str, Any]) -> None:
+    throughput = f"{result['mb_per_s']:10.1f} MB/s" if result["mb_per_s"] else ""
+    print(
+        f"{result['name']:<60} {result['min_s'] * 1000:10.3f} ms {result['ops_per_s']:10.1f} op/s {throughput}",
+        file=sys.stderr,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="asyncua codec benchmarks")
+    parser.add_argument(
+        "-k", dest="patterns", action="append", default=[], help="glob on case name or group, can be repeated"
+    )
+    parser.add_argument("-o", "--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per case (default: %(default)s)")
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.05,
+        help="minimum duration of a round in seconds, 0 times a single call (default: %(default)s)",
+    )
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args(argv)
+
+    cases = select_cases(args.patterns)
+    if args.list:
+        for case in cases:
+            print(f"{case.group:<10} {case.name}")
+        return 0
+    report = run(cases, args.rounds, args.min_time, progress=_print_result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""
+Benchmark cases. Each case is a context manager yielding the function to time
+and the number of payload bytes it handles per call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import os
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from cryptography import x509
+
+from asyncua import Client, Server, ua
+from asyncua.common.connection import SecureConnection, TransportLimits
+from asyncua.common.structures104 import make_structure
+from asyncua.common.utils import Buffer
+from asyncua.crypto import cert_gen, security_policies
+from asyncua.ua.ua_binary import (
+    header_from_binary,
+    struct_from_binary,
+    struct_to_binary,
+    variant_from_binary,
+    variant_to_binary,
+)
+
+Timed = tuple[Callable[[], Any], int]
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    group: str
+    setup: Callable[[], contextlib.AbstractContextManager[Timed]]
+
+
+CASES: list[Case] = []
+
+
+def _register(name: str, group: str, setup: Callable[[], contextlib.AbstractContextManager[Timed]]) -> None:
+    CASES.append(Case(name, group, setup))
+
+
+def _codec_cases(name: str, make: Callable[[], Any]) -> None:
+    """Register encode and decode cases of a response structure."""
+
+    @contextlib.contextmanager
+    def encode() -> Iterator[Timed]:
+        obj = make()
+        yield (lambda: struct_to_binary(obj)), len(struct_to_binary(obj))
+
+    @contextlib.contextmanager
+    def decode() -> Iterator[Timed]:
+        obj = make()
+        data = struct_to_binary(obj)
+        yield (lambda: struct_from_binary(type(obj), Buffer(data))), len(data)
+
+    _register(f"{name}.encode", "codec", encode)
+    _register(f"{name}.decode", "codec", decode)
+
+
+def _variant_cases(name: str, make: Callable[[], ua.Variant]) -> None:
+    @contextlib.contextmanager
+    def encode() -> Iterator[Timed]:
+        var = make()
+        yield (lambda: variant_to_binary(var)), len(variant_to_binary(var))
+
+    @contextlib.contextmanager
+    def decode() -> Iterator[Timed]:
+        data = variant_to_binary(make())
+        yield (lambda: variant_from_binary(Buffer(data))), len(data)
+
+    _register(f"{name}.encode", "codec", encode)
+    _register(f"{name}.decode", "codec", decode)
+
+
+def read_response(count: int = 1000) -> ua.ReadResponse:
+    now = datetime.now(timezone.utc)
+    response = ua.ReadResponse()
+    response.Results = [
+        ua.DataValue(ua.Variant(float(i), ua.VariantType.Double), SourceTimestamp=now, ServerTimestamp=now)
+        for i in range(count)
+    ]
+    return response
+
+
+def publish_response(count: int = 1000) -> ua.PublishResponse:
+    now = datetime.now(timezone.utc)
+    notification = ua.DataChangeNotification()
+    notification.MonitoredItems = [
+        ua.MonitoredItemNotification(
+            ClientHandle=i,
+            Value=ua.DataValue(ua.Variant(i, ua.VariantType.Int32), SourceTimestamp=now, ServerTimestamp=now),
+        )
+        for i in range(count)
+    ]
+    response = ua.PublishResponse()
+    response.Parameters.SubscriptionId = 1
+    response.Parameters.AvailableSequenceNumbers = [1]
+    response.Parameters.NotificationMessage.SequenceNumber = 1
+    response.Parameters.NotificationMessage.PublishTime = now
+    response.Parameters.NotificationMessage.NotificationData = [notification]
+    return response
+
+
+def browse_response(count: int = 1000) -> ua.BrowseResponse:
+    references = []
+    for i in range(count):
+        ref = ua.ReferenceDescription()
+        ref.ReferenceTypeId = ua.NodeId(ua.ObjectIds.HasComponent)
+        ref.IsForward = True
+        ref.NodeId = ua.ExpandedNodeId(f"Device{i // 10}.Tag{i}", 2)
+        ref.BrowseName = ua.QualifiedName(f"Tag{i % 100}", 2)
+        ref.DisplayName = ua.LocalizedText(f"Tag{i % 100}")
+        ref.NodeClass = ua.NodeClass.Variable
+        ref.TypeDefinition = ua.ExpandedNodeId(ua.ObjectIds.BaseDataVariableType)
+        references.append(ref)
+    response = ua.BrowseResponse()
+    response.Results = [ua.BrowseResult(References=references)]
+    return response
+
+
+def _structure_class() -> type:
+    """A structures104 generated structure registered as extension object."""
+    name = "BenchmarkMeasurement"
+    if hasattr(ua, name):
+        return getattr(ua, name)
+    sdef = ua.StructureDefinition()
+    sdef.StructureType = ua.StructureType.Structure
+    sdef.DefaultEncodingId = ua.NodeId(name + "_Encoding", 1)
+    for fname, dtype in (
+        ("Id", ua.ObjectIds.UInt32),
+        ("Name", ua.ObjectIds.String),
+        ("Value", ua.ObjectIds.Double),
+        ("Timestamp", ua.ObjectIds.DateTime),
+        ("Quality", ua.ObjectIds.StatusCode),
+    ):
+        sfield = ua.StructureField()
+        sfield.Name = fname
+        sfield.DataType = ua.NodeId(dtype)
+        sfield.ValueRank = ua.ValueRank.Scalar
+        sdef.Fields.append(sfield)
+    data_type = ua.NodeId(name, 1)
+    cls = make_structure(data_type, name, sdef)[name]
+    ua.register_extension_object(name, sdef.DefaultEncodingId, cls, data_type)
+    return cls
+
+
+def structure_array(count: int = 1000) -> ua.Variant:
+    cls = _structure_class()
+    now = datetime.now(timezone.utc)
+    values = [cls(Id=i, Name=f"m{i}", Value=i * 0.5, Timestamp=now) for i in range(count)]
+    return ua.Variant(values, ua.VariantType.ExtensionObject)
+
+
+_codec_cases("read_response[1000]", read_response)
+_codec_cases("publish_response[1000]", publish_response)
+_codec_cases("browse_response[1000]", browse_response)
+_variant_cases("array_double[100000]", lambda: ua.Variant([i * 0.5 for i in range(100000)], ua.VariantType.Double))
+_variant_cases("array_string[10000]", lambda: ua.Variant([f"s{i}" for i in range(10000)], ua.VariantType.String))
+_variant_cases("structure104[1000]", structure_array)
+
+
+@functools.cache
+def _credentials() -> tuple[Any, x509.Certificate]:
+    key = cert_gen.generate_private_key()
+    cert = cert_gen.generate_self_signed_app_certificate(
+        key, "asyncua benchmark", {}, [x509.UniformResourceIdentifier("urn:asyncua:benchmark")], extended=[]
+    )
+    return key, cert
+
+
+def secure_pair(policy_class: type, mode: ua.MessageSecurityMode) -> tuple[SecureConnection, SecureConnection]:
+    """Two SecureConnections sharing the symmetric keys of an opened channel."""
+    if policy_class is security_policies.SecurityPolicyNone:
+        policies = [policy_class(), policy_class()]
+    else:
+        key, cert = _credentials()
+        policies = [policy_class(cert, cert, key, mode) for _ in range(2)]
+    nonces = [os.urandom(policies[0].secure_channel_nonce_length) for _ in range(2)]
+    connections = []
+    for policy, local, remote in zip(policies, nonces, reversed(nonces), strict=True):
+        policy.make_local_symmetric_key(remote, local)
+        policy.make_remote_symmetric_key(local, remote, 3_600_000)
+        connections.append(SecureConnection(policy, TransportLimits()))
+    return connections[0], connections[1]
+
+
+def receive_all(connection: SecureConnection, data: bytes) -> ua.Message:
+    """Feed the chunks of one message to the receiving side of a channel."""
+    view = memoryview(data)
+    pos = 0
+    message = None
+    while pos < len(data):
+        header = header_from_binary(Buffer(view[pos:]))
+        size = header.header_size + header.body_size
+        message = connection.receive_from_header_and_body(header, Buffer(view[pos : pos + size], header.header_size))
+        pos += size
+    assert isinstance(message, ua.Message)
+    return message
+
+
+def _chunking_cases(label: str, policy_class: type, mode: ua.MessageSecurityMode, size: int = 1 << 20) -> None:
+    payload = os.urandom(size)
+
+    @contextlib.contextmanager
+    def encode() -> Iterator[Timed]:
+        sender, _ = secure_pair(policy_class, mode)
+        yield (lambda: sender.message_to_buffers(payload)), size
+
+    @contextlib.contextmanager
+    def roundtrip() -> Iterator[Timed]:
+        sender, receiver = secure_pair(policy_class, mode)
+
+        def run() -> None:
+            data = b"".join(sender.message_to_buffers(payload))
+            receive_all(receiver, data).body()
+
+        yield run, size
+
+    _register(f"chunking.{label}.encode[1MiB]", "chunking", encode)
+    _register(f"chunking.{label}.roundtrip[1MiB]", "chunking", roundtrip)
+
+
+_chunking_cases("None", security_policies.SecurityPolicyNone, ua.MessageSecurityMode.None_)
+_chunking_cases("Basic256Sha256.Sign", security_policies.SecurityPolicyBasic256Sha256, ua.MessageSecurityMode.Sign)
+_chunking_cases(
+    "Basic256Sha256.SignAndEncrypt",
+    security_policies.SecurityPolicyBasic256Sha256,
+    ua.MessageSecurityMode.SignAndEncrypt,
+)
+_chunking_cases(
+    "Aes128Sha256RsaOaep.SignAndEncrypt",
+    security_policies.SecurityPolicyAes128Sha256RsaOaep,
+    ua.MessageSecurityMode.SignAndEncrypt,
+)
+_chunking_cases(
+    "Aes256Sha256RsaPss.SignAndEncrypt",
+    security_policies.SecurityPolicyAes256Sha256RsaPss,
+    ua.MessageSecurityMode.SignAndEncrypt,
+)
+
+
+@contextlib.contextmanager
+def loopback_read(count: int = 100) -> Iterator[Timed]:
+    """Read `count` variables from an in-process server over a loopback socket."""
+    loop = asyncio.new_event_loop()
+    server = Server()
+
+    async def start() -> tuple[Client, list[ua.NodeId]]:
+        await server.init()
+        server.set_endpoint("opc.tcp://127.0.0.1:0")
+        idx = await server.register_namespace("urn:asyncua:benchmark")
+        variables = [await server.nodes.objects.add_variable(idx, f"Var{i}", float(i)) for i in range(count)]
+        await server.start()
+        client = Client(f"opc.tcp://127.0.0.1:{server.bserver.port}")
+        await client.connect()
+        return client, [var.nodeid for var in variables]
+
+    client, nodeids = loop.run_until_complete(start())
+    nodes = [client.get_node(nodeid) for nodeid in nodeids]
+    try:
+        yield (lambda: loop.run_until_complete(client.read_values(nodes))), 0
+    finally:
+        loop.run_until_complete(client.disconnect())
+        loop.run_until_complete(server.stop())
+        loop.close()
+
+
+_register("loopback.read[100]", "loopback", loopback_read)
@@ -0,0 +1,88 @@
+"""
+Timing of the benchmark cases and the JSON report.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+import asyncua
+
+from .cases import CASES, Case
+
+
+def _calibrate(func: Callable[[], Any], min_sample_time: float) -> int:
+    """Number of calls making a sample last at least `min_sample_time`."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample_time or number >= 1 << 20:
+            return number
+        number = max(number * 2, int(number * min_sample_time / max(elapsed, 1e-9)))
+
+
+def run_case(case: Case, rounds: int = 5, min_sample_time: float = 0.05) -> dict[str, Any]:
+    with case.setup() as (func, nbytes):
+        func()
+        number = _calibrate(func, min_sample_time) if min_sample_time > 0 else 1
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - start) / number)
+    best = min(samples)
+    return {
+        "name": case.name,
+        "group": case.group,
+        "rounds": rounds,
+        "calls_per_round": number,
+        "min_s": best,
+        "mean_s": statistics.fmean(samples),
+        "stdev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_s": 1 / best,
+        "bytes": nbytes,
+        "mb_per_s": nbytes / best / 1e6 if nbytes else None,
+    }
+
+
+def select_cases(patterns: Iterable[str] = ()) -> list[Case]:
+    patterns = list(patterns)
+    if not patterns:
+        return list(CASES)
+    return [
+        case for case in CASES if any(fnmatch.fnmatch(case.name, p) or fnmatch.fnmatch(case.group, p) for p in patterns)
+    ]
+
+
+def run(
+    cases: Iterable[Case],
+    rounds: int = 5,
+    min_sample_time: float = 0.05,
+    progress: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    results = []
+    for case in cases:
+        result = run_case(case, rounds, min_sample_time)
+        if progress is not None:
+            progress(result)
+        results.append(result)
+    return {
+        "machine": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "asyncua": asyncua.__version__,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
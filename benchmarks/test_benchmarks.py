@@ -0,0 +1,19 @@
+"""
+pytest-benchmark front end: ``pytest benchmarks --benchmark-json=report.json``.
+"""
+
+from typing import Any
+
+import pytest
+
+from .cases import CASES, Case
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: case.name)
+def test_benchmark(benchmark: Any, case: Case) -> None:
+    benchmark.group = case.group
+    with case.setup() as (func, nbytes):
+        benchmark.extra_info["bytes"] = nbytes
+        benchmark(func)
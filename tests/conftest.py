@@ -14,7 +14,7 @@ from asyncua import Client, Server, ua
 from asyncua.client.ha.ha_client import HaClient, HaConfig, HaMode
 from asyncua.client.ua_client import UASocketState
 from asyncua.server.history import HistoryDict
-from asyncua.server.history_sql import HistorySQLite
+from asyncua.server.history_sql import HistorySQLite, HistorySQLiteSingleTable
 
 from .test_common import add_server_methods
 from .util_enum_struct import add_server_custom_enum_struct
@@ -49,7 +49,7 @@ def pytest_generate_tests(metafunc):
     elif "opc" in metafunc.fixturenames:
         metafunc.parametrize("opc", ["client", "server"], indirect=True)
     elif "history" in metafunc.fixturenames:
-        metafunc.parametrize("history", ["dict", "sqlite"], indirect=True)
+        metafunc.parametrize("history", ["dict", "sqlite", "sqlite_single_table"], indirect=True)
     elif "history_server" in metafunc.fixturenames:
         metafunc.parametrize("history_server", ["dict", "sqlite"], indirect=True)
 
@@ -233,6 +233,11 @@ async def history(request):
         await h.init()
         yield h
         await h.stop()
+    elif request.param == "sqlite_single_table":
+        h = HistorySQLiteSingleTable(":memory:")
+        await h.init()
+        yield h
+        await h.stop()
 
 
 class HistoryServer:
@@ -0,0 +1,29 @@
+"""
+Keep the benchmark suite runnable, timing each case only once
+"""
+
+import json
+
+from asyncua import ua
+from asyncua.crypto.security_policies import SecurityPolicyBasic256Sha256
+from asyncua.ua.ua_binary import struct_from_binary, struct_to_binary
+from benchmarks.__main__ import main
+from benchmarks.cases import publish_response, receive_all, secure_pair
+
+
+def test_benchmark_report(tmp_path):
+    output = tmp_path / "report.json"
+    assert main(["-k", "codec", "-k", "chunking.None.*", "--rounds", "1", "--min-time", "0", "-o", str(output)]) == 0
+    report = json.loads(output.read_text())
+    names = {result["name"] for result in report["results"]}
+    assert "publish_response[1000].decode" in names
+    assert "chunking.None.roundtrip[1MiB]" in names
+    assert all(result["min_s"] > 0 for result in report["results"])
+
+
+def test_benchmark_secure_pair_roundtrip():
+    sender, receiver = secure_pair(SecurityPolicyBasic256Sha256, ua.MessageSecurityMode.SignAndEncrypt)
+    response = publish_response(10)
+    data = b"".join(sender.message_to_buffers(struct_to_binary(response)))
+    body = receive_all(receiver, data).body()
+    assert struct_from_binary(ua.PublishResponse, body) == response
@@ -2092,3 +2092,35 @@ async def test_parse_nodeid_name_contains_multiple_dividers():
     )
     got_node_id = NodeId.from_string(string=raw_node_name)
     assert got_node_id == expected_node_id
+
+
+async def test_browse_continuation_points(opc):
+    folder = await opc.opc.nodes.objects.add_folder(4, "pagedfolder")
+    for i in range(25):
+        await folder.add_variable(4, f"paged{i}", i)
+    references = await folder.get_references(direction=ua.BrowseDirection.Forward)
+    assert len(references) == 26
+    paged = await folder.get_references(direction=ua.BrowseDirection.Forward, max_references_per_node=10)
+    assert paged == references
+
+    desc = ua.BrowseDescription(
+        NodeId=folder.nodeid, BrowseDirection=ua.BrowseDirection.Forward, ResultMask=ua.BrowseResultMask.All
+    )
+    results = await folder.session.browse(ua.BrowseParameters(NodesToBrowse=[desc], RequestedMaxReferencesPerNode=10))
+    assert results[0].References == references[:10]
+    point = results[0].ContinuationPoint
+    assert point
+    results = await folder.session.browse_next(
+        ua.BrowseNextParameters(ContinuationPoints=[point], ReleaseContinuationPoints=False)
+    )
+    assert results[0].References == references[10:20]
+    assert results[0].ContinuationPoint == point
+    results = await folder.session.browse_next(
+        ua.BrowseNextParameters(ContinuationPoints=[point], ReleaseContinuationPoints=True)
+    )
+    assert results[0].StatusCode.is_good()
+    results = await folder.session.browse_next(
+        ua.BrowseNextParameters(ContinuationPoints=[point], ReleaseContinuationPoints=False)
+    )
+    assert results[0].StatusCode.value == ua.StatusCodes.BadContinuationPointInvalid
+    await opc.opc.delete_nodes([folder], recursive=True)
@@ -1,8 +1,13 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
+from unittest import mock
 
+import aiosqlite
 import pytest
 
 from asyncua import ua
+from asyncua.server.history import HistoryDict, HistoryManager
+from asyncua.server.history_sql import HistorySQLite, HistorySQLiteSingleTable
 
 pytestmark = pytest.mark.asyncio
 NODE_ID = ua.NodeId(123)
@@ -61,3 +66,157 @@ async def test_combined_limit(history):
     assert 2 == await result_count(history)
     await add_value(history, 0)
     assert 2 == await result_count(history)
+
+
+async def test_sqlite_write_behind(tmp_path):
+    history = HistorySQLite(str(tmp_path / "history.db"), flush_interval=3600, flush_rows=3)
+    await history.init()
+    await history.new_historized_node(NODE_ID, period=timedelta(hours=3), count=2)
+
+    async def stored_count():
+        async with history._db.execute(f'SELECT COUNT(*) FROM "{history._get_table_name(NODE_ID)}"') as cursor:
+            return (await cursor.fetchone())[0]
+
+    await add_value(history, 5)
+    await add_value(history, 2)
+    assert 0 == await stored_count()
+    # the third buffered value flushes all of them, retention waits for the sweep
+    await add_value(history, 1)
+    assert 3 == await stored_count()
+    await history.apply_retention()
+    assert 2 == await stored_count()
+    # reads see the buffered values of the node
+    await add_value(history, 0)
+    assert 3 == await result_count(history)
+    await add_value(history, 0)
+    await history.stop()
+
+    history = HistorySQLite(str(tmp_path / "history.db"))
+    await history.init()
+    await history.new_historized_node(NODE_ID, period=timedelta(hours=3), count=2)
+    assert 2 == await result_count(history)
+    await history.stop()
+
+
+async def test_sqlite_write_behind_stop_during_flush(tmp_path):
+    history = HistorySQLite(str(tmp_path / "history.db"), flush_interval=0.01, flush_rows=10001)
+    await history.init()
+    nodes = [ua.NodeId(i) for i in range(200, 250)]
+    for node in nodes:
+        await history.new_historized_node(node, period=None, count=0)
+    now = datetime.now(timezone.utc)
+    for i in range(200):
+        for node in nodes:
+            await history.save_node_value(node, ua.DataValue(ua.Variant(i), SourceTimestamp=now))
+    flushing = asyncio.Event()
+    insert_values = history._insert_values
+
+    async def slow_insert_values(node_id, rows):
+        flushing.set()
+        await asyncio.sleep(0.001)
+        await insert_values(node_id, rows)
+
+    with mock.patch.object(history, "_insert_values", side_effect=slow_insert_values):
+        await flushing.wait()
+        # the periodic flush holds the values it took from the buffer
+        assert history._flush_lock.locked()
+        await history.stop()
+
+    history = HistorySQLite(str(tmp_path / "history.db"))
+    await history.init()
+    for node in nodes:
+        await history.new_historized_node(node, period=None, count=0)
+    results = await history.read_nodes_history(nodes, None, None, None)
+    assert sum(len(values) for values, _cont in results.values()) == 10000
+    await history.stop()
+
+
+async def test_sqlite_single_table(tmp_path):
+    history = HistorySQLiteSingleTable(str(tmp_path / "history.db"))
+    await history.init()
+    other = ua.NodeId(124)
+    await history.new_historized_node(NODE_ID, period=None, count=0)
+    await history.new_historized_node(other, period=None, count=2)
+    now = datetime.now(timezone.utc)
+    for age in (3, 2, 1):
+        await add_value(history, age)
+        # same SourceTimestamp for all the values of the other node
+        await history.save_node_value(other, ua.DataValue(ua.Variant(age), SourceTimestamp=now))
+    results = await history.read_nodes_history([NODE_ID, other], now - timedelta(hours=10), now, 2)
+    first, cont = results[NODE_ID]
+    assert cont is None
+    assert len(first) == 2 and first[0].SourceTimestamp < first[1].SourceTimestamp
+    second, _ = results[other]
+    assert [dv.Value.Value for dv in second] == [2, 1]
+    await history.stop()
+
+    # node ids and values survive a restart
+    history = HistorySQLiteSingleTable(str(tmp_path / "history.db"))
+    await history.init()
+    await history.new_historized_node(NODE_ID, period=None, count=0)
+    assert 3 == await result_count(history)
+    await history.stop()
+
+
+async def test_sqlite_single_table_bulk_history_read(tmp_path, mocker):
+    history = HistorySQLiteSingleTable(str(tmp_path / "history.db"))
+    await history.init()
+    other = ua.NodeId(124)
+    await history.new_historized_node(NODE_ID, period=None, count=0)
+    await history.new_historized_node(other, period=None, count=0)
+    for age in (3, 2, 1):
+        await add_value(history, age)
+        await history.save_node_value(
+            other, ua.DataValue(ua.Variant(-age), SourceTimestamp=datetime.now(timezone.utc) - timedelta(hours=age))
+        )
+    # values of nodes which could not be registered are skipped
+    unregistered = ua.NodeId(125)
+    with mock.patch.object(history._db, "execute", side_effect=aiosqlite.OperationalError("database is locked")):
+        await history.new_historized_node(unregistered, period=None, count=0)
+    await history.save_node_value(unregistered, ua.DataValue(ua.Variant(0)))
+    manager = HistoryManager(None)
+    manager.set_storage(history)
+    read_nodes_history = mocker.spy(history, "read_nodes_history")
+    details = ua.ReadRawModifiedDetails(
+        StartTime=datetime.now(timezone.utc) - timedelta(hours=10), EndTime=datetime.now(timezone.utc)
+    )
+    params = ua.HistoryReadParameters(
+        HistoryReadDetails=details, NodesToRead=[ua.HistoryReadValueId(NodeId=n) for n in (NODE_ID, other)]
+    )
+    results = await manager.read_history(params)
+    assert read_nodes_history.call_count == 1
+    assert [len(result.HistoryData.DataValues) for result in results] == [3, 3]
+    assert [dv.Value.Value for dv in results[1].HistoryData.DataValues] == [-3, -2, -1]
+    await history.stop()
+
+
+async def test_dict_continuation_with_colliding_timestamps():
+    history = HistoryDict(max_history_data_response_size=2)
+    await history.init()
+    await history.new_historized_node(NODE_ID, period=None, count=4)
+    now = datetime.now(timezone.utc)
+    # six values sharing two timestamps, the count drops the two oldest
+    for i in range(6):
+        await history.save_node_value(
+            NODE_ID, ua.DataValue(ua.Variant(i), SourceTimestamp=now + timedelta(seconds=i // 3))
+        )
+    manager = HistoryManager(None)
+    manager.set_storage(history)
+
+    async def read_all(start, end):
+        details = ua.ReadRawModifiedDetails(StartTime=start, EndTime=end, NumValuesPerNode=0)
+        rv = ua.HistoryReadValueId(NodeId=NODE_ID)
+        values = []
+        while True:
+            params = ua.HistoryReadParameters(HistoryReadDetails=details, NodesToRead=[rv])
+            (result,) = await manager.read_history(params)
+            values.extend(dv.Value.Value for dv in result.HistoryData.DataValues)
+            if not result.ContinuationPoint:
+                return values
+            rv = ua.HistoryReadValueId(NodeId=NODE_ID, ContinuationPoint=result.ContinuationPoint)
+
+    assert await read_all(now, now + timedelta(hours=1)) == [2, 3, 4, 5]
+    assert await read_all(now + timedelta(hours=1), now) == [5, 4, 3, 2]
+    # a late value goes to its place in time, then the count drops the oldest one
+    await history.save_node_value(NODE_ID, ua.DataValue(ua.Variant(6), SourceTimestamp=now))
+    assert await read_all(now, now + timedelta(hours=1)) == [6, 3, 4, 5]
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from asyncua import ua
+from asyncua.server.history import HistoryManager
+
+pytestmark = pytest.mark.asyncio
+NODE_ID = ua.NodeId(123)
+# the sqlite3 timestamp converter needs a fractional second to parse a timezone aware timestamp
+BASE = datetime(2024, 1, 1, 0, 0, 0, 1000, tzinfo=timezone.utc)
+
+
+async def read_processed(history, aggregate, start=0, end=60, interval=30000.0, node_id=NODE_ID):
+    manager = HistoryManager(None)
+    manager.set_storage(history)
+    details = ua.ReadProcessedDetails(
+        StartTime=BASE + timedelta(seconds=start),
+        EndTime=BASE + timedelta(seconds=end),
+        ProcessingInterval=interval,
+        AggregateType=[ua.NodeId(aggregate)],
+    )
+    params = ua.HistoryReadParameters(HistoryReadDetails=details, NodesToRead=[ua.HistoryReadValueId(NodeId=node_id)])
+    (result,) = await manager.read_history(params)
+    return result
+
+
+async def values(history, aggregate, **kwargs):
+    result = await read_processed(history, aggregate, **kwargs)
+    result.StatusCode.check()
+    return [dv.Value.Value if dv.StatusCode.is_good() else None for dv in result.HistoryData.DataValues]
+
+
+async def save_values(history):
+    await history.new_historized_node(NODE_ID, period=None)
+    # one value every 10 s from 0 to 50, the value at 40 s is bad
+    for i in range(6):
+        status = ua.StatusCodes.BadSensorFailure if i == 4 else ua.StatusCodes.Good
+        dv = ua.DataValue(
+            ua.Variant(i * 10.0, ua.VariantType.Double),
+            StatusCode=ua.StatusCode(status),
+            SourceTimestamp=BASE + timedelta(seconds=i * 10),
+        )
+        await history.save_node_value(NODE_ID, dv)
+
+
+async def test_processed_aggregates(history):
+    await save_values(history)
+    assert await values(history, ua.ObjectIds.AggregateFunction_Count) == [3, 2]
+    assert await values(history, ua.ObjectIds.AggregateFunction_Average) == [10.0, 40.0]
+    assert await values(history, ua.ObjectIds.AggregateFunction_Minimum) == [0.0, 30.0]
+    assert await values(history, ua.ObjectIds.AggregateFunction_Maximum) == [20.0, 50.0]
+    assert await values(history, ua.ObjectIds.AggregateFunction_Delta) == [20.0, 20.0]
+    # linear between good values, the last one is held after 50 s
+    assert await values(history, ua.ObjectIds.AggregateFunction_TimeAverage) == [15.0, 1300 / 30]
+    assert await values(history, ua.ObjectIds.AggregateFunction_Total) == [450.0, 1300.0]
+    assert await values(history, ua.ObjectIds.AggregateFunction_Interpolative, start=5, end=25, interval=10000) == [
+        5.0,
+        15.0,
+    ]
+    assert await values(history, ua.ObjectIds.AggregateFunction_PercentBad) == [0.0, pytest.approx(100 / 3)]
+    assert await values(history, ua.ObjectIds.AggregateFunction_Count, interval=0) == [5]
+    # before the first value there is nothing to interpolate from
+    assert await values(history, ua.ObjectIds.AggregateFunction_Interpolative, start=-10, end=0, interval=0) == [None]
+    # reverse reads return the latest interval first
+    assert await values(history, ua.ObjectIds.AggregateFunction_Count, start=60, end=0) == [2, 3]
+
+
+async def test_processed_continuation(history):
+    await save_values(history)
+    history.max_history_data_response_size = 2
+    manager = HistoryManager(None)
+    manager.set_storage(history)
+
+    async def read_pages(start, end):
+        details = ua.ReadProcessedDetails(
+            StartTime=BASE + timedelta(seconds=start),
+            EndTime=BASE + timedelta(seconds=end),
+            ProcessingInterval=10000.0,
+            AggregateType=[ua.NodeId(ua.ObjectIds.AggregateFunction_Count)],
+        )
+        rv = ua.HistoryReadValueId(NodeId=NODE_ID)
+        pages = []
+        while True:
+            params = ua.HistoryReadParameters(HistoryReadDetails=details, NodesToRead=[rv])
+            (result,) = await manager.read_history(params)
+            pages.append([dv.Value.Value for dv in result.HistoryData.DataValues])
+            if not result.ContinuationPoint:
+                return pages
+            rv = ua.HistoryReadValueId(NodeId=NODE_ID, ContinuationPoint=result.ContinuationPoint)
+
+    # the value at 40 s is bad and not counted
+    assert await read_pages(0, 60) == [[1, 1], [1, 1], [0, 1]]
+    assert await read_pages(60, 0) == [[1, 0], [1, 1], [1, 1]]
+
+
+async def test_processed_errors(history):
+    await save_values(history)
+    result = await read_processed(history, ua.ObjectIds.AggregateFunction_AnnotationCount)
+    assert result.StatusCode.value == ua.StatusCodes.BadAggregateNotSupported
+    result = await read_processed(history, ua.ObjectIds.AggregateFunction_Count, end=0)
+    assert result.StatusCode.value == ua.StatusCodes.BadInvalidTimestampArgument
+    # rounds to a zero length interval
+    result = await read_processed(history, ua.ObjectIds.AggregateFunction_Count, interval=0.0001)
+    assert result.StatusCode.value == ua.StatusCodes.BadInvalidArgument
+    manager = HistoryManager(None)
+    manager.set_storage(history)
+    details = ua.ReadProcessedDetails(StartTime=BASE, EndTime=BASE + timedelta(minutes=1), AggregateType=[])
+    params = ua.HistoryReadParameters(HistoryReadDetails=details, NodesToRead=[ua.HistoryReadValueId(NodeId=NODE_ID)])
+    (result,) = await manager.read_history(params)
+    assert result.StatusCode.value == ua.StatusCodes.BadAggregateListMismatch
+
+
+async def read_at_time(history, seconds, simple_bounds=True):
+    manager = HistoryManager(None)
+    manager.set_storage(history)
+    details = ua.ReadAtTimeDetails(
+        ReqTimes=[BASE + timedelta(seconds=s) for s in seconds], UseSimpleBounds=simple_bounds
+    )
+    params = ua.HistoryReadParameters(HistoryReadDetails=details, NodesToRead=[ua.HistoryReadValueId(NodeId=NODE_ID)])
+    (result,) = await manager.read_history(params)
+    result.StatusCode.check()
+    return result.HistoryData.DataValues
+
+
+async def test_read_at_time(history):
+    await save_values(history)
+    dvs = await read_at_time(history, [15, 20, -5, 70, 45])
+    assert [dv.SourceTimestamp for dv in dvs[:2]] == [BASE + timedelta(seconds=15), BASE + timedelta(seconds=20)]
+    assert dvs[0].Value.Value == 15.0
+    # a stored value is returned as is, after the last value it is held
+    assert dvs[1].Value.Value == 20.0 and dvs[1].StatusCode.value == ua.StatusCodes.Good
+    assert dvs[2].StatusCode.value == ua.StatusCodes.BadNoData
+    assert dvs[3].Value.Value == 50.0
+    # the simple bound at 40 s is bad, otherwise interpolate between 30 s and 50 s
+    assert dvs[4].StatusCode.is_uncertain()
+    (dv,) = await read_at_time(history, [35], simple_bounds=False)
+    assert dv.Value.Value == 35.0 and dv.StatusCode.is_good()
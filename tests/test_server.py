@@ -24,6 +24,7 @@ from asyncua.common.event_objects import (
     AuditSecurityEvent,
     BaseEvent,
 )
+from asyncua.server.address_space import NodeData, NodeReferences
 
 pytestmark = pytest.mark.asyncio
 _logger = logging.getLogger(__name__)
@@ -167,6 +168,56 @@ async def test_multiple_clients_with_subscriptions(server):
     assert sub2.subscription_id not in server.iserver.subscription_service.subscriptions
 
 
+async def test_register_service_handler(server):
+    """
+    Applications can override a service handler through the UaProcessor dispatch table
+    """
+    from asyncua.server.uaprocessor import UaProcessor
+
+    async def register_nodes(processor, params, response, requesthdr, seqhdr):
+        response.Parameters.RegisteredNodeIds = [ua.NodeId(i, 2) for i, _ in enumerate(params.NodesToRegister)]
+
+    services = dict(UaProcessor._services)
+    UaProcessor.register_service(
+        ua.RegisterNodesRequest, ua.RegisterNodesParameters, register_nodes, ua.RegisterNodesResponse
+    )
+    try:
+        async with Client(server.endpoint.geturl()) as client:
+            nodes = [ua.NodeId(ua.ObjectIds.Server), ua.NodeId(ua.ObjectIds.ObjectsFolder)]
+            assert await client.uaclient.register_nodes(nodes) == [ua.NodeId(0, 2), ua.NodeId(1, 2)]
+            assert await client.nodes.server.read_browse_name() == ua.QualifiedName("Server", 0)
+    finally:
+        UaProcessor._services = services
+
+
+async def test_concurrent_requests_per_session(server):
+    """
+    A slow method call must not hold back the other requests of the session
+    """
+    release = asyncio.Event()
+
+    @uamethod
+    async def slow(parent):
+        await release.wait()
+        return 1
+
+    o = server.nodes.objects
+    method = await o.add_method(3, "SlowMethod", slow, [], [ua.VariantType.Int64])
+    var = await o.add_variable(3, "ConcurrentVar", 1.0)
+    server.iserver.max_concurrent_requests_per_session = 4
+    try:
+        async with Client(server.endpoint.geturl()) as client:
+            call = asyncio.create_task(client.get_node(o.nodeid).call_method(method))
+            await asyncio.sleep(0.1)
+            assert await client.get_node(var.nodeid).read_value() == 1.0
+            assert not call.done()
+            release.set()
+            assert await call == 1
+    finally:
+        server.iserver.max_concurrent_requests_per_session = 1
+        await server.delete_nodes([method, var])
+
+
 async def test_historize_events(server):
     srv_node = server.get_node(ua.ObjectIds.Server)
     assert await srv_node.read_event_notifier() == {ua.EventNotifier.SubscribeToEvents}
@@ -966,3 +1017,55 @@ async def test_set_application_uri_updates_server_array(server):
     assert ns[1] == new_uri
     assert sa[0] == new_uri
     assert server.get_application_uri() == new_uri
+
+
+async def test_browse_continuation_point_limit(server):
+    folder = await server.nodes.objects.add_folder(2, "ContinuationPointLimit")
+    for i in range(3):
+        await folder.add_variable(2, f"var{i}", i)
+    continuation_points = server.iserver.isession.browse_continuation_points
+    limit = continuation_points.limit
+    continuation_points.limit = 1
+    try:
+        desc = ua.BrowseDescription(NodeId=folder.nodeid, BrowseDirection=ua.BrowseDirection.Forward)
+        params = ua.BrowseParameters(NodesToBrowse=[desc, desc], RequestedMaxReferencesPerNode=2)
+        first, second = await server.iserver.isession.browse(params)
+        assert first.ContinuationPoint and len(first.References) == 2
+        assert second.StatusCode.value == ua.StatusCodes.BadNoContinuationPoints
+        assert second.References == []
+        assert len(continuation_points) == 1
+    finally:
+        continuation_points.limit = limit
+        continuation_points.clear()
+        await server.delete_nodes([folder], recursive=True)
+
+
+async def test_node_references_indexes(server):
+    folder = await server.nodes.objects.add_folder(2, "IndexedReferences")
+    var = await folder.add_variable(2, "var", 1)
+    prop = await folder.add_property(2, "prop", 2)
+    sub = await folder.add_object(2, "sub")
+    refs = server.iserver.aspace[folder.nodeid].references
+    has_type_definition = ua.NodeId(ua.ObjectIds.HasTypeDefinition)
+    hierarchical = [ref.NodeId for ref in refs if ref.IsForward and ref.ReferenceTypeId != has_type_definition]
+    assert hierarchical == [var.nodeid, prop.nodeid, sub.nodeid]
+    # HierarchicalReferences with subtypes is answered from the type index, in insertion order
+    children = await folder.get_children(refs=ua.ObjectIds.HierarchicalReferences)
+    assert [child.nodeid for child in children] == hierarchical
+    assert await folder.get_child("2:prop") == prop
+    assert [ref.NodeId for ref in refs.by_browse_name(ua.QualifiedName("var", 2))] == [var.nodeid]
+    (prop_ref,) = refs.find(ua.NodeId(ua.ObjectIds.HasProperty), prop.nodeid, True)
+    assert prop_ref in refs
+    refs.remove(prop_ref)
+    assert prop_ref not in refs
+    assert refs.by_browse_name(ua.QualifiedName("prop", 2)) == []
+    with pytest.raises(ValueError):
+        refs.remove(prop_ref)
+    refs.append(prop_ref)
+    assert list(refs)[-1] == prop_ref
+    # address spaces pickled with plain reference lists are converted on load
+    nodedata = NodeData.__new__(NodeData)
+    nodedata.__setstate__({"nodeid": folder.nodeid, "attributes": {}, "references": list(refs), "call": None})
+    assert isinstance(nodedata.references, NodeReferences)
+    assert nodedata.references == list(refs)
+    await server.delete_nodes([folder], recursive=True)
@@ -1,4 +1,5 @@
 import asyncio
+import itertools
 import sys
 from asyncio import Future, TimeoutError, sleep, wait_for
 from copy import copy
@@ -1173,3 +1174,410 @@ async def test_create_subscription_rejected_past_cap(opc):
     finally:
         iserver.max_subscriptions = original_cap
         await sub.delete()
+
+
+@pytest.mark.parametrize("opc", ["client"], indirect=True)
+async def test_subscriptions_share_publish_scheduler(opc):
+    scheduler = opc.server.iserver.subscription_service.publish_scheduler
+    scheduled = len(scheduler)
+    subs = [await opc.opc.create_subscription(20) for _ in range(3)]
+    try:
+        assert len(scheduler) == scheduled + 3
+        internal = [opc.server.iserver.subscription_service.subscriptions[sub.subscription_id] for sub in subs]
+        assert all(sub._task is None for sub in internal)
+        cycles = scheduler.stats.cycles
+        await asyncio.sleep(0.2)
+        assert scheduler.stats.cycles >= cycles + 3 * 5
+        assert scheduler.stats.max_lag >= scheduler.stats.mean_lag >= 0
+    finally:
+        for sub in subs:
+            await sub.delete()
+    assert len(scheduler) == scheduled
+
+
+async def test_publish_scheduler_batches_due_subscriptions():
+    from asyncua.server.publish_scheduler import PublishScheduler
+
+    published = []
+
+    class FakeSubscription:
+        def __init__(self, name):
+            self.name = name
+
+        async def publish_results(self):
+            published.append(self.name)
+
+    scheduler = PublishScheduler(resolution=0.005)
+    subs = [FakeSubscription(i) for i in range(4)]
+    for sub in subs:
+        scheduler.schedule(sub, 0.1, sub.publish_results)
+    await asyncio.sleep(0.25)
+    assert scheduler.unschedule(subs[0])
+    assert not scheduler.unschedule(subs[0])
+    await asyncio.sleep(0.1)
+    await scheduler.stop()
+    assert published.count(0) == 3
+    assert published.count(1) == 4
+    # every cycle publishes the due subscriptions together in one wakeup
+    assert scheduler.stats.wakeups == 4
+    assert scheduler.stats.cycles == len(published)
+    assert len(scheduler) == 0
+
+
+async def test_publish_scheduler_slow_callback_does_not_delay_others():
+    from asyncua.server.publish_scheduler import PublishScheduler
+
+    fast = []
+    slow = []
+
+    async def fast_cycle():
+        fast.append(asyncio.get_running_loop().time())
+
+    async def slow_cycle():
+        slow.append(asyncio.get_running_loop().time())
+        await asyncio.sleep(0.35)
+
+    scheduler = PublishScheduler(resolution=0.005)
+    scheduler.schedule("slow", 0.1, slow_cycle)
+    scheduler.schedule("fast", 0.1, fast_cycle)
+    await asyncio.sleep(0.45)
+    await scheduler.stop()
+    # the fast cycle kept its period while the slow one was running
+    assert len(fast) >= 4
+    assert max(b - a for a, b in itertools.pairwise(fast)) < 0.2
+    # cycles due while the previous one is still running are skipped, not stacked
+    assert len(slow) == 2
+    assert scheduler.stats.skipped_intervals >= 3
+    assert scheduler.stats.max_lag < 0.1
+
+
+def test_monitored_item_queue_overflow():
+    from asyncua.server.internal_subscription import MonitoredItemQueue
+
+    def notif(i):
+        return ua.MonitoredItemNotification(ClientHandle=1, Value=ua.DataValue(ua.Variant(i, ua.VariantType.Int32)))
+
+    queue = MonitoredItemQueue(3)
+    assert all(queue.put(notif(i)) for i in range(3))
+    assert not queue.put(notif(3))
+    assert [n.Value.Value.Value for n in queue] == [1, 2, 3]
+    first = next(iter(queue)).Value
+    assert first.StatusCode.value & 0x0480 == 0x0480
+    assert first.StatusCode.is_good()
+
+    queue = MonitoredItemQueue(3, discard_oldest=False)
+    for i in range(5):
+        queue.put(notif(i))
+    assert [n.Value.Value.Value for n in queue] == [0, 1, 4]
+    assert [n.Value.StatusCode.value for n in queue] == [0, 0, 0x0480]
+
+    queue = MonitoredItemQueue(1)
+    for i in range(3):
+        queue.put(notif(i))
+    assert [(n.Value.Value.Value, n.Value.StatusCode.value) for n in queue] == [(2, 0)]
+
+
+async def test_notification_budget_shared_by_session():
+    from asyncua.server.address_space import AddressSpace
+    from asyncua.server.internal_subscription import InternalSubscription, NotificationBudget
+
+    async def callback(*args):
+        pass
+
+    budget = NotificationBudget(4)
+    subs = [
+        InternalSubscription(
+            ua.CreateSubscriptionResult(SubscriptionId=i, RevisedPublishingInterval=100),
+            AddressSpace(),
+            callback,
+            ua.NodeId(1),
+            budget=budget,
+        )
+        for i in range(2)
+    ]
+    for i in range(3):
+        for mid in (1, 2):
+            notification = ua.MonitoredItemNotification(ClientHandle=mid, Value=ua.DataValue(i))
+            await subs[0].enqueue_datachange_event(mid, notification, 10)
+    assert budget.used == 4
+    # the first notification of an item is always queued, later ones overflow
+    await subs[1].enqueue_datachange_event(1, ua.MonitoredItemNotification(Value=ua.DataValue(5)), 10)
+    await subs[1].enqueue_datachange_event(1, ua.MonitoredItemNotification(Value=ua.DataValue(6)), 10)
+    assert budget.used == 5
+    assert [n.Value.Value.Value for n in subs[1]._triggered_datachanges[1]] == [6]
+    subs[0]._pop_publish_result()
+    assert budget.used == 1
+    other = NotificationBudget()
+    subs[1].set_budget(other)
+    assert (budget.used, other.used) == (0, 1)
+    await subs[1].stop()
+    assert other.used == 0
+
+
+@pytest.mark.parametrize("opc", ["client"], indirect=True)
+async def test_sampled_monitored_item_reports_last_written_value(opc):
+    iserver = opc.server.iserver
+    var = await opc.server.nodes.objects.add_variable(3, "SampledVar", 0)
+    iserver.sample_monitored_items = True
+    handler = MySubHandler2(limit=2)
+    sub = await opc.server.create_subscription(50, handler)
+    try:
+        await sub.subscribe_data_change(var, sampling_interval=300)
+        await asyncio.sleep(0.1)
+        for i in range(1, 11):
+            await var.write_value(i)
+        await handler.done()
+        await asyncio.sleep(0.4)
+        assert [v for _, v in handler.results] == [0, 10]
+    finally:
+        iserver.sample_monitored_items = False
+        await sub.delete()
+        await opc.server.delete_nodes([var])
+
+
+@pytest.mark.parametrize("opc", ["client"], indirect=True)
+async def test_modify_monitored_item_sampling_interval(opc):
+    iserver = opc.server.iserver
+    var = await opc.server.nodes.objects.add_variable(3, "ModifiedSamplingVar", 0)
+    iserver.sample_monitored_items = True
+    handler = MySubHandler2()
+    sub = await opc.server.create_subscription(50, handler)
+    msrv = iserver.subscription_service.subscriptions[sub.subscription_id].monitored_item_srv
+    try:
+        handle = await sub.subscribe_data_change(var, sampling_interval=0)
+        mdata = msrv._monitored_items[handle]
+        assert not mdata.sampling_interval
+        # a monitored item which was not sampled starts to be sampled
+        results = await sub.modify_monitored_item(handle, 300)
+        assert results[0].RevisedSamplingInterval == 300
+        assert mdata.sampling_interval == 300
+        await asyncio.sleep(0.1)
+        for i in range(1, 11):
+            await var.write_value(i)
+        await asyncio.sleep(0.4)
+        assert [v for _, v in handler.results] == [0, 10]
+        # and stops being sampled, every change is reported again
+        results = await sub.modify_monitored_item(handle, 0)
+        assert results[0].RevisedSamplingInterval == 0
+        assert not mdata.sampling_interval
+        assert not iserver.subscription_service.sampling_scheduler.unschedule((msrv, handle))
+        for i in (11, 12):
+            await var.write_value(i)
+        await asyncio.sleep(0.2)
+        assert [v for _, v in handler.results] == [0, 10, 11, 12]
+    finally:
+        iserver.sample_monitored_items = False
+        await sub.delete()
+        await opc.server.delete_nodes([var])
+
+
+@pytest.mark.parametrize("opc", ["client"], indirect=True)
+async def test_value_callback_node_is_polled(opc):
+    var = await opc.server.nodes.objects.add_variable(3, "PolledVar", 0)
+    reads = []
+
+    def callback(nodeid, attr):
+        reads.append(nodeid)
+        return ua.DataValue(ua.Variant(len(reads) // 2, ua.VariantType.Int64))
+
+    opc.server.set_attribute_value_callback(var.nodeid, callback)
+    handler = MySubHandler2(limit=3)
+    sub = await opc.opc.create_subscription(20, handler)
+    try:
+        await sub.subscribe_data_change(opc.opc.get_node(var.nodeid), sampling_interval=20)
+        await handler.done()
+        values = [v for _, v in handler.results[:3]]
+        assert values == sorted(set(values))
+    finally:
+        await sub.delete()
+        await opc.server.delete_nodes([var])
+
+
+@pytest.mark.parametrize("opc", ["client"], indirect=True)
+async def test_percent_deadband(opc):
+    var = await opc.server.nodes.objects.add_variable(3, "AnalogVar", 0.0, datatype=ua.NodeId(ua.ObjectIds.Double))
+    eu_range = await var.add_property(0, "EURange", ua.Range(Low=0.0, High=200.0))
+    array_var = await opc.server.nodes.objects.add_variable(3, "AnalogArray", [0.0, 0.0])
+    await array_var.add_property(0, "EURange", ua.Range(Low=0.0, High=200.0))
+    handler = MySubHandler2()
+    sub = await opc.server.create_subscription(20, handler)
+    try:
+        # 10% of the EURange: changes of more than 20 from the last reported value are reported
+        await sub.deadband_monitor([var, array_var], 10, 2)
+        for value in (15.0, 30.0, 45.0, 48.0):
+            await var.write_value(value)
+        for value in ([10.0, 19.0], [10.0, 25.0], [30.0, 25.0]):
+            await array_var.write_value(value)
+        await asyncio.sleep(0.2)
+        # a narrower EURange is used as soon as it is written
+        await eu_range.write_value(ua.Range(Low=0.0, High=50.0))
+        await var.write_value(58.0)
+        await asyncio.sleep(0.2)
+        assert [v for n, v in handler.results if n.nodeid == var.nodeid] == [0.0, 30.0, 58.0]
+        assert [v for n, v in handler.results if n.nodeid == array_var.nodeid] == [[0.0, 0.0], [10.0, 25.0]]
+    finally:
+        await sub.delete()
+        await opc.server.delete_nodes([var, array_var], recursive=True)
+
+
+@pytest.mark.parametrize("opc", ["client"], indirect=True)
+async def test_percent_deadband_requires_eu_range(opc):
+    var = await opc.server.nodes.objects.add_variable(3, "NoRangeVar", 0.0)
+    sub = await opc.server.create_subscription(20, MySubHandler2())
+    msrv = opc.server.iserver.subscription_service.subscriptions[sub.subscription_id].monitored_item_srv
+    try:
+        with pytest.raises(ua.UaStatusCodeError) as exc:
+            await sub.deadband_monitor(var, 10, ua.DeadbandType.Percent)
+        assert exc.value.code == ua.StatusCodes.BadFilterNotAllowed
+        handle = await sub.deadband_monitor(var, 1, ua.DeadbandType.Absolute)
+        item = ua.MonitoredItemModifyRequest()
+        item.MonitoredItemId = handle
+        item.RequestedParameters.Filter = ua.DataChangeFilter(DeadbandType=ua.DeadbandType.Percent, DeadbandValue=10)
+        params = ua.ModifyMonitoredItemsParameters()
+        params.SubscriptionId = sub.subscription_id
+        params.ItemsToModify.append(item)
+        results = await sub.server.modify_monitored_items(params)
+        assert results[0].StatusCode == ua.StatusCode(ua.StatusCodes.BadFilterNotAllowed)
+        # the item keeps its previous filter
+        assert msrv._monitored_items[handle].filter.DeadbandType == ua.DeadbandType.Absolute
+    finally:
+        await sub.delete()
+        await opc.server.delete_nodes([var])
+
+
+@pytest.mark.parametrize("opc", ["client"], indirect=True)
+async def test_write_attribute_values_batches_datachanges(opc):
+    variables = [await opc.server.nodes.objects.add_variable(3, f"BatchVar{i}", 0) for i in range(3)]
+    handler = MySubHandler2(limit=6)
+    sub = await opc.server.create_subscription(50, handler)
+    isub = opc.server.iserver.subscription_service.subscriptions[sub.subscription_id]
+    triggers = []
+    trigger_publish = isub._trigger_publish
+
+    async def count_trigger_publish():
+        triggers.append(1)
+        await trigger_publish()
+
+    isub._trigger_publish = count_trigger_publish
+    try:
+        await sub.subscribe_data_change(variables)
+        await asyncio.sleep(0.1)
+        triggers.clear()
+        results = await opc.server.write_attribute_values(
+            [(var.nodeid, ua.DataValue(ua.Variant(i + 1, ua.VariantType.Int64))) for i, var in enumerate(variables)]
+            + [(ua.NodeId(999999, 3), ua.DataValue(ua.Variant(1, ua.VariantType.Int64)))]
+        )
+        assert [r.is_good() for r in results] == [True, True, True, False]
+        await handler.done()
+        assert len(triggers) == 1
+        assert sorted(v for _, v in handler.results) == [0, 0, 0, 1, 2, 3]
+    finally:
+        await sub.delete()
+        await opc.server.delete_nodes(variables)
+
+
+async def test_publish_pipeline_depth(mocker):
+    session = asyncua.client.ua_session.UaSession(mocker.Mock())
+    session._set_state(asyncua.client.ua_session.SessionState.ACTIVATED)
+    session.publish_pipeline_depth = 3
+    received = []
+    session._subscription_callbacks[1] = received.append
+    requests = []
+
+    async def publish(acks):
+        requests.append((list(acks), asyncio.get_running_loop().create_future()))
+        return await requests[-1][1]
+
+    def response(seq):
+        message = ua.NotificationMessage(SequenceNumber=seq, NotificationData=[ua.DataChangeNotification()])
+        return ua.PublishResponse(Parameters=ua.PublishResult(SubscriptionId=1, NotificationMessage=message))
+
+    session.publish = publish
+    task = asyncio.create_task(session._publish_loop())
+    try:
+        await sleep(0.01)
+        assert len(requests) == 3
+        requests[1][1].set_result(response(2))
+        requests[0][1].set_result(response(1))
+        await sleep(0.01)
+        assert [r.NotificationMessage.SequenceNumber for r in received] == [1, 2]
+        # both responses are acknowledged by the first of the two requests sent to refill the pipeline
+        assert len(requests) == 5
+        assert [(a.SubscriptionId, a.SequenceNumber) for a in requests[3][0]] == [(1, 1), (1, 2)]
+        assert requests[4][0] == []
+    finally:
+        task.cancel()
+
+
+class MyBatchHandler:
+    def __init__(self):
+        self.batches = []
+        self.received = asyncio.Condition()
+
+    async def datachange_notifications(self, events):
+        async with self.received:
+            self.batches.append([(e.node.nodeid, e.value) for e in events])
+            self.received.notify_all()
+
+    async def wait_batches(self, count):
+        async with self.received:
+            await wait_for(self.received.wait_for(lambda: len(self.batches) >= count), 2)
+
+
+@pytest.mark.parametrize("opc", ["client"], indirect=True)
+async def test_batch_handler_gets_publish_responses_in_order(opc):
+    variables = [await opc.server.nodes.objects.add_variable(3, f"BatchHandlerVar{i}", 0) for i in range(3)]
+    handler = MyBatchHandler()
+    sub = await opc.server.create_subscription(50, handler)
+    try:
+        await sub.subscribe_data_change(variables)
+        await handler.wait_batches(1)
+        await opc.server.write_attribute_values(
+            [(var.nodeid, ua.DataValue(ua.Variant(i + 1, ua.VariantType.Int64))) for i, var in enumerate(variables)]
+        )
+        await handler.wait_batches(2)
+        assert handler.batches == [
+            [(var.nodeid, 0) for var in variables],
+            [(var.nodeid, i + 1) for i, var in enumerate(variables)],
+        ]
+        assert not sub._dispatch_tasks
+    finally:
+        await sub.delete()
+        await opc.server.delete_nodes(variables)
+
+
+class MyColumnsHandler(MyBatchHandler):
+    async def datachange_columns(self, columns):
+        async with self.received:
+            self.batches.append(columns)
+            self.received.notify_all()
+
+
+@pytest.mark.parametrize("opc", ["client"], indirect=True)
+async def test_columns_handler(opc):
+    variables = [await opc.server.nodes.objects.add_variable(3, f"ColumnsVar{i}", 0.0) for i in range(3)]
+    handler = MyColumnsHandler()
+    sub = await opc.server.create_subscription(50, handler)
+    try:
+        handles = await sub.subscribe_data_change(variables)
+        await handler.wait_batches(1)
+        now = datetime.now(timezone.utc)
+        await opc.server.write_attribute_values(
+            [
+                (var.nodeid, ua.DataValue(ua.Variant(i + 0.5, ua.VariantType.Double), SourceTimestamp=now))
+                for i, var in enumerate(variables)
+            ]
+        )
+        await handler.wait_batches(2)
+        columns = handler.batches[1]
+        assert len(columns) == 3
+        assert [sub._monitored_items[h].server_handle for h in columns.client_handles] == handles
+        assert columns.node_ids == [var.nodeid for var in variables]
+        assert columns.values == [0.5, 1.5, 2.5]
+        assert columns.status_codes == [0, 0, 0]
+        assert columns.source_timestamps == [now, now, now]
+        numpy = pytest.importorskip("numpy")
+        assert columns.values_array(numpy.float64).tolist() == [0.5, 1.5, 2.5]
+    finally:
+        await sub.delete()
+        await opc.server.delete_nodes(variables)
@@ -3,8 +3,11 @@
 Simple unit test that do not need to setup a server or a client
 """
 
+import contextvars
+import copy
 import io
 import logging
+import pickle
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -19,8 +22,8 @@ from asyncua.common.event_objects import BaseEvent
 from asyncua.common.structures import StructGenerator
 from asyncua.common.structures104 import make_structure
 from asyncua.common.ua_utils import string_to_val, val_to_string
-from asyncua.crypto.security_policies import SecurityPolicyNone
-from asyncua.server.monitored_item_service import WhereClauseEvaluator
+from asyncua.crypto.security_policies import Cryptography, SecurityPolicyNone, SignerHMac256
+from asyncua.server.monitored_item_service import MonitoredItemValues, WhereClauseEvaluator
 from asyncua.ua import flatten, get_shape, ua_binary
 from asyncua.ua.ua_binary import (
     _reshape,
@@ -73,6 +76,30 @@ def test_variant_array_none():
     assert v2.Dimensions == [0, 0]
 
 
+def test_variant_numpy_array_roundtrip():
+    np = pytest.importorskip("numpy")
+    values = np.arange(12, dtype=np.float64).reshape(3, 4)
+    v = ua.Variant(values, ua.VariantType.Double)
+    assert v.is_array
+    assert v.Dimensions == [3, 4]
+    data = variant_to_binary(v)
+    assert data == variant_to_binary(ua.Variant(values.tolist(), ua.VariantType.Double))
+
+    v2 = variant_from_binary(ua.utils.Buffer(data))
+    assert isinstance(v2.Value, list)
+    with ua_binary.numpy_arrays():
+        v3 = variant_from_binary(ua.utils.Buffer(data))
+    assert not ua_binary.get_numpy_arrays()
+    assert isinstance(v3.Value, np.ndarray)
+    assert v3.Value.shape == (3, 4)
+    assert v3 == v2
+    assert v3 == v
+
+    v4 = ua.Variant(np.array([1, 2, 3], dtype=np.int16))
+    assert v4.VariantType == ua.VariantType.Int16
+    assert variant_from_binary(ua.utils.Buffer(variant_to_binary(v4))).Value == [1, 2, 3]
+
+
 def test_variant_empty_list():
     v = ua.Variant([], VariantType=ua.VariantType.Int32, is_array=True)
     data = variant_to_binary(v)
@@ -848,6 +875,80 @@ def test_message_chunk():
         assert len(chunk.to_binary()) <= 28
 
 
+def test_message_chunk_to_buffers_matches_to_binary():
+    pol = SecurityPolicyNone()
+    chunks = MessageChunk.message_to_chunks(pol, b"12345678901", 28)
+    for seq, chunk in enumerate(chunks, start=1):
+        chunk.SequenceHeader.SequenceNumber = seq
+        buffers = chunk.to_buffers()
+        assert isinstance(buffers[1], memoryview)
+        assert b"".join(buffers) == chunk.to_binary()
+
+    signing = Cryptography(ua.MessageSecurityMode.Sign)
+    signing.Signer = SignerHMac256(b"k" * 32)
+    chunk = MessageChunk(signing, b"payload")
+    chunk.MessageHeader.ChannelId = 1
+    chunk.SequenceHeader.SequenceNumber = 1
+    chunk.SequenceHeader.RequestId = 1
+    assert len(chunk.to_buffers()) == 3
+    assert b"".join(chunk.to_buffers()) == chunk.to_binary()
+
+
+def test_message_chunk_body_is_zero_copy():
+    pol = SecurityPolicyNone()
+    chunk = MessageChunk.message_to_chunks(pol, b"123", 65536)[0]
+    chunk.SequenceHeader.SequenceNumber = 1
+    chunk2 = MessageChunk.from_binary(pol, ua.utils.Buffer(chunk.to_binary()))
+    assert isinstance(chunk2.Body, memoryview)
+    assert chunk2.Body == b"123"
+
+
+def test_buffer_view_decodes_in_place():
+    v = ua.Variant([b"ab", b"cd"], ua.VariantType.ByteString)
+    data = b"\x00" + variant_to_binary(v) + nodeid_to_binary(ua.NodeId("name", 3))
+    buf = ua.utils.Buffer(data)
+    buf.skip(1)
+    view = buf.view()
+    assert isinstance(view.read(0), memoryview)
+    v2 = variant_from_binary(view)
+    assert v2 == v
+    assert all(type(b) is bytes for b in v2.Value)
+    assert nodeid_from_binary(view) == ua.NodeId("name", 3)
+    assert not view
+
+
+def test_receive_buffer_reassembles_across_segments():
+    rbuf = ua.utils.ReceiveBuffer(read_size=8)
+    payload = bytes(range(40))
+    for i in range(0, len(payload), 7):
+        segment = payload[i : i + 7]
+        view = rbuf.get_buffer(-1)
+        view[: len(segment)] = segment
+        rbuf.buffer_updated(len(segment))
+        del view
+    assert len(rbuf) == 40
+    assert rbuf.peek().read(4) == payload[:4]
+    assert rbuf.consume(30) == payload[:30]
+    rbuf.extend(b"tail")
+    assert bytes(rbuf.peek()) == payload[30:] + b"tail"
+    assert rbuf.consume(14) == payload[30:] + b"tail"
+    assert not rbuf
+    with pytest.raises(ua.utils.NotEnoughData):
+        rbuf.consume(1)
+
+
+def test_receive_buffer_shrinks_after_large_message():
+    rbuf = ua.utils.ReceiveBuffer(read_size=8)
+    rbuf.extend(bytes(100))
+    assert rbuf.consume(60) == bytes(60)
+    # still holding part of the message
+    assert len(rbuf._data) >= 100
+    assert rbuf.consume(40) == bytes(40)
+    assert len(rbuf._data) == 8
+    rbuf.extend(b"next")
+    assert rbuf.consume(4) == b"next"
+
+
 def test_null():
     n = ua.NodeId()
     assert n.is_null()
@@ -1157,6 +1258,128 @@ def test_struct_mutual_recursive_lists_roundtrip() -> None:
     assert decoded.Children[0].Parents[0].Name == "branch"
 
 
+@dataclass
+class _FixedSizeRunStruct:
+    Encoding: ua.Byte = field(default=0, repr=False, init=False)
+    Handle: ua.UInt32 = 0
+    Ratio: ua.Double = 0.0
+    Flag: ua.Boolean = False
+    Mode: ua.MessageSecurityMode = ua.MessageSecurityMode.Invalid
+    Stamp: ua.DateTime = field(default_factory=lambda: datetime(2020, 1, 1, tzinfo=timezone.utc))
+    Name: ua.String = ""
+    Small: ua.Int16 = 0
+    Level: ua.AccessLevelType = ua.AccessLevelType.CurrentRead
+    Optional: ua.UInt32 | None = None
+    Last: ua.SByte = 0
+
+
+def test_struct_fixed_size_runs_roundtrip() -> None:
+    v = _FixedSizeRunStruct(
+        Handle=7,
+        Ratio=1.5,
+        Flag=True,
+        Mode=ua.MessageSecurityMode.Sign,
+        Name="name",
+        Small=-3,
+        Level=ua.AccessLevelType.CurrentWrite,
+        Optional=9,
+        Last=-1,
+    )
+    data = struct_to_binary(v)
+    expected = b"".join(
+        [
+            ua_binary.Primitives.Byte.pack(1),
+            ua_binary.Primitives.UInt32.pack(7),
+            ua_binary.Primitives.Double.pack(1.5),
+            ua_binary.Primitives.Boolean.pack(True),
+            ua_binary.Primitives.Int32.pack(ua.MessageSecurityMode.Sign.value),
+            ua_binary.Primitives.DateTime.pack(v.Stamp),
+            ua_binary.Primitives.String.pack("name"),
+            ua_binary.Primitives.Int16.pack(-3),
+            ua_binary.Primitives.Byte.pack(ua.AccessLevelType.CurrentWrite),
+            ua_binary.Primitives.UInt32.pack(9),
+            ua_binary.Primitives.SByte.pack(-1),
+        ]
+    )
+    assert data == expected
+    decoded = struct_from_binary(_FixedSizeRunStruct, ua.utils.Buffer(data))
+    assert decoded == v
+    assert type(decoded.Mode) is ua.MessageSecurityMode
+    assert type(decoded.Level) is ua.AccessLevelType
+
+
+def test_cached_identity_fragments() -> None:
+    qname = ua.QualifiedName("Température", 2)
+    ltext = ua.LocalizedText("Température", "fr")
+    nodeid = ua.NodeId("Température", 2)
+    for _ in range(2):
+        assert struct_to_binary(qname) == b"\x02\x00" + ua_binary.Primitives.String.pack("Température")
+        assert struct_to_binary(ltext) == b"\x03" + b"".join(
+            ua_binary.Primitives.String.pack(s) for s in ("fr", "Température")
+        )
+        assert nodeid_to_binary(nodeid) == b"\x03\x02\x00" + ua_binary.Primitives.String.pack("Température")
+    assert struct_to_binary(ua.LocalizedText()) == b"\x00"
+    assert struct_from_binary(ua.LocalizedText, ua.utils.Buffer(struct_to_binary(ltext))) == ltext
+
+    def latin1() -> tuple[bytes, bytes]:
+        ua_binary.set_string_encoding("latin-1")
+        return struct_to_binary(qname), nodeid_to_binary(nodeid)
+
+    # the cached fragments depend on the string encoding in use
+    assert contextvars.copy_context().run(latin1) == (
+        b"\x02\x00\x0b\x00\x00\x00" + "Température".encode("latin-1"),
+        b"\x03\x02\x00\x0b\x00\x00\x00" + "Température".encode("latin-1"),
+    )
+
+
+def test_lazy_variants() -> None:
+    values = [
+        ua.Variant([[1.5, 2.5], [3.5, 4.5]], ua.VariantType.Double, Dimensions=[ua.Int32(2), ua.Int32(2)]),
+        ua.Variant(["a", "b", None], ua.VariantType.String),
+        ua.Variant(ua.Range(Low=1.0, High=2.0), ua.VariantType.ExtensionObject),
+        ua.Variant([ua.EUInformation(DisplayName=ua.LocalizedText("m"))], ua.VariantType.ExtensionObject),
+    ]
+    data = b"".join(struct_to_binary(ua.DataValue(v)) for v in values) + b"\x00"
+    with ua_binary.lazy_variants():
+        buf = ua.utils.Buffer(data)
+        decoded = [struct_from_binary(ua.DataValue, buf) for _ in values]
+        assert ua_binary.get_lazy_variants()
+    assert not ua_binary.get_lazy_variants()
+    assert buf.read(1) == b"\x00"
+    for dv, expected in zip(decoded, values, strict=True):
+        assert isinstance(dv.Value, ua_binary.LazyVariant)
+        assert not dv.Value.is_decoded
+        assert dv.Value.VariantType == expected.VariantType
+        assert dv.Value == expected
+        assert dv.Value.is_decoded
+    with ua_binary.lazy_variants():
+        scalar = variant_from_binary(ua.utils.Buffer(variant_to_binary(ua.Variant(5, ua.VariantType.Int32))))
+    assert not isinstance(scalar, ua_binary.LazyVariant)
+    assert scalar == ua.Variant(5, ua.VariantType.Int32)
+
+
+def test_lazy_variants_copy() -> None:
+    value = ua.Variant([ua.Range(Low=1.0, High=2.0)], ua.VariantType.ExtensionObject)
+    data = variant_to_binary(value)
+
+    def lazy() -> ua_binary.LazyVariant:
+        with ua_binary.lazy_variants():
+            variant = variant_from_binary(ua.utils.Buffer(data))
+        assert isinstance(variant, ua_binary.LazyVariant) and not variant.is_decoded
+        return variant
+
+    for clone in (copy.copy(lazy()), copy.deepcopy(lazy()), pickle.loads(pickle.dumps(lazy()))):
+        assert type(clone) is ua.Variant
+        assert clone == value
+        assert clone.is_array
+    # monitored items keep a deep copy of the reported values
+    values = MonitoredItemValues()
+    values.set_current_datavalue(ua.DataValue(lazy()))
+    current = values.get_current_datavalue()
+    assert current is not None and type(current.Value) is ua.Variant
+    assert current.Value == value
+
+
 @dataclass
 class _ScalarSelfRefNode:
     Encoding: ua.Byte = field(default=0, repr=False, init=False)